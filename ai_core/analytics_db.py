@@ -1,51 +1,276 @@
+import math
+import os
 import sqlite3
-from datetime import datetime
+import sys
+import time
+from datetime import datetime, timedelta
 
-DB_NAME = "analytics.db"
+from . import settings
+from .storage import (
+    check_shard_layout, get_connection, get_meta, partition, set_meta, shard_path,
+    shard_paths, transaction, write_sharded, writer
+)
+
+# Split into settings.STORAGE_SHARDS files by session id (see storage.shard_paths).
+# Industry baselines are kept per shard and summed across shards on read.
+DB_NAME = os.path.join(settings.STORAGE_ROOT, "analytics.db")
+
+# Imported into DB_NAME once when set (see settings.ANALYTICS_LEGACY_DB).
+LEGACY_DB_NAME = (
+    os.path.abspath(settings.ANALYTICS_LEGACY_DB) if settings.ANALYTICS_LEGACY_DB else None
+)
 
 
 def init_analytics_db():
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    os.makedirs(os.path.dirname(DB_NAME), exist_ok=True)
+    check_shard_layout(DB_NAME)
+    for path in shard_paths(DB_NAME):
+        _init_shard(path)
 
-    # Project snapshots table (PM analytics)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS project_snapshots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT,
-            industry TEXT,
-            avg_complexity REAL,
-            avg_risk REAL,
-            delay_probability REAL,
-            created_at TEXT
-        )
+    if (LEGACY_DB_NAME and os.path.exists(LEGACY_DB_NAME)
+            and LEGACY_DB_NAME not in shard_paths(DB_NAME)):
+        import_legacy_db(LEGACY_DB_NAME)
+
+
+def _init_shard(path):
+    with transaction(path) as cursor:
+
+        # Project snapshots table (PM analytics)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS project_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT,
+                industry TEXT,
+                avg_complexity REAL,
+                avg_risk REAL,
+                delay_probability REAL,
+                created_at TEXT,
+                created_ts INTEGER
+            )
+        """)
+        _migrate_timestamps(cursor, "project_snapshots")
+        cursor.execute("DROP INDEX IF EXISTS idx_project_snapshots_industry")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_project_snapshots_industry_ts
+            ON project_snapshots (industry, created_ts)
+        """)
+
+        # Running sums per industry, maintained by insert_project_snapshot.
+        # day is a YYYY-MM-DD bucket for windowed baselines, or ALL_TIME.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS industry_baselines (
+                industry TEXT NOT NULL,
+                day TEXT NOT NULL,
+                snapshot_count INTEGER NOT NULL,
+                complexity_sum REAL NOT NULL,
+                complexity_sq_sum REAL NOT NULL,
+                risk_count INTEGER NOT NULL,
+                risk_sum REAL NOT NULL,
+                risk_sq_sum REAL NOT NULL,
+                PRIMARY KEY (industry, day)
+            )
+        """)
+
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM industry_baselines)")
+        has_baselines = cursor.fetchone()[0]
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM project_snapshots)")
+        has_snapshots = cursor.fetchone()[0]
+        if has_snapshots and not has_baselines:
+            _backfill_industry_baselines(cursor)
+
+        # Defects table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS defects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT,
+                industry TEXT,
+                module_name TEXT,
+                severity TEXT,
+                created_at TEXT,
+                created_ts INTEGER
+            )
+        """)
+        _migrate_timestamps(cursor, "defects")
+        # Covers per-session time-range queries without touching the table.
+        cursor.execute("DROP INDEX IF EXISTS idx_defects_session")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_defects_session_ts
+            ON defects (session_id, created_ts, module_name, severity)
+        """)
+
+        # Materialized per-session counts kept in step with defects by
+        # insert_defect, so the dashboard never scans defects. Missing
+        # module names and severities are counted under ''.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS defect_counters (
+                session_id TEXT NOT NULL,
+                module_name TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (session_id, module_name, severity)
+            )
+        """)
+
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM defect_counters)")
+        has_counters = cursor.fetchone()[0]
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM defects)")
+        has_defects = cursor.fetchone()[0]
+        if has_defects and not has_counters:
+            _backfill_defect_counters(cursor)
+
+        # Defect counts per hour and per day bucket (bucket = epoch seconds
+        # at its start), kept in step with defects by insert_defect so trend
+        # queries never scan defects. Missing labels are stored as ''.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS defect_rollups (
+                session_id TEXT NOT NULL,
+                resolution INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                industry TEXT NOT NULL,
+                module_name TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (session_id, resolution, bucket, industry, module_name, severity)
+            ) WITHOUT ROWID
+        """)
+
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM defect_rollups)")
+        has_rollups = cursor.fetchone()[0]
+        if has_defects and not has_rollups:
+            _backfill_defect_rollups(cursor)
+
+
+# ---------------- TIMESTAMPS ----------------
+
+# created_ts is integer epoch seconds (UTC). created_at holds the ISO text
+# timestamp of rows written before created_ts existed and is no longer set.
+
+def _migrate_timestamps(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    if "created_ts" in {row[1] for row in cursor.fetchall()}:
+        return
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN created_ts INTEGER")
+    cursor.execute(f"""
+        UPDATE {table} SET created_ts = CAST(strftime('%s', created_at) AS INTEGER)
+        WHERE created_at IS NOT NULL
     """)
 
-    # Defects table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS defects (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT,
-            industry TEXT,
-            module_name TEXT,
-            severity TEXT,
-            created_at TEXT
+
+def _legacy_rows(source, table, columns):
+    cursor = source.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    )
+    if cursor.fetchone() is None:
+        return []
+
+    existing = {row[1] for row in source.execute(f"PRAGMA table_info({table})")}
+    created_ts = "CAST(strftime('%s', created_at) AS INTEGER)"
+    if "created_ts" in existing:
+        created_ts = f"COALESCE(created_ts, {created_ts})"
+    return source.execute(
+        f"SELECT {', '.join(columns)}, created_at, {created_ts} FROM {table} ORDER BY id"
+    ).fetchall()
+
+
+def import_legacy_db(legacy_path):
+    """
+    Copy the defects and project snapshots of an analytics database kept
+    elsewhere into DB_NAME's shards and rebuild their counters, rollups and
+    baselines. Each shard records the import, so running it again is a no-op.
+    """
+    marker = f"imported:{os.path.abspath(legacy_path)}"
+    source = sqlite3.connect(f"file:{legacy_path}?mode=ro", uri=True)
+    try:
+        defects = _legacy_rows(
+            source, "defects", ("session_id", "industry", "module_name", "severity")
         )
-    """)
+        snapshots = _legacy_rows(
+            source, "project_snapshots",
+            ("session_id", "industry", "avg_complexity", "avg_risk", "delay_probability")
+        )
+    finally:
+        source.close()
+
+    defect_groups = partition(DB_NAME, defects, lambda row: row[0])
+    snapshot_groups = partition(DB_NAME, snapshots, lambda row: row[0])
+    imported = 0
 
-    conn.commit()
-    conn.close()
+    for path in shard_paths(DB_NAME):
+        with transaction(path) as cursor:
+            if get_meta(cursor, marker) is not None:
+                continue
+            shard_defects = defect_groups.get(path, [])
+            shard_snapshots = snapshot_groups.get(path, [])
+
+            cursor.executemany("""
+                INSERT INTO defects
+                (session_id, industry, module_name, severity, created_at, created_ts)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, shard_defects)
+            cursor.executemany("""
+                INSERT INTO project_snapshots
+                (session_id, industry, avg_complexity, avg_risk, delay_probability,
+                 created_at, created_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, shard_snapshots)
+
+            if shard_defects:
+                _backfill_defect_counters(cursor)
+                _backfill_defect_rollups(cursor)
+            if shard_snapshots:
+                _backfill_industry_baselines(cursor)
+            set_meta(cursor, marker, int(time.time()))
+            imported += len(shard_defects) + len(shard_snapshots)
+
+    if imported:
+        print(f"Imported {imported} row(s) from {legacy_path}")
+
+
+def _day(created_ts):
+    return time.strftime("%Y-%m-%d", time.gmtime(created_ts))
+
+
+def _iso(created_ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(created_ts))
 
 
 # ---------------- PROJECT SNAPSHOT ----------------
 
-def insert_project_snapshot(session_id, industry, avg_complexity, avg_risk, delay_probability):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+ALL_TIME = "*"
+
+
+def _add_to_baseline(cursor, industry, day, avg_complexity, avg_risk):
+    has_risk = avg_risk is not None
+    risk = avg_risk if has_risk else 0.0
+
+    cursor.execute("""
+        INSERT INTO industry_baselines
+        (industry, day, snapshot_count, complexity_sum, complexity_sq_sum,
+         risk_count, risk_sum, risk_sq_sum)
+        VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+        ON CONFLICT(industry, day) DO UPDATE SET
+            snapshot_count = snapshot_count + 1,
+            complexity_sum = complexity_sum + excluded.complexity_sum,
+            complexity_sq_sum = complexity_sq_sum + excluded.complexity_sq_sum,
+            risk_count = risk_count + excluded.risk_count,
+            risk_sum = risk_sum + excluded.risk_sum,
+            risk_sq_sum = risk_sq_sum + excluded.risk_sq_sum
+    """, (
+        industry,
+        day,
+        avg_complexity,
+        avg_complexity * avg_complexity,
+        int(has_risk),
+        risk,
+        risk * risk
+    ))
+
 
+def _insert_project_snapshot(cursor, session_id, industry, avg_complexity, avg_risk,
+                             delay_probability, created_ts):
     cursor.execute("""
         INSERT INTO project_snapshots
-        (session_id, industry, avg_complexity, avg_risk, delay_probability, created_at)
+        (session_id, industry, avg_complexity, avg_risk, delay_probability, created_ts)
         VALUES (?, ?, ?, ?, ?, ?)
     """, (
         session_id,
@@ -53,85 +278,298 @@ def insert_project_snapshot(session_id, industry, avg_complexity, avg_risk, dela
         avg_complexity,
         avg_risk,
         delay_probability,
-        datetime.utcnow().isoformat()
+        created_ts
     ))
 
-    conn.commit()
-    conn.close()
+    for day in (ALL_TIME, _day(created_ts)):
+        _add_to_baseline(cursor, industry, day, avg_complexity, avg_risk)
+
 
+def insert_project_snapshot(session_id, industry, avg_complexity, avg_risk, delay_probability,
+                            wait=True):
+    """
+    Record a project snapshot and add it to the industry baselines. With
+    ``wait=False`` the write is queued and a Future is returned instead.
+    """
+    future = writer(shard_path(DB_NAME, session_id)).submit(
+        _insert_project_snapshot, session_id, industry, avg_complexity, avg_risk,
+        delay_probability, int(time.time())
+    )
+    return future.result() if wait else future
 
-def get_industry_baseline(industry):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
 
+def _backfill_industry_baselines(cursor):
+    cursor.execute("DELETE FROM industry_baselines")
     cursor.execute("""
-        SELECT AVG(avg_complexity), AVG(avg_risk)
+        SELECT industry, created_ts, avg_complexity, avg_risk
         FROM project_snapshots
-        WHERE industry = ?
-    """, (industry,))
+        WHERE industry IS NOT NULL AND avg_complexity IS NOT NULL
+    """)
+    for industry, created_ts, avg_complexity, avg_risk in cursor.fetchall():
+        for day in (ALL_TIME, "" if created_ts is None else _day(created_ts)):
+            _add_to_baseline(cursor, industry, day, avg_complexity, avg_risk)
+
+
+def backfill_industry_baselines():
+    """Rebuild industry_baselines from the project_snapshots table."""
+    for path in shard_paths(DB_NAME):
+        with transaction(path) as cursor:
+            _backfill_industry_baselines(cursor)
+
+
+def _stddev(total, sq_total, count):
+    if not count:
+        return None
+    mean = total / count
+    return math.sqrt(max(0.0, sq_total / count - mean * mean))
+
+
+def _baseline_sums(path, industry, since):
+    cursor = get_connection(path).cursor()
+
+    if since is None:
+        cursor.execute("""
+            SELECT snapshot_count, complexity_sum, complexity_sq_sum,
+                   risk_count, risk_sum, risk_sq_sum
+            FROM industry_baselines
+            WHERE industry = ? AND day = ?
+        """, (industry, ALL_TIME))
+    else:
+        cursor.execute("""
+            SELECT SUM(snapshot_count), SUM(complexity_sum), SUM(complexity_sq_sum),
+                   SUM(risk_count), SUM(risk_sum), SUM(risk_sq_sum)
+            FROM industry_baselines
+            WHERE industry = ? AND day != ? AND day >= ?
+        """, (industry, ALL_TIME, since))
 
-    row = cursor.fetchone()
-    conn.close()
+    return cursor.fetchone()
 
-    if row and row[0] is not None:
+
+def get_industry_baseline(industry, window_days=None):
+    """
+    Mean (and standard deviation) of the industry's snapshots, read from the
+    running sums of every shard. With ``window_days`` only the last N daily
+    buckets count.
+    """
+    since = None
+    if window_days is not None:
+        since = (datetime.utcnow() - timedelta(days=window_days - 1)).date().isoformat()
+
+    totals = [0, 0.0, 0.0, 0, 0.0, 0.0]
+    for path in shard_paths(DB_NAME):
+        row = _baseline_sums(path, industry, since)
+        if row and row[0]:
+            totals = [total + (value or 0) for total, value in zip(totals, row)]
+
+    count, complexity_sum, complexity_sq_sum, risk_count, risk_sum, risk_sq_sum = totals
+    if count:
         return {
-            "avg_complexity": row[0],
-            "avg_risk": row[1]
+            "avg_complexity": complexity_sum / count,
+            "avg_risk": risk_sum / risk_count if risk_count else None,
+            "complexity_stddev": _stddev(complexity_sum, complexity_sq_sum, count),
+            "risk_stddev": _stddev(risk_sum, risk_sq_sum, risk_count),
+            "sample_size": count
         }
 
     return None
 
 
+def compare_with_baseline(industry, avg_complexity, avg_risk, window_days=None):
+    """The industry baseline plus this project's deltas against it, or None."""
+    baseline = get_industry_baseline(industry, window_days)
+    if baseline is None:
+        return None
+
+    baseline["complexity_delta"] = round(avg_complexity - baseline["avg_complexity"], 2)
+    baseline["risk_delta"] = (
+        round(avg_risk - baseline["avg_risk"], 2)
+        if avg_risk is not None and baseline["avg_risk"] is not None
+        else None
+    )
+    return baseline
+
+
 # ---------------- DEFECT ANALYTICS ----------------
 
-def insert_defect(session_id, industry, module_name, severity):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+# Trend rollup bucket widths in seconds.
+ROLLUP_RESOLUTIONS = {"hour": 3600, "day": 86400}
 
-    cursor.execute("""
+
+def _insert_defects(cursor, defects):
+    created_ts = int(time.time())
+
+    cursor.executemany("""
         INSERT INTO defects
-        (session_id, industry, module_name, severity, created_at)
+        (session_id, industry, module_name, severity, created_ts)
         VALUES (?, ?, ?, ?, ?)
-    """, (
-        session_id,
-        industry,
-        module_name,
-        severity,
-        datetime.utcnow().isoformat()
-    ))
+    """, [
+        (session_id, industry, module_name, severity, created_ts)
+        for session_id, industry, module_name, severity in defects
+    ])
 
-    conn.commit()
-    conn.close()
+    counts = {}
+    rollups = {}
+    for session_id, industry, module_name, severity in defects:
+        key = (session_id, module_name or "", severity or "")
+        counts[key] = counts.get(key, 0) + 1
 
+        for width in ROLLUP_RESOLUTIONS.values():
+            bucket_key = (session_id, width, created_ts - created_ts % width,
+                          industry or "", module_name or "", severity or "")
+            rollups[bucket_key] = rollups.get(bucket_key, 0) + 1
 
-def get_defect_dashboard(session_id):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    cursor.executemany("""
+        INSERT INTO defect_counters (session_id, module_name, severity, count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(session_id, module_name, severity) DO UPDATE SET
+            count = count + excluded.count
+    """, [key + (count,) for key, count in counts.items()])
 
-    # Total defects
-    cursor.execute("""
-        SELECT COUNT(*) FROM defects WHERE session_id = ?
-    """, (session_id,))
-    total_defects = cursor.fetchone()[0]
+    cursor.executemany("""
+        INSERT INTO defect_rollups
+        (session_id, resolution, bucket, industry, module_name, severity, count)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(session_id, resolution, bucket, industry, module_name, severity)
+        DO UPDATE SET count = count + excluded.count
+    """, [key + (count,) for key, count in rollups.items()])
 
-    # High severity defects
-    cursor.execute("""
-        SELECT COUNT(*) FROM defects
-        WHERE session_id = ? AND severity = 'HIGH'
-    """, (session_id,))
-    high_severity = cursor.fetchone()[0]
 
-    # Most affected module
+def insert_defect(session_id, industry, module_name, severity):
+    writer(shard_path(DB_NAME, session_id)).write(
+        _insert_defects, [(session_id, industry, module_name, severity)]
+    )
+
+
+def insert_defects(defects):
+    """
+    Insert many ``(session_id, industry, module_name, severity)`` tuples and
+    their counter updates in a single transaction per shard.
+    """
+    if not defects:
+        return
+    write_sharded(DB_NAME, defects, lambda defect: defect[0], _insert_defects)
+
+
+def _backfill_defect_counters(cursor):
+    cursor.execute("DELETE FROM defect_counters")
     cursor.execute("""
-        SELECT module_name, COUNT(*) as count
+        INSERT INTO defect_counters (session_id, module_name, severity, count)
+        SELECT session_id, COALESCE(module_name, ''), COALESCE(severity, ''), COUNT(*)
         FROM defects
+        WHERE session_id IS NOT NULL
+        GROUP BY session_id, COALESCE(module_name, ''), COALESCE(severity, '')
+    """)
+
+
+def backfill_defect_counters():
+    """Rebuild defect_counters from the defects table."""
+    for path in shard_paths(DB_NAME):
+        with transaction(path) as cursor:
+            _backfill_defect_counters(cursor)
+
+
+def _backfill_defect_rollups(cursor):
+    cursor.execute("DELETE FROM defect_rollups")
+    for width in ROLLUP_RESOLUTIONS.values():
+        cursor.execute("""
+            INSERT INTO defect_rollups
+            (session_id, resolution, bucket, industry, module_name, severity, count)
+            SELECT session_id, ?, created_ts - created_ts % ?,
+                   COALESCE(industry, ''), COALESCE(module_name, ''),
+                   COALESCE(severity, ''), COUNT(*)
+            FROM defects
+            WHERE session_id IS NOT NULL AND created_ts IS NOT NULL
+            GROUP BY 1, 2, 3, 4, 5, 6
+        """, (width, width))
+
+
+def backfill_defect_rollups():
+    """Rebuild defect_rollups from the defects table."""
+    for path in shard_paths(DB_NAME):
+        with transaction(path) as cursor:
+            _backfill_defect_rollups(cursor)
+
+
+def get_defect_trends(session_id, days=90, resolution="day", module_name=None, severity=None):
+    """
+    A session's defect counts per hour or day over the last ``days`` days,
+    read from defect_rollups. Only buckets with defects are listed, oldest
+    first, each broken down by module and severity.
+    """
+    width = ROLLUP_RESOLUTIONS.get(resolution)
+    if width is None:
+        raise ValueError(f"Unknown resolution {resolution!r}")
+
+    now = int(time.time())
+    until = now - now % width + width
+    since = until - days * 86400
+
+    sql = """
+        SELECT bucket, module_name, severity, SUM(count)
+        FROM defect_rollups
+        WHERE session_id = ? AND resolution = ? AND bucket >= ? AND bucket < ?
+    """
+    params = [session_id, width, since, until]
+    if module_name is not None:
+        sql += " AND module_name = ?"
+        params.append(module_name)
+    if severity is not None:
+        sql += " AND severity = ?"
+        params.append(severity)
+    sql += " GROUP BY bucket, module_name, severity ORDER BY bucket"
+
+    cursor = get_connection(shard_path(DB_NAME, session_id)).cursor()
+    cursor.execute(sql, params)
+
+    buckets = []
+    total = 0
+    for bucket, module, level, count in cursor.fetchall():
+        if not buckets or buckets[-1]["timestamp"] != bucket:
+            buckets.append({
+                "timestamp": bucket,
+                "start": _iso(bucket),
+                "total": 0,
+                "modules": {},
+                "severities": {}
+            })
+        entry = buckets[-1]
+        entry["total"] += count
+        entry["modules"][module] = entry["modules"].get(module, 0) + count
+        entry["severities"][level] = entry["severities"].get(level, 0) + count
+        total += count
+
+    return {
+        "session_id": session_id,
+        "resolution": resolution,
+        "since": _iso(since),
+        "until": _iso(until),
+        "total_defects": total,
+        "buckets": buckets
+    }
+
+
+def get_defect_dashboard(session_id):
+    cursor = get_connection(shard_path(DB_NAME, session_id)).cursor()
+
+    # One row per (module, severity) the session has defects in
+    cursor.execute("""
+        SELECT module_name, severity, count
+        FROM defect_counters
         WHERE session_id = ?
-        GROUP BY module_name
-        ORDER BY count DESC
-        LIMIT 1
     """, (session_id,))
-    row = cursor.fetchone()
-    hotspot_module = row[0] if row else None
+
+    total_defects = 0
+    high_severity = 0
+    per_module = {}
+    for module_name, severity, count in cursor.fetchall():
+        total_defects += count
+        if severity == "HIGH":
+            high_severity += count
+        module_name = module_name or None
+        per_module[module_name] = per_module.get(module_name, 0) + count
+
+    # Most affected module
+    hotspot_module = max(per_module, key=per_module.get) if per_module else None
 
     # Release readiness calculation
     if total_defects == 0:
@@ -146,12 +584,24 @@ def get_defect_dashboard(session_id):
     if readiness_score < 75:
         release_status = "NOT READY"
 
-    conn.close()
-
     return {
         "total_bugs_detected": total_defects,
         "high_severity_bugs": high_severity,
         "most_affected_module": hotspot_module,
         "release_readiness_score": readiness_score,
         "release_status": release_status
-    }
\ No newline at end of file
+    }
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["backfill"]:
+        init_analytics_db()
+        backfill_defect_counters()
+        backfill_defect_rollups()
+        backfill_industry_baselines()
+        print("defect_counters, defect_rollups and industry_baselines rebuilt")
+    elif len(sys.argv) == 3 and sys.argv[1] == "import":
+        init_analytics_db()
+        import_legacy_db(sys.argv[2])
+    else:
+        print("usage: python -m ai_core.analytics_db backfill | import <legacy analytics.db>")
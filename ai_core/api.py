@@ -1,19 +1,57 @@
-from fastapi import FastAPI, UploadFile, File
+from contextlib import asynccontextmanager
+from typing import Any, List, Literal, Optional
+import asyncio
+import hashlib
+import shutil
+import tempfile
+import zipfile
+
+from fastapi import Body, FastAPI, HTTPException, Query, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from PIL import Image
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
 import numpy as np
-import io
+import json
 
 from .memory_db import init_db
+from . import settings
 from .analytics_db import (
     init_analytics_db,
     insert_defect,
-    get_defect_dashboard
+    insert_defects,
+    get_defect_dashboard,
+    get_defect_trends,
+    insert_project_snapshot,
+    compare_with_baseline
 )
+from .baselines import compare_with_registered, find_baseline, register_baseline
 from .brain import LavendrixBrain
-
-app = FastAPI(title="Lavendrix AI Core")
+from .engines.pm_engine import PMEngine
+from .engines.QA_engine import QnAEngine
+from .engines.test_cases_engine import TestCaseEngine
+from .extraction_cache import extraction_cache
+from .file_processor import FileProcessor, shutdown_pdf_pool
+from .knowledge import pack_stats
+from .response_cache import response_cache
+from .screenshot_archive import group_uploads, read_archive
+from .storage import ShardWriteError, close_all, writer_stats
+from .vision import classify, compare_bytes
+from .workers import PoolBusy, WorkerPool
+
+
+@asynccontextmanager
+async def lifespan(app):
+    brain.sessions.start()
+    yield
+    # Write out sessions still inside the durability window before exiting.
+    brain.sessions.close()
+    vision_pool.shutdown()
+    shutdown_pdf_pool()
+    close_all()
+
+
+app = FastAPI(title="Lavendrix AI Core", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +67,15 @@ init_db()
 init_analytics_db()
 
 brain = LavendrixBrain()
+test_engine = TestCaseEngine()
+pm_engine = PMEngine()
+qa_engine = QnAEngine()
+
+vision_pool = WorkerPool(
+    settings.VISION_POOL_KIND,
+    settings.VISION_POOL_SIZE,
+    settings.VISION_QUEUE_LIMIT
+)
 
 
 # ---------------- REQUEST MODELS ----------------
@@ -41,6 +88,18 @@ class TestCaseRequest(BaseModel):
     risk_level: str
 
 
+class TestCaseItem(BaseModel):
+    feature: str
+    description: str
+    risk_level: str
+
+
+class TestCaseBatchRequest(BaseModel):
+    session_id: str
+    industry: str
+    features: List[TestCaseItem]
+
+
 class QnARequest(BaseModel):
     session_id: str
     industry: str
@@ -65,30 +124,80 @@ class DefectRequest(BaseModel):
 
 # ---------------- CORE ROUTES ----------------
 
+def _etag_response(request, payload):
+    """
+    JSON response with an ETag over its body. A GET or HEAD whose
+    If-None-Match already names it gets 304. The POST routes ignore
+    If-None-Match: their history writes have already run, so the tag only
+    tells clients whether the result changed. Clients that just want to
+    revalidate an analysis use the GET routes, which write nothing.
+    """
+    body = json.dumps(payload).encode("utf-8")
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    if request.method in ("GET", "HEAD"):
+        known = [
+            tag.strip().removeprefix("W/")
+            for tag in request.headers.get("if-none-match", "").split(",")
+        ]
+        if etag in known or "*" in known:
+            return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
 @app.post("/generate-testcases")
-def generate_testcases(data: TestCaseRequest):
-    return brain.generate_testcases(
+def generate_testcases(data: TestCaseRequest, request: Request):
+    return _etag_response(request, brain.generate_testcases(
         data.session_id,
         data.industry,
         data.feature,
         data.description,
         data.risk_level
+    ))
+
+
+@app.get("/generate-testcases")
+def get_testcases(industry: str, feature: str, description: str, risk_level: str,
+                  request: Request):
+    """The /generate-testcases analysis, without recording it in a session."""
+    return _etag_response(request, brain.testcase_analysis(
+        industry, feature, description, risk_level
+    ))
+
+
+@app.post("/generate-testcases/batch")
+def generate_testcases_batch(data: TestCaseBatchRequest, request: Request):
+    """
+    /generate-testcases for a whole backlog: results come back in input
+    order and the session history for all of them is written at once.
+    """
+    results = brain.generate_testcases_many(
+        data.session_id,
+        data.industry,
+        [(item.feature, item.description, item.risk_level) for item in data.features]
     )
+    return _etag_response(request, {"count": len(results), "results": results})
 
 
 @app.post("/generate-qa")
-def generate_qa(data: QnARequest):
-    return brain.generate_qa(
+def generate_qa(data: QnARequest, request: Request):
+    return _etag_response(request, brain.generate_qa(
         data.session_id,
         data.industry,
         data.question,
         data.difficulty
-    )
+    ))
+
+
+@app.get("/generate-qa")
+def get_qa(industry: str, question: str, difficulty: str, request: Request):
+    """The /generate-qa analysis, without recording it in a session."""
+    return _etag_response(request, brain.qa_analysis(industry, question, difficulty))
 
 
 @app.post("/generate-pm")
-def generate_pm(data: PMRequest):
-    return brain.generate_pm(
+def generate_pm(data: PMRequest, request: Request):
+    result = brain.generate_pm(
         data.session_id,
         data.industry,
         data.description,
@@ -96,12 +205,59 @@ def generate_pm(data: PMRequest):
         data.team_size
     )
 
+    analysis = result["analysis"]
+    avg_complexity = analysis["complexity_score"]
+    avg_risk = brain.session_avg_risk(data.session_id)
+
+    # Compare against the industry before this project joins its baseline
+    baselines = {"all_time": compare_with_baseline(data.industry, avg_complexity, avg_risk)}
+    for days in settings.BASELINE_WINDOWS_DAYS:
+        baselines[f"last_{days}_days"] = compare_with_baseline(
+            data.industry, avg_complexity, avg_risk, window_days=days
+        )
+
+    # Analytics only: queue the snapshot without waiting for the commit.
+    insert_project_snapshot(
+        data.session_id,
+        data.industry,
+        avg_complexity,
+        avg_risk,
+        round(100 - analysis["delivery_probability_percent"], 2),
+        wait=False
+    )
+
+    result["industry_baseline"] = baselines
+    return _etag_response(request, result)
+
+
+@app.get("/generate-pm")
+def get_pm(industry: str, description: str, request: Request,
+           timeline_weeks: int = Query(..., ge=1), team_size: int = Query(..., ge=1)):
+    """
+    The /generate-pm feasibility analysis, without the session's baseline
+    comparison or an analytics snapshot.
+    """
+    return _etag_response(request, brain.generate_pm(
+        None, industry, description, timeline_weeks, team_size
+    ))
+
 
 @app.get("/")
 def root():
     return {"message": "Lavendrix AI Brain Running"}
 
 
+@app.get("/metrics")
+def metrics():
+    return {
+        "extraction_cache": extraction_cache.stats(),
+        "knowledge_packs": pack_stats(),
+        "response_cache": response_cache.stats(),
+        "vision_pool": vision_pool.stats(),
+        "write_queues": writer_stats()
+    }
+
+
 # ---------------- DEFECT MANAGEMENT ----------------
 
 @app.post("/log-defect")
@@ -115,54 +271,240 @@ def log_defect(data: DefectRequest):
     return {"status": "Defect logged successfully"}
 
 
+def _parse_defect(index, item):
+    """Validate one bulk item; returns (row, status) with row None if rejected."""
+    try:
+        if not isinstance(item, dict):
+            raise ValueError("expected a JSON object")
+        defect = DefectRequest(**item)
+    except ValidationError as e:
+        error = "; ".join(
+            f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+            for err in e.errors()
+        )
+        return None, {"index": index, "status": "rejected", "error": error}
+    except ValueError as e:
+        return None, {"index": index, "status": "rejected", "error": str(e)}
+
+    row = (defect.session_id, defect.industry, defect.module_name, defect.severity)
+    return row, {"index": index, "status": "logged"}
+
+
+def _write_defects(batch):
+    """
+    Insert the rows of ``(row, status)`` pairs. When some shards fail the
+    others have still committed, so only the failed shards' items are
+    marked "failed" for the client to retry.
+    """
+    try:
+        insert_defects([row for row, _ in batch])
+    except ShardWriteError as e:
+        failed = {id(row) for row in e.failed_items}
+        for row, status in batch:
+            if id(row) in failed:
+                status.update(status="failed", error="storage write failed; retry this item")
+
+
+def _bulk_summary(results):
+    counts = {"logged": 0, "rejected": 0, "failed": 0}
+    for r in results:
+        counts[r["status"]] += 1
+    counts["results"] = results
+    return counts
+
+
+@app.post("/log-defects")
+def log_defects(items: List[Any] = Body(...)):
+    rows, results = [], []
+    for index, item in enumerate(items):
+        row, status = _parse_defect(index, item)
+        results.append(status)
+        if row:
+            rows.append((row, status))
+
+    _write_defects(rows)
+    return _bulk_summary(results)
+
+
+@app.post("/log-defects/ndjson")
+async def log_defects_ndjson(request: Request):
+    """
+    Stream of newline-delimited DefectRequest objects. Lines are written in
+    transactions of settings.DEFECT_INGEST_BATCH rows as they arrive; a line
+    longer than settings.DEFECT_INGEST_MAX_LINE_BYTES aborts the request with
+    413 (batches written before it are kept).
+    """
+    rows, results = [], []
+    buffer = b""
+    index = 0
+
+    def check_length(line):
+        if len(line) > settings.DEFECT_INGEST_MAX_LINE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Line {index} exceeds {settings.DEFECT_INGEST_MAX_LINE_BYTES} bytes"
+            )
+
+    async def parse_line(line):
+        nonlocal index, rows
+        check_length(line)
+        if not line.strip():
+            return
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            row, status = None, {"index": index, "status": "rejected", "error": str(e)}
+        else:
+            row, status = _parse_defect(index, item)
+        index += 1
+        results.append(status)
+        if row:
+            rows.append((row, status))
+        if len(rows) >= settings.DEFECT_INGEST_BATCH:
+            batch, rows = rows, []
+            await run_in_threadpool(_write_defects, batch)
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            await parse_line(line)
+        # Don't keep buffering a line that can no longer be accepted.
+        check_length(buffer)
+    await parse_line(buffer)
+
+    await run_in_threadpool(_write_defects, rows)
+    return _bulk_summary(results)
+
+
 @app.get("/defect-dashboard/{session_id}")
 def defect_dashboard(session_id: str):
     return get_defect_dashboard(session_id)
 
 
+@app.get("/defect-trends/{session_id}")
+def defect_trends(
+    session_id: str,
+    days: int = Query(90, ge=1, le=3660),
+    resolution: Literal["hour", "day"] = "day",
+    module_name: Optional[str] = None,
+    severity: Optional[str] = None
+):
+    return get_defect_trends(session_id, days, resolution, module_name, severity)
+
+
 # ---------------- VISION-BASED UI QA ----------------
 
+@app.post("/baselines")
+async def upload_baseline(
+    industry: str,
+    module_name: str,
+    session_id: Optional[str] = None,
+    baseline: UploadFile = File(...)
+):
+    """
+    Register the reference screenshot for a module. Baselines are scoped to
+    the session when session_id is given, otherwise to the industry.
+    """
+    try:
+        meta = await vision_pool.run(
+            register_baseline, session_id or industry, module_name, await baseline.read()
+        )
+    except PoolBusy as e:
+        raise HTTPException(status_code=503, detail=f"Vision workers busy: {e}")
+
+    meta.pop("array_path")
+    meta.pop("thumbnail")
+    return {"status": "Baseline registered", "baseline": meta}
+
+
+async def _compare_screenshot(session_id, industry, module_name, current_bytes,
+                              baseline_bytes=None, wait=False, **options):
+    # Decoding and diffing are CPU-bound; keep them off the event loop.
+    # With ``wait`` a full pool is waited on instead of raising PoolBusy.
+    run = vision_pool.run_when_free if wait else vision_pool.run
+    if baseline_bytes is not None:
+        result = await run(compare_bytes, baseline_bytes, current_bytes, **options)
+        result["method"] = "pixel_diff"
+        return result
+
+    meta = find_baseline(module_name, session_id, industry)
+    if meta is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No baseline uploaded or registered for module '{module_name}'"
+        )
+    return await run(compare_with_registered, meta, current_bytes, **options)
+
+
+def _precision_options(precision, coarse_factor, escalation_margin):
+    options = {}
+    if precision is not None:
+        options["precision"] = precision
+    if coarse_factor is not None:
+        options["coarse_factor"] = coarse_factor
+    if escalation_margin is not None:
+        options["margin"] = escalation_margin
+    return options
+
+
+def _visual_analysis(result):
+    difference_percent = float(round(result["difference_percent"], 2))
+    similarity_percent = float(round(max(0, 100 - result["difference_percent"]), 2))
+
+    regression_flag, severity = classify(difference_percent)
+
+    return {
+        "similarity_percent": round(similarity_percent, 2),
+        "difference_percent": round(difference_percent, 2),
+        "visual_regression_detected": regression_flag,
+        "regression_severity": severity,
+        "comparison_method": result["method"],
+        "resolution": result["resolution"],
+        "escalated_to_full_resolution": result["escalated"],
+        "changed_regions": result["changed_regions"],
+        "tile_size": result["tile_size"],
+        "tile_difference_percent": np.round(result["tile_scores"], 2).tolist()
+    }
+
+
 @app.post("/compare-ui")
 async def compare_ui(
     session_id: str,
     industry: str,
     module_name: str,
-    baseline: UploadFile = File(...),
-    current: UploadFile = File(...)
+    baseline: Optional[UploadFile] = File(None),
+    current: UploadFile = File(...),
+    precision: Optional[Literal["full", "adaptive", "coarse"]] = None,
+    coarse_factor: Optional[int] = Query(None, ge=1, le=64),
+    escalation_margin: Optional[float] = Query(None, ge=0)
 ):
+    """
+    Compare a screenshot against the uploaded baseline or, when none is
+    uploaded, the registered one for (session_id, module_name) or
+    (industry, module_name).
+
+    ``precision`` trades accuracy for speed: "adaptive" diffs images
+    downsampled by ``coarse_factor`` and only re-diffs at full resolution
+    when the coarse score is within ``escalation_margin`` points of the
+    5/10/20% thresholds; "coarse" never escalates.
+    """
     try:
-        baseline_bytes = await baseline.read()
         current_bytes = await current.read()
+        baseline_bytes = await baseline.read() if baseline is not None else None
 
-        baseline_img = Image.open(io.BytesIO(baseline_bytes)).convert("RGB")
-        current_img = Image.open(io.BytesIO(current_bytes)).convert("RGB")
-
-        if baseline_img.size != current_img.size:
-            current_img =current_img.resize(baseline_img.size)
-
-        baseline_array = np.array(baseline_img)
-        current_array = np.array(current_img)
-
-        diff = np.abs(baseline_array - current_array)
-        diff_score = np.mean(diff)
-
-        similarity_percent = max(0, 100 - (diff_score / 255) * 100)
-        difference_percent = 100 - similarity_percent
-
-        similarity_percent = float(round(similarity_percent, 2))
-        difference_percent = float(round(difference_percent, 2))
-
-        regression_flag = bool(difference_percent > 5)
-
-        severity = "LOW"
-        if difference_percent > 20:
-         severity = "HIGH"
-        elif difference_percent > 10:
-         severity = "MEDIUM"
+        result = await _compare_screenshot(
+            session_id, industry, module_name, current_bytes, baseline_bytes,
+            **_precision_options(precision, coarse_factor, escalation_margin)
+        )
+        analysis = _visual_analysis(result)
+        regression_flag = analysis["visual_regression_detected"]
+        severity = analysis["regression_severity"]
 
         # 🔥 AUTO DEFECT LOGGING IF REGRESSION DETECTED
         if regression_flag:
-            insert_defect(
+            await run_in_threadpool(
+                insert_defect,
                 session_id=session_id,
                 industry=industry,
                 module_name=module_name,
@@ -174,14 +516,294 @@ async def compare_ui(
             message = f"Visual regression detected with {severity} severity."
 
         return {
-            "visual_analysis": {
-                "similarity_percent": round(similarity_percent, 2),
-                "difference_percent": round(difference_percent, 2),
-                "visual_regression_detected": regression_flag,
-                "regression_severity": severity
-            },
+            "visual_analysis": analysis,
             "summary": message
         }
 
+    except PoolBusy as e:
+        raise HTTPException(status_code=503, detail=f"Vision workers busy: {e}")
+
+    except HTTPException:
+        raise
+
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+
+async def _compare_batch_entry(session_id, industry, module_name, files, options):
+    try:
+        if "current" not in files:
+            raise ValueError("archive has a baseline but no current screenshot")
+
+        current_bytes = await run_in_threadpool(files["current"])
+        baseline_bytes = (
+            await run_in_threadpool(files["baseline"]) if "baseline" in files else None
+        )
+
+        # Other requests may be using the pool; wait for a free slot.
+        result = await _compare_screenshot(
+            session_id, industry, module_name, current_bytes, baseline_bytes,
+            wait=True, **options
+        )
+
+        return {"module_name": module_name, "status": "compared",
+                "visual_analysis": _visual_analysis(result)}
+
+    except HTTPException as e:
+        return {"module_name": module_name, "status": "error", "error": e.detail}
+    except Exception as e:
+        return {"module_name": module_name, "status": "error", "error": str(e)}
+
+
+async def _spool_upload(upload, max_size):
+    """Copy ``upload`` into a temporary file spooled in memory up to ``max_size``."""
+    # Keep our own copy: the upload is closed once the handler returns,
+    # while a streaming response may still be reading it.
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    await run_in_threadpool(shutil.copyfileobj, upload.file, spool)
+    spool.seek(0)
+    return spool
+
+
+@app.post("/compare-ui/batch")
+async def compare_ui_batch(
+    session_id: str,
+    industry: str,
+    archive: Optional[UploadFile] = File(None),
+    currents: Optional[List[UploadFile]] = File(None),
+    baselines: Optional[List[UploadFile]] = File(None),
+    precision: Optional[Literal["full", "adaptive", "coarse"]] = None,
+    coarse_factor: Optional[int] = Query(None, ge=1, le=64),
+    escalation_margin: Optional[float] = Query(None, ge=0)
+):
+    """
+    Compare a whole suite of screenshots in one request.
+
+    Send either a zip/tar ``archive`` (``<module>.png`` for current-only
+    entries, or ``<module>/current.png`` plus optional
+    ``<module>/baseline.png``), or ``currents`` and optional ``baselines``
+    file lists paired by file name. Entries without a baseline use the
+    registered one. Results stream back as NDJSON in completion order, and
+    each regression is logged as a defect before its line is sent, so a
+    client that disconnects early keeps what was found. ``precision``
+    options are as for /compare-ui.
+    """
+    options = _precision_options(precision, coarse_factor, escalation_margin)
+
+    if archive is not None:
+        spools = [await _spool_upload(archive, settings.VISION_ARCHIVE_SPOOL_BYTES)]
+        try:
+            entries = await run_in_threadpool(read_archive, spools[0], archive.filename)
+        except (ValueError, zipfile.BadZipFile) as e:
+            spools[0].close()
+            raise HTTPException(status_code=400, detail=str(e))
+    elif currents:
+        # The files share the archive's in-memory budget.
+        uploads = currents + (baselines or [])
+        max_size = max(1, settings.VISION_ARCHIVE_SPOOL_BYTES // len(uploads))
+        spools = [await _spool_upload(f, max_size) for f in uploads]
+        named = [(f.filename, spool) for f, spool in zip(uploads, spools)]
+        entries = group_uploads(named[:len(currents)], named[len(currents):])
+    else:
+        raise HTTPException(status_code=400, detail="Upload an archive or currents")
+
+    async def results():
+        window = vision_pool.size * 2
+        pending = set()
+        queue = iter(sorted(entries.items()))
+        compared = failed = regressions = 0
+
+        try:
+            while True:
+                for module_name, files in queue:
+                    pending.add(asyncio.ensure_future(
+                        _compare_batch_entry(
+                            session_id, industry, module_name, files, options
+                        )
+                    ))
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    line = task.result()
+                    if line["status"] == "compared":
+                        compared += 1
+                        analysis = line["visual_analysis"]
+                        if analysis["visual_regression_detected"]:
+                            regressions += 1
+                            await run_in_threadpool(
+                                insert_defect, session_id, industry,
+                                line["module_name"], analysis["regression_severity"]
+                            )
+                    else:
+                        failed += 1
+                    yield json.dumps(line) + "\n"
+
+            yield json.dumps({"summary": {
+                "compared": compared,
+                "failed": failed,
+                "regressions_detected": regressions
+            }}) + "\n"
+        finally:
+            for task in pending:
+                task.cancel()
+            for spool in spools:
+                spool.close()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+# ---------------- DOCUMENT ANALYSIS ----------------
+
+def _section_title(text):
+    for line in text.splitlines():
+        if line.strip():
+            return line.strip()[:80]
+    return ""
+
+
+def _analyze_section(index, text, industry, risk_level, difficulty,
+                     timeline_weeks, team_size):
+    title = _section_title(text)
+    return {
+        "section": index,
+        "title": title,
+        "characters": len(text),
+        "testcases": test_engine.generate(industry, title, text, risk_level),
+        "pm": pm_engine.generate(industry, text, timeline_weeks, team_size),
+        "qa": qa_engine.generate(industry, text, difficulty)
+    }
+
+
+class _DocumentAggregate:
+    """Running document-level figures over the sections analysed so far."""
+
+    def __init__(self):
+        self.sections = 0
+        self.characters = 0
+        self.complexity_sum = 0.0
+        self.max_risk_score = 0
+        self.delivery_sum = 0.0
+        self.min_delivery = None
+        self.risk_categories = {}
+        self.intents = {}
+        self.risks = set()
+
+    def add(self, result):
+        tests = result["testcases"]["analysis"]
+        pm = result["pm"]["analysis"]
+        intent = result["qa"]["analysis"]["intent_detected"]
+        delivery = pm["delivery_probability_percent"]
+
+        self.sections += 1
+        self.characters += result["characters"]
+        self.complexity_sum += tests["complexity_score"]
+        self.max_risk_score = max(self.max_risk_score, tests["risk_score"])
+        self.delivery_sum += delivery
+        self.min_delivery = delivery if self.min_delivery is None else min(self.min_delivery, delivery)
+        self.risk_categories[tests["risk_category"]] = self.risk_categories.get(tests["risk_category"], 0) + 1
+        self.intents[intent] = self.intents.get(intent, 0) + 1
+        self.risks.update(result["testcases"]["assistant_response"]["risks_identified"])
+
+    def to_dict(self):
+        if not self.sections:
+            return {"sections": 0, "characters": 0}
+        return {
+            "sections": self.sections,
+            "characters": self.characters,
+            "avg_complexity_score": round(self.complexity_sum / self.sections, 2),
+            "max_risk_score": self.max_risk_score,
+            "risk_categories": dict(self.risk_categories),
+            "avg_delivery_probability_percent": round(self.delivery_sum / self.sections, 2),
+            "min_delivery_probability_percent": self.min_delivery,
+            "intents": dict(self.intents),
+            "risks_identified": sorted(self.risks)
+        }
+
+
+def _stream_line(fmt, event, payload):
+    if fmt == "sse":
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+    return json.dumps(payload) + "\n"
+
+
+@app.post("/analyze-document")
+async def analyze_document(
+    session_id: str,
+    industry: str,
+    file: UploadFile = File(...),
+    risk_level: str = "medium",
+    difficulty: str = "medium",
+    timeline_weeks: int = Query(8, ge=1),
+    team_size: int = Query(5, ge=1),
+    section_chars: Optional[int] = Query(None, ge=200),
+    format: Literal["ndjson", "sse"] = "ndjson"
+):
+    """
+    Analyse an uploaded PDF, DOCX or text document section by section.
+
+    Text is extracted incrementally and split into sections of about
+    ``section_chars`` characters; the test-case, PM and QA engines run on
+    several sections at once. Each section's results stream back as soon as
+    they are ready (in completion order, tagged with the section index)
+    together with the rolling document aggregate, followed by a final
+    summary. ``format`` selects NDJSON lines or server-sent events.
+    """
+    max_chars = section_chars or settings.DOCUMENT_SECTION_CHARS
+
+    spool = await _spool_upload(file, settings.DOCUMENT_SPOOL_BYTES)
+    sections = FileProcessor.iter_sections(file.filename or "", spool, max_chars)
+
+    async def results():
+        aggregate = _DocumentAggregate()
+        pending = set()
+        index = 0
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < settings.DOCUMENT_SECTION_WINDOW:
+                    text = await run_in_threadpool(next, sections, None)
+                    if text is None:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(run_in_threadpool(
+                        _analyze_section, index, text, industry, risk_level,
+                        difficulty, timeline_weeks, team_size
+                    )))
+                    index += 1
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    result = task.result()
+                    aggregate.add(result)
+                    result["aggregate"] = aggregate.to_dict()
+                    yield _stream_line(format, "section", result)
+
+            yield _stream_line(format, "summary", {
+                "session_id": session_id,
+                "summary": aggregate.to_dict()
+            })
+        except Exception as e:
+            yield _stream_line(format, "error", {"error": str(e)})
+        finally:
+            for task in pending:
+                task.cancel()
+            try:
+                sections.close()
+            except ValueError:
+                # Still running in a worker thread after a client disconnect.
+                pass
+            spool.close()
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(results(), media_type=media_type)
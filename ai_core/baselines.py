@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from . import settings
+from .vision import (
+    compare_multiresolution,
+    hash_distance,
+    image_loader,
+    load_image,
+    perceptual_hash,
+    thumbnail,
+    thumbnail_difference
+)
+
+
+# ---------------- REGISTRY ----------------
+
+def _paths(scope, module_name):
+    # Hashed file names keep arbitrary scope/module strings out of the path.
+    key = hashlib.blake2b(f"{scope}\0{module_name}".encode("utf-8"), digest_size=16).hexdigest()
+    base = os.path.join(settings.BASELINE_DIR, key)
+    return base + ".npy", base + ".json"
+
+
+def register_baseline(scope, module_name, image_bytes):
+    """
+    Decode a baseline screenshot once and store it as an RGB ``.npy`` array
+    plus its perceptual hash and thumbnail, keyed by (scope, module_name).
+    Scope is a session id or an industry. Returns the stored metadata.
+    """
+    image = load_image(image_bytes)
+    array_path, meta_path = _paths(scope, module_name)
+    os.makedirs(settings.BASELINE_DIR, exist_ok=True)
+
+    meta = {
+        "scope": scope,
+        "module_name": module_name,
+        "width": image.width,
+        "height": image.height,
+        "phash": f"{perceptual_hash(image):016x}",
+        "thumbnail": thumbnail(image).hex(),
+        "updated_at": datetime.utcnow().isoformat()
+    }
+
+    # Write then rename so readers never see a half-written baseline.
+    tmp_array = array_path + ".tmp.npy"
+    np.save(tmp_array, np.asarray(image))
+    os.replace(tmp_array, array_path)
+
+    tmp_meta = meta_path + ".tmp"
+    with open(tmp_meta, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_meta, meta_path)
+
+    meta["array_path"] = array_path
+    return meta
+
+
+def find_baseline(module_name, *scopes):
+    """Metadata of the first registered baseline among ``scopes``, or None."""
+    for scope in scopes:
+        if not scope:
+            continue
+        array_path, meta_path = _paths(scope, module_name)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            continue
+        meta["array_path"] = array_path
+        return meta
+    return None
+
+
+# ---------------- COMPARISON ----------------
+
+def compare_with_registered(meta, current_bytes, tolerance=None, **options):
+    """
+    Compare an uploaded screenshot against a registered baseline.
+
+    When the perceptual hashes are within ``tolerance`` bits and the
+    thumbnails within settings.VISION_THUMBNAIL_TOLERANCE, the pixel diff is
+    skipped and the thumbnail difference is reported. Otherwise the baseline
+    is memory-mapped, so only the rows being diffed are read from disk.
+    """
+    if tolerance is None:
+        tolerance = settings.VISION_PHASH_TOLERANCE
+
+    current = load_image(current_bytes)
+    distance = hash_distance(perceptual_hash(current), int(meta["phash"], 16))
+    thumbnail_diff = thumbnail_difference(
+        thumbnail(current), bytes.fromhex(meta["thumbnail"])
+    )
+
+    if distance <= tolerance and thumbnail_diff <= settings.VISION_THUMBNAIL_TOLERANCE:
+        return {
+            "difference_percent": thumbnail_diff,
+            "tile_size": None,
+            "tile_scores": np.zeros((0, 0)),
+            "changed_regions": [],
+            "resolution": "thumbnail",
+            "escalated": False,
+            "method": "perceptual_hash",
+            "hash_distance": distance
+        }
+
+    baseline = np.load(meta["array_path"], mmap_mode="r")
+    result = compare_multiresolution(
+        image_loader(baseline), image_loader(current), **options
+    )
+    result["method"] = "pixel_diff"
+    result["hash_distance"] = distance
+    return result
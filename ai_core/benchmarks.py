@@ -0,0 +1,809 @@
+"""
+Micro-benchmarks for the AI core.
+
+Run one with ``python -m ai_core.benchmarks <name>`` (or no name to run all).
+Every benchmark works on throwaway databases in a temporary directory.
+"""
+import asyncio
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from . import analytics_db, memory_db, settings, storage, vision
+
+# Benchmarks never import a legacy analytics.db.
+analytics_db.LEGACY_DB_NAME = None
+
+
+def _rate(label, count, fn):
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {count / elapsed:>10.0f} req/s")
+    return count / elapsed
+
+
+# ---------------- STORAGE ----------------
+
+def _naive_testcase_roundtrip(db_name, session_id):
+    # The pre-pool storage path: one connection and one commit per statement.
+    conn = sqlite3.connect(db_name)
+    row = conn.execute(
+        "SELECT risk_history, complexity_history FROM sessions WHERE session_id = ?",
+        (session_id,)
+    ).fetchone()
+    conn.close()
+
+    risk = json.loads(row[0]) if row else []
+    complexity = json.loads(row[1]) if row else []
+    risk.append(5)
+    complexity.append(4.2)
+
+    conn = sqlite3.connect(db_name)
+    conn.execute("""
+        INSERT OR REPLACE INTO sessions
+        (session_id, risk_history, complexity_history,
+         project_context, conversation_count, last_intent)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (session_id, json.dumps(risk), json.dumps(complexity), "", 0, ""))
+    conn.commit()
+    conn.close()
+
+
+def _naive_log_defect(db_name, session_id):
+    conn = sqlite3.connect(db_name)
+    conn.execute("""
+        INSERT INTO defects
+        (session_id, industry, module_name, severity, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, (session_id, "FinTech", "checkout", "HIGH", "2024-01-01T00:00:00"))
+    conn.commit()
+    conn.close()
+
+
+def _create_naive_db(path, init):
+    # Same schema as the pooled database, but left in the default
+    # rollback-journal mode the old code ran with.
+    init()
+    storage.close_all()
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+
+
+def bench_storage(count=2000, sessions=50):
+    with tempfile.TemporaryDirectory() as tmp:
+        naive_memory = memory_db.DB_NAME = os.path.join(tmp, "naive_memory.db")
+        _create_naive_db(naive_memory, memory_db.init_db)
+        naive_analytics = analytics_db.DB_NAME = os.path.join(tmp, "naive_analytics.db")
+        _create_naive_db(naive_analytics, analytics_db.init_analytics_db)
+
+        memory_db.DB_NAME = os.path.join(tmp, "brain_memory.db")
+        analytics_db.DB_NAME = os.path.join(tmp, "analytics.db")
+        memory_db.init_db()
+        analytics_db.init_analytics_db()
+
+        def pooled_testcase(i):
+            memory_db.get_session(f"s{i % sessions}")
+            memory_db.append_history(f"s{i % sessions}", 5, 4.2)
+
+        print("--- /generate-testcases storage path ---")
+        _rate("before: connect per statement", count,
+              lambda i: _naive_testcase_roundtrip(naive_memory, f"s{i % sessions}"))
+        _rate("after: pooled WAL connection", count, pooled_testcase)
+
+        print("--- /log-defect storage path ---")
+        _rate("before: connect per statement", count,
+              lambda i: _naive_log_defect(naive_analytics, f"s{i % sessions}"))
+        _rate("after: pooled WAL connection", count,
+              lambda i: analytics_db.insert_defect(f"s{i % sessions}", "FinTech", "checkout", "HIGH"))
+
+        storage.close_all()
+
+
+# ---------------- SESSION HISTORY ----------------
+
+def bench_history(ages=(10, 1000, 10000), count=300):
+    """Per-request write cost as a session's history grows."""
+    with tempfile.TemporaryDirectory() as tmp:
+        memory_db.DB_NAME = os.path.join(tmp, "brain_memory.db")
+        memory_db.init_db()
+        conn = storage.get_connection(memory_db.DB_NAME)
+
+        for age in ages:
+            legacy_id, session_id = f"legacy-{age}", f"append-{age}"
+            history = [5] * age
+            with conn:
+                conn.execute(
+                    "INSERT INTO sessions (session_id, project_context) VALUES (?, '')",
+                    (legacy_id,)
+                )
+                for _ in range(age):
+                    memory_db._append_points(conn.cursor(), session_id, [(5, 4.2)])
+
+            def json_rewrite(i):
+                history.append(5)
+                with conn:
+                    conn.execute(
+                        "UPDATE sessions SET risk_history = ?, complexity_history = ? "
+                        "WHERE session_id = ?",
+                        (json.dumps(history), json.dumps(history), legacy_id)
+                    )
+
+            print(f"--- session with {age} points ---")
+            _rate("before: rewrite JSON history", count, json_rewrite)
+            _rate("after: append to history block", count,
+                  lambda i: memory_db.append_history(session_id, 5, 4.2))
+
+        storage.close_all()
+
+
+def bench_history_encoding(sizes=(100, 1000, 10000), count=200):
+    """Encode/decode time and bytes per point: JSON lists vs history blocks."""
+    for size in sizes:
+        points = [(i % 9 + 0.5, i / 7) for i in range(size)]
+        risk = [p[0] for p in points]
+        complexity = [p[1] for p in points]
+
+        as_json = (json.dumps(risk), json.dumps(complexity))
+        as_blob = memory_db.HISTORY_HEADER + memory_db.encode_points(points)
+
+        print(f"--- {size} points ---")
+        _rate("JSON encode", count, lambda i: (json.dumps(risk), json.dumps(complexity)))
+        _rate("JSON decode", count, lambda i: (json.loads(as_json[0]), json.loads(as_json[1])))
+        _rate("block encode", count, lambda i: memory_db.encode_points(points))
+        _rate("block decode (view)", count, lambda i: memory_db.decode_points(as_blob))
+        _rate("block decode (to lists)", count,
+              lambda i: memory_db.decode_points(as_blob).T.tolist())
+
+        json_bytes = sum(len(text.encode("utf-8")) for text in as_json)
+        print(f"{'bytes per point':<40} JSON {json_bytes / size:6.2f}   "
+              f"block {len(as_blob) / size:6.2f}")
+
+
+# ---------------- DEFECT DASHBOARD ----------------
+
+_LEGACY_DASHBOARD_QUERIES = (
+    "SELECT COUNT(*) FROM defects WHERE session_id = ?",
+    "SELECT COUNT(*) FROM defects WHERE session_id = ? AND severity = 'HIGH'",
+    """
+    SELECT module_name, COUNT(*) as count FROM defects WHERE session_id = ?
+    GROUP BY module_name ORDER BY count DESC LIMIT 1
+    """,
+)
+
+
+def _seed_defects(conn, total, sessions=2000, modules=40):
+    severities = ("LOW", "MEDIUM", "HIGH")
+    with conn:
+        conn.executemany("""
+            INSERT INTO defects
+            (session_id, industry, module_name, severity, created_at)
+            VALUES (?, 'FinTech', ?, ?, '2024-01-01T00:00:00')
+        """, (
+            (f"s{i % sessions}", f"module-{i % modules}", severities[i % 3])
+            for i in range(total)
+        ))
+
+
+def bench_dashboard(total=1_000_000, lookups=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        analytics_db.DB_NAME = os.path.join(tmp, "analytics.db")
+        conn = storage.get_connection(analytics_db.DB_NAME)
+        conn.execute("""
+            CREATE TABLE defects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT, industry TEXT,
+                module_name TEXT, severity TEXT, created_at TEXT
+            )
+        """)
+        _seed_defects(conn, total)
+        print(f"seeded {total} defects")
+
+        def legacy_dashboard(i):
+            for sql in _LEGACY_DASHBOARD_QUERIES:
+                conn.execute(sql, (f"s{i}",)).fetchall()
+
+        _rate("before: 3 queries, no index", 5, legacy_dashboard)
+
+        start = time.perf_counter()
+        analytics_db.init_analytics_db()
+        print(f"index + counter backfill took {time.perf_counter() - start:.1f}s")
+
+        _rate("3 queries, indexed", lookups, legacy_dashboard)
+        _rate("after: defect_counters lookup", lookups,
+              lambda i: analytics_db.get_defect_dashboard(f"s{i}"))
+        _rate("insert_defect (row + counter + rollups)", lookups,
+              lambda i: analytics_db.insert_defect(f"s{i}", "FinTech", "checkout", "HIGH"))
+
+        storage.close_all()
+
+
+def bench_trends(total=500_000, sessions=200, years=3, lookups=200):
+    """Defects per day per module over 90 days: ISO-text scan vs rollups."""
+    with tempfile.TemporaryDirectory() as tmp:
+        analytics_db.DB_NAME = os.path.join(tmp, "analytics.db")
+        conn = storage.get_connection(analytics_db.DB_NAME)
+        conn.execute("""
+            CREATE TABLE defects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT, industry TEXT,
+                module_name TEXT, severity TEXT, created_at TEXT
+            )
+        """)
+        now = time.time()
+        step = years * 365 * 86400 / total
+        severities = ("LOW", "MEDIUM", "HIGH")
+        with conn:
+            conn.executemany("""
+                INSERT INTO defects (session_id, industry, module_name, severity, created_at)
+                VALUES (?, 'FinTech', ?, ?, ?)
+            """, (
+                (f"s{i % sessions}", f"module-{i % 12}", severities[i % 3],
+                 time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now - i * step)))
+                for i in range(total)
+            ))
+        print(f"seeded {total} defects over {years} years")
+
+        since = time.strftime("%Y-%m-%d", time.gmtime(now - 90 * 86400))
+
+        def legacy_trend(i):
+            conn.execute("""
+                SELECT substr(created_at, 1, 10), module_name, COUNT(*) FROM defects
+                WHERE session_id = ? AND created_at >= ?
+                GROUP BY 1, 2
+            """, (f"s{i % sessions}", since)).fetchall()
+
+        _rate("before: scan ISO created_at", 5, legacy_trend)
+
+        start = time.perf_counter()
+        analytics_db.init_analytics_db()
+        print(f"timestamp migration + rollup backfill took {time.perf_counter() - start:.1f}s")
+
+        _rate("after: 90 days from daily rollups", lookups,
+              lambda i: analytics_db.get_defect_trends(f"s{i % sessions}", 90))
+        _rate("after: 3 years from daily rollups", lookups,
+              lambda i: analytics_db.get_defect_trends(f"s{i % sessions}", 3 * 365))
+        _rate("after: 7 days from hourly rollups", lookups,
+              lambda i: analytics_db.get_defect_trends(f"s{i % sessions}", 7, "hour"))
+        _rate("insert_defect (row + counter + rollups)", lookups,
+              lambda i: analytics_db.insert_defect(f"s{i}", "FinTech", "checkout", "HIGH"))
+
+        storage.close_all()
+
+
+# ---------------- VISUAL DIFF ----------------
+
+def _screenshot_pair(width, height):
+    baseline = Image.new("RGB", (width, height), (245, 245, 245))
+    current = baseline.copy()
+    current.paste((20, 20, 20), (width // 10, height // 10, width // 3, height // 4))
+    return baseline, current
+
+
+def _full_array_diff(baseline, current):
+    # The pre-tiling implementation (minus its uint8 wrap-around).
+    return np.mean(np.abs(np.array(baseline).astype(np.int16) - np.array(current)))
+
+
+def _peak_mb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def bench_vision(sizes=((1920, 1080), (3840, 2160)), repeat=5):
+    for width, height in sizes:
+        baseline, current = _screenshot_pair(width, height)
+        print(f"--- {width}x{height} ---")
+        for label, fn in (
+            ("before: full-image arrays", lambda: _full_array_diff(baseline, current)),
+            ("after: tiled compare_images", lambda: vision.compare_images(baseline, current)),
+        ):
+            peak = _peak_mb(fn)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            elapsed = (time.perf_counter() - start) / repeat
+            print(f"{label:<40} {elapsed * 1000:>8.1f} ms {peak:>8.1f} MB traced peak")
+
+
+# ---------------- EVENT LOOP UNDER VISION LOAD ----------------
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _png(image, fmt="PNG"):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+async def _probe_latency(client, stop, samples):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def _vision_load(api, kind, comparisons, files):
+    import httpx
+
+    from .workers import WorkerPool
+
+    api.vision_pool = WorkerPool(kind, 4, comparisons)
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up (starts worker processes) before measuring.
+        await client.post("/compare-ui", params={
+            "session_id": "bench", "industry": "IT", "module_name": "warmup"
+        }, files=files)
+
+        samples, stop = [], asyncio.Event()
+        probe = asyncio.create_task(_probe_latency(client, stop, samples))
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client.post("/compare-ui", params={
+                "session_id": "bench", "industry": "IT", "module_name": f"m{i}"
+            }, files=files)
+            for i in range(comparisons)
+        ))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe
+
+    api.vision_pool.shutdown()
+    print(f"{kind:<8} {comparisons} comparisons in {elapsed:5.2f}s   "
+          f"GET / during load: p50 {_percentile(samples, 50):7.1f} ms  "
+          f"p99 {_percentile(samples, 99):7.1f} ms  (n={len(samples)})")
+
+
+def bench_event_loop(comparisons=8, size=(1920, 1080)):
+    """JSON endpoint latency while screenshot comparisons are running."""
+    with tempfile.TemporaryDirectory() as tmp:
+        memory_db.DB_NAME = os.path.join(tmp, "brain_memory.db")
+        analytics_db.DB_NAME = os.path.join(tmp, "analytics.db")
+        from . import api
+
+        baseline, current = _screenshot_pair(*size)
+        files = {
+            "baseline": ("baseline.png", _png(baseline)),
+            "current": ("current.png", _png(current)),
+        }
+        for kind in ("inline", "thread", "process"):
+            asyncio.run(_vision_load(api, kind, comparisons, files))
+
+        storage.close_all()
+
+
+# ---------------- MULTI-RESOLUTION DIFF ----------------
+
+def _synthetic_screen(rng, width, height):
+    array = np.full((height, width, 3), 245, dtype=np.uint8)
+    for _ in range(rng.integers(5, 15)):
+        x, y = rng.integers(0, width - 50), rng.integers(0, height - 30)
+        w, h = rng.integers(50, width // 2), rng.integers(30, height // 3)
+        array[y:y + h, x:x + w] = rng.integers(0, 256, 3)
+    # Thin dark strokes standing in for text.
+    for _ in range(rng.integers(20, 60)):
+        x, y = rng.integers(0, width - 200), rng.integers(0, height - 2)
+        array[y:y + 2, x:x + rng.integers(40, 200)] = 30
+    return array
+
+
+def _synthetic_pair(rng, width, height, fmt):
+    baseline = _synthetic_screen(rng, width, height)
+    current = baseline.copy()
+    change = rng.integers(0, 4)
+    if change == 1:
+        # Recolour or add a few blocks.
+        for _ in range(rng.integers(1, 6)):
+            x, y = rng.integers(0, width - 50), rng.integers(0, height - 30)
+            w, h = rng.integers(50, width // 2), rng.integers(30, height // 2)
+            current[y:y + h, x:x + w] = rng.integers(0, 256, 3)
+    elif change == 2:
+        # Shift a region by a few pixels (text reflow).
+        top, bottom = sorted(rng.integers(0, height, 2))
+        current[top:bottom] = np.roll(baseline[top:bottom], rng.integers(1, 4), axis=1)
+    elif change == 3:
+        # Global brightness shift.
+        current = np.clip(
+            current.astype(np.int16) + rng.integers(-60, 60), 0, 255
+        ).astype(np.uint8)
+    return _png(Image.fromarray(baseline), fmt), _png(Image.fromarray(current), fmt)
+
+
+def bench_multiresolution(pairs=60, size=(1920, 1080), seed=7):
+    for fmt in ("PNG", "JPEG"):
+        rng = np.random.default_rng(seed)
+        corpus = [_synthetic_pair(rng, *size, fmt) for _ in range(pairs)]
+        _compare_precisions(corpus, f"{pairs} synthetic {size[0]}x{size[1]} {fmt} pairs")
+
+
+def _compare_precisions(corpus, label):
+    pairs = len(corpus)
+
+    timings, outcomes = {}, {}
+    for precision in ("full", "adaptive", "coarse"):
+        start = time.perf_counter()
+        outcomes[precision] = [
+            vision.compare_bytes(baseline, current, precision=precision)
+            for baseline, current in corpus
+        ]
+        timings[precision] = time.perf_counter() - start
+
+    full = [vision.classify(round(r["difference_percent"], 2)) for r in outcomes["full"]]
+    print(f"--- {label}, coarse factor {settings.VISION_COARSE_FACTOR}, "
+          f"margin {settings.VISION_ESCALATION_MARGIN}")
+    for precision in ("full", "adaptive", "coarse"):
+        results = outcomes[precision]
+        labels = [vision.classify(round(r["difference_percent"], 2)) for r in results]
+        disagreements = sum(a != b for a, b in zip(labels, full))
+        escalated = sum(r["escalated"] for r in results)
+        print(f"{precision:<9} {timings[precision] / pairs * 1000:7.1f} ms/pair  "
+              f"speedup {timings['full'] / timings[precision]:4.1f}x  "
+              f"escalated {escalated:3d}  "
+              f"classification disagreements {disagreements / pairs:6.1%}")
+
+
+# ---------------- PDF EXTRACTION ----------------
+
+def _text_pdf(pages, lines=40):
+    # A minimal PDF with one Helvetica text stream per page.
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        text = " ".join(
+            f"({page + 1}.{line} The system shall validate every request.) Tj 0 -14 Td"
+            for line in range(lines)
+        )
+        stream = f"BT /F1 10 Tf 40 800 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n").encode()
+    return bytes(out)
+
+
+def bench_pdf(page_counts=(10, 100, 1000), workers=4, limit=50_000):
+    """Serial vs parallel page extraction over generated PDFs."""
+    from .file_processor import FileProcessor, iter_pdf_pages, shutdown_pdf_pool
+
+    # Start the shared pool once, as a running server would have.
+    "".join(iter_pdf_pages(io.BytesIO(_text_pdf(8)), workers=workers, min_pages=0))
+
+    for pages in page_counts:
+        data = _text_pdf(pages)
+        timings = {}
+        for label, count in (("serial", 1), ("parallel", workers)):
+            start = time.perf_counter()
+            text = "".join(iter_pdf_pages(io.BytesIO(data), workers=count, min_pages=0))
+            timings[label] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        FileProcessor.extract_text("doc.pdf", data, limit=limit, cache=False)
+        limited = time.perf_counter() - start
+
+        print(f"{pages:>5} pages ({len(text):>9} chars)   "
+              f"serial {timings['serial']:7.2f}s   "
+              f"parallel x{workers} {timings['parallel']:7.2f}s   "
+              f"speedup {timings['serial'] / timings['parallel']:5.2f}x   "
+              f"first {limit} chars {limited:7.2f}s")
+
+    shutdown_pdf_pool()
+
+
+# ---------------- RULE MATCHING ----------------
+
+def _random_words(rng, count, low=4, high=10):
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    return ["".join(rng.choice(letters, rng.integers(low, high))) for _ in range(count)]
+
+
+def bench_rules(rule_counts=(10, 100, 1000, 5000), text_sizes=(1_000, 10_000, 100_000),
+                repeat=20, seed=3):
+    """Per-rule substring scans vs the compiled single-pass matcher."""
+    from .engines.rules import RuleMatcher
+
+    rng = np.random.default_rng(seed)
+    vocabulary = _random_words(rng, 5000)
+
+    for rules in rule_counts:
+        terms = _random_words(rng, rules, 5, 12)
+        start = time.perf_counter()
+        matcher = RuleMatcher(terms, scan_max_terms=0)
+        compile_ms = (time.perf_counter() - start) * 1000
+        print(f"{rules:>5} rules compiled in {compile_ms:8.1f} ms")
+
+        for size in text_sizes:
+            words = list(rng.choice(vocabulary + terms[:rules // 10 + 1], size // 6))
+            text = " ".join(words)[:size].upper()
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                lowered = text.lower()
+                naive = {term for term in terms if term in lowered}
+            naive_ms = (time.perf_counter() - start) / repeat * 1000
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                hits = matcher.find(text)
+            matcher_ms = (time.perf_counter() - start) / repeat * 1000
+
+            assert hits == naive
+            print(f"{rules:>5} rules {size:>7} chars   per-rule scans {naive_ms:8.3f} ms   "
+                  f"single pass {matcher_ms:8.3f} ms   ({len(hits)} hits)")
+
+
+# ---------------- BATCH SCORING ----------------
+
+def _backlog(rng, count):
+    vocabulary = _random_words(rng, 2000) + [
+        "fraud", "token", "compliance", "audit", "encryption", "integration", "payment"
+    ]
+    return [
+        (f"Feature {i}", " ".join(rng.choice(vocabulary, rng.integers(20, 200))),
+         str(rng.choice(["low", "medium", "high"])))
+        for i in range(count)
+    ]
+
+
+def bench_batch(features=500, seed=11):
+    """Per-feature engine calls and requests vs the batch APIs."""
+    from fastapi.testclient import TestClient
+
+    from .engines.pm_engine import PMEngine
+    from .engines.test_cases_engine import TestCaseEngine
+    from .response_cache import response_cache
+
+    rng = np.random.default_rng(seed)
+    backlog = _backlog(rng, features)
+
+    def timed(label, fn):
+        response_cache.clear()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<44} {features / elapsed:>10.0f} features/s")
+        return elapsed
+
+    engine, pm = TestCaseEngine(), PMEngine()
+    one = timed("TestCaseEngine.generate x N",
+                lambda: [engine.generate("FinTech", *item) for item in backlog])
+    many = timed("TestCaseEngine.generate_many",
+                 lambda: engine.generate_many("FinTech", backlog))
+    print(f"{'':<44} {one / many:>10.1f}x")
+    projects = [(description, 8, 4) for _, description, _ in backlog]
+    one = timed("PMEngine.generate x N",
+                lambda: [pm.generate("FinTech", *item) for item in projects])
+    many = timed("PMEngine.generate_many", lambda: pm.generate_many("FinTech", projects))
+    print(f"{'':<44} {one / many:>10.1f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory_db.DB_NAME = os.path.join(tmp, "brain_memory.db")
+        analytics_db.DB_NAME = os.path.join(tmp, "analytics.db")
+        from . import api
+
+        items = [
+            {"feature": f, "description": d, "risk_level": r} for f, d, r in backlog
+        ]
+        with TestClient(api.app) as client:
+            one = timed("POST /generate-testcases x N", lambda: [
+                client.post("/generate-testcases", json=dict(
+                    item, session_id="single", industry="FinTech"
+                ))
+                for item in items
+            ])
+            many = timed("POST /generate-testcases/batch", lambda: client.post(
+                "/generate-testcases/batch",
+                json={"session_id": "batch", "industry": "FinTech", "features": items}
+            ))
+            print(f"{'':<44} {one / many:>10.1f}x")
+
+        storage.close_all()
+
+
+# ---------------- WRITE QUEUE ----------------
+
+def _concurrent_writes(threads, per_thread, write):
+    import threading
+
+    latencies, errors = [], []
+
+    def worker(t):
+        for i in range(per_thread):
+            start = time.perf_counter()
+            try:
+                write(t, i)
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - start, latencies, errors
+
+
+def bench_writes(threads=32, per_thread=200):
+    """Defect logging from many threads: per-thread commits vs the write queue."""
+    with tempfile.TemporaryDirectory() as tmp:
+        analytics_db.DB_NAME = os.path.join(tmp, "analytics.db")
+        analytics_db.init_analytics_db()
+
+        def direct(t, i):
+            with storage.transaction(analytics_db.DB_NAME) as cursor:
+                analytics_db._insert_defects(cursor, [(f"s{t}", "IT", f"m{i % 10}", "HIGH")])
+
+        def queued(t, i):
+            analytics_db.insert_defect(f"s{t}", "IT", f"m{i % 10}", "HIGH")
+
+        for label, write in (("commit per request", direct), ("write queue", queued)):
+            elapsed, latencies, errors = _concurrent_writes(threads, per_thread, write)
+            print(f"{label:<20} {threads * per_thread / elapsed:>8.0f} writes/s   "
+                  f"p50 {_percentile(latencies, 50):7.2f} ms   "
+                  f"p99 {_percentile(latencies, 99):7.2f} ms   "
+                  f"locked errors {len(errors)}")
+
+        print(storage.writer_stats()[analytics_db.DB_NAME])
+        storage.close_all()
+
+
+# ---------------- SHARED SESSION STORE ----------------
+
+def _stress_worker(db_path, threads, ops, sessions):
+    import threading
+
+    from .brain import LavendrixBrain
+
+    memory_db.DB_NAME = db_path
+    brain = LavendrixBrain()
+    brain.sessions.start()
+
+    def run(t):
+        for i in range(ops):
+            session_id = f"shared-{i % sessions}"
+            brain.generate_testcases(session_id, "IT", "Login", f"token check {t} {i}", "high")
+            brain.generate_qa(session_id, "IT", f"How secure is the token flow {t} {i}?", "hard")
+
+    workers = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    brain.sessions.close()
+    storage.close_all()
+
+
+def bench_sessions(workers=4, threads=4, ops=200, sessions=3):
+    """N processes x M threads updating the same sessions: count lost updates."""
+    import multiprocessing
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "brain_memory.db")
+        memory_db.DB_NAME = db_path
+        memory_db.init_db()
+
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=_stress_worker, args=(db_path, threads, ops, sessions))
+            for _ in range(workers)
+        ]
+        start = time.perf_counter()
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        expected = workers * threads * ops
+        conn = storage.get_connection(db_path)
+        history_count, conversations = conn.execute(
+            "SELECT SUM(history_count), SUM(conversation_count) FROM sessions"
+        ).fetchone()
+        history_rows = conn.execute(
+            "SELECT SUM((LENGTH(points) - ?) / ?) FROM session_history_blocks",
+            (len(memory_db.HISTORY_HEADER), memory_db._POINT_BYTES)
+        ).fetchone()[0]
+        intents = conn.execute("SELECT SUM(count) FROM session_intents").fetchone()[0]
+
+        print(f"{workers} processes x {threads} threads, {2 * expected} updates "
+              f"in {elapsed:5.2f}s")
+        for label, value in (("history_count", history_count),
+                             ("stored history points", history_rows),
+                             ("conversation_count", conversations),
+                             ("intent counts", intents)):
+            status = "ok" if value == expected else f"LOST {expected - (value or 0)}"
+            print(f"  {label:<22} {value:>8} / {expected:<8} {status}")
+
+        storage.close_all()
+
+
+# ---------------- SHARDING ----------------
+
+def bench_shards(threads=16, per_thread=300, shard_counts=(1, 2, 4, 8)):
+    """Defect and session writes from many threads as the shard count grows."""
+    original = settings.STORAGE_SHARDS
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for shards in shard_counts:
+                settings.STORAGE_SHARDS = shards
+                analytics_db.DB_NAME = os.path.join(tmp, f"analytics-{shards}.db")
+                memory_db.DB_NAME = os.path.join(tmp, f"brain_memory-{shards}.db")
+                analytics_db.init_analytics_db()
+                memory_db.init_db()
+
+                def write(t, i):
+                    session_id = f"s{t}-{i % 20}"
+                    analytics_db.insert_defect(session_id, "IT", f"m{i % 10}", "HIGH")
+                    memory_db.append_history(session_id, 5, 4.2)
+
+                elapsed, latencies, _ = _concurrent_writes(threads, per_thread, write)
+                print(f"{shards} shard(s)  {threads * per_thread / elapsed:>8.0f} writes/s   "
+                      f"p50 {_percentile(latencies, 50):7.2f} ms   "
+                      f"p99 {_percentile(latencies, 99):7.2f} ms")
+
+                for i in range(200):
+                    analytics_db.insert_project_snapshot(f"p{i}", "IT", i % 7, i % 5, 0.2)
+                baseline = analytics_db.get_industry_baseline("IT")
+                assert baseline["sample_size"] == 200, baseline
+                storage.close_all()
+    finally:
+        settings.STORAGE_SHARDS = original
+
+
+BENCHMARKS = {
+    "storage": bench_storage,
+    "history": bench_history,
+    "dashboard": bench_dashboard,
+    "trends": bench_trends,
+    "vision": bench_vision,
+    "event_loop": bench_event_loop,
+    "multiresolution": bench_multiresolution,
+    "pdf": bench_pdf,
+    "rules": bench_rules,
+    "batch": bench_batch,
+    "writes": bench_writes,
+    "sessions": bench_sessions,
+    "history_encoding": bench_history_encoding,
+    "shards": bench_shards,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"\n=== {name} ===")
+        BENCHMARKS[name]()
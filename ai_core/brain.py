@@ -1,11 +1,26 @@
 import re
-from .memory_db import get_session, save_session
+
+import numpy as np
+
+from .engines.rules import BRAIN_INTENTS, match_terms
+from .memory_db import (
+    get_session,
+    record_history,
+    record_history_many,
+    record_question,
+    save_sessions,
+    take_session_changes
+)
+from .response_cache import memoize
+from .session_cache import SessionCache
 
 
 class LavendrixBrain:
 
     def __init__(self):
-        pass
+        self.sessions = SessionCache(
+            get_session, save_sessions, snapshot=take_session_changes
+        )
 
     # ---------------- CORE HELPERS ----------------
 
@@ -21,17 +36,18 @@ class LavendrixBrain:
         risk_map = {"low": 3, "medium": 5, "high": 8}
         return risk_map.get(risk_level.lower(), 5)
 
-    def _detect_intent(self, text):
-        text = text.lower()
-
-        if any(k in text for k in ["security", "authentication", "token", "fraud"]):
-            return "Security"
+    def session_avg_risk(self, session_id):
+        session = self.sessions.get(session_id)
+        if not session["history_count"]:
+            return None
+        return session["risk_sum"] / session["history_count"]
 
-        if any(k in text for k in ["audit", "compliance", "regulation"]):
-            return "Compliance"
+    def _detect_intent(self, text):
+        hits = match_terms(text)
 
-        if any(k in text for k in ["performance", "load", "scale", "latency"]):
-            return "Performance"
+        for intent, terms in BRAIN_INTENTS:
+            if hits & terms:
+                return intent
 
         return "Strategy"
 
@@ -39,26 +55,62 @@ class LavendrixBrain:
 
     def generate_testcases(self, session_id, industry, feature, description, risk_level):
 
-        session = get_session(session_id)
-
-        complexity = self._compute_complexity(description)
-        risk_score = self._risk_weight(risk_level)
-
-        session["risk_history"].append(risk_score)
-        session["complexity_history"].append(complexity)
-
-        save_session(
-            session_id,
-            session["risk_history"],
-            session["complexity_history"],
-            session["project_context"]
+        result = self._testcase_result(industry, feature, description, risk_level)
+        analysis = result["analysis"]
+
+        # The analysis may come from the cache; the history write always runs.
+        with self.sessions.edit(session_id) as session:
+            record_history(session, analysis["risk_score"], analysis["complexity_score"])
+
+        return result
+
+    def generate_testcases_many(self, session_id, industry, features):
+        """
+        generate_testcases for a batch of (feature, description, risk_level)
+        tuples. The batch's history points go into one session edit, so
+        they are written in a single transaction.
+        """
+        results = self._testcase_results(industry, features)
+
+        with self.sessions.edit(session_id) as session:
+            record_history_many(session, [
+                (r["analysis"]["risk_score"], r["analysis"]["complexity_score"])
+                for r in results
+            ])
+
+        return results
+
+    def testcase_analysis(self, industry, feature, description, risk_level):
+        """generate_testcases without the session history write."""
+        return self._testcase_result(industry, feature, description, risk_level)
+
+    @memoize("brain.testcases", exact=("industry", "feature", "risk_level"))
+    def _testcase_result(self, industry, feature, description, risk_level):
+        return self._testcase_results(industry, [(feature, description, risk_level)])[0]
+
+    def _testcase_results(self, industry, features):
+        # Tokenize each description once; score the batch as arrays.
+        tokens = [description.split() for _, description, _ in features]
+        word_counts = np.fromiter((len(t) for t in tokens), dtype=np.float64, count=len(tokens))
+        unique_counts = np.fromiter((len(set(t)) for t in tokens), dtype=np.float64, count=len(tokens))
+        complexity = (unique_counts / (word_counts + 1)) * 10
+
+        risk_scores = np.fromiter(
+            (self._risk_weight(risk_level) for _, _, risk_level in features),
+            dtype=np.int64, count=len(features)
         )
+        severities = np.select(
+            [risk_scores >= 7, risk_scores >= 5], ["HIGH", "MEDIUM"], default="LOW"
+        )
+
+        return [
+            self._testcase_report(industry, feature, round(c, 2), r, str(severity))
+            for (feature, _, _), c, r, severity in zip(
+                features, complexity.tolist(), risk_scores.tolist(), severities
+            )
+        ]
 
-        severity = "LOW"
-        if risk_score >= 7:
-            severity = "HIGH"
-        elif risk_score >= 5:
-            severity = "MEDIUM"
+    def _testcase_report(self, industry, feature, complexity, risk_score, severity):
 
         return {
             "analysis": {
@@ -79,19 +131,25 @@ class LavendrixBrain:
 
     def generate_qa(self, session_id, industry, question, difficulty):
 
-        session = get_session(session_id)
+        result = self._qa_result(industry, question, difficulty)
+        analysis = result["analysis"]
 
-        keywords = self._extract_keywords(question)
-        intent = self._detect_intent(question)
+        with self.sessions.edit(session_id) as session:
+            record_question(
+                session, question, analysis["keywords_detected"], analysis["intent_detected"]
+            )
 
-        session["project_context"] += " " + question
+        return result
 
-        save_session(
-            session_id,
-            session["risk_history"],
-            session["complexity_history"],
-            session["project_context"]
-        )
+    def qa_analysis(self, industry, question, difficulty):
+        """generate_qa without the session history write."""
+        return self._qa_result(industry, question, difficulty)
+
+    @memoize("brain.qa", exact=("industry", "difficulty"))
+    def _qa_result(self, industry, question, difficulty):
+
+        keywords = self._extract_keywords(question)
+        intent = self._detect_intent(question)
 
         return {
             "analysis": {
@@ -109,6 +167,7 @@ class LavendrixBrain:
 
     # ---------------- PM ENGINE ----------------
 
+    @memoize("brain.pm", ignore=("session_id",), exact=("industry",))
     def generate_pm(self, session_id, industry, description, timeline_weeks, team_size):
 
         complexity = self._compute_complexity(description)
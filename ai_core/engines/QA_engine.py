@@ -1,16 +1,22 @@
 from .core import CoreBrain
+from .rules import match_terms
+from ..knowledge import get_pack
+from ..response_cache import memoize, normalize
 
 
 class QnAEngine:
 
+    @memoize("engine.qa", exact=("industry", "difficulty"))
     def generate(self, industry, question, difficulty):
 
+        question = normalize(question)
         keywords = CoreBrain.extract_keywords(question)
+        hits = match_terms(question)
 
         intent = "General"
-        if "security" in question.lower():
+        if "security" in hits:
             intent = "Security"
-        elif "compliance" in question.lower():
+        elif "compliance" in hits:
             intent = "Compliance"
 
         reasoning_depth = "Basic"
@@ -20,38 +26,39 @@ class QnAEngine:
         recommendations = []
 
         # Intelligent contextual reasoning
-        text = question.lower()
-
-        if "token" in text:
+        if "token" in hits:
             recommendations.append(
                 "Implement token expiration policies and rotation mechanisms."
             )
 
-        if "authentication" in text:
+        if "authentication" in hits:
             recommendations.append(
                 "Introduce multi-factor authentication (MFA) for sensitive operations."
             )
 
-        if "audit" in text or "logs" in text:
+        if "audit" in hits or "logs" in hits:
             recommendations.append(
                 "Enable tamper-proof audit logging and real-time monitoring."
             )
 
-        if "fraud" in text:
+        if "fraud" in hits:
             recommendations.append(
                 "Deploy anomaly detection models for transaction monitoring."
             )
 
-        if "encryption" in text:
+        if "encryption" in hits:
             recommendations.append(
                 "Ensure end-to-end encryption for sensitive financial data."
             )
 
-        if "compliance" in text:
+        if "compliance" in hits:
             recommendations.append(
                 "Conduct regular compliance audits aligned with regulatory frameworks."
             )
 
+        for rule in get_pack(industry).match(question):
+            recommendations.extend(rule["advice"])
+
         # Default fallback
         if not recommendations:
             recommendations.append(
@@ -73,4 +80,8 @@ class QnAEngine:
                 "keywords_detected": keywords
             },
             "assistant_response": assistant_response
-        }
\ No newline at end of file
+        }
+
+    def generate_many(self, industry, questions):
+        """Answers for a batch of (question, difficulty) tuples."""
+        return [self.generate(industry, question, difficulty) for question, difficulty in questions]
@@ -1,33 +1,47 @@
 import re
 
+import numpy as np
+
+from .rules import ADVANCED_TERMS, match_terms
+
 class CoreBrain:
 
+    RISK_WEIGHTS = {
+        "low": 2,
+        "medium": 5,
+        "high": 8
+    }
+
     @staticmethod
     def extract_keywords(text):
         words = re.findall(r'\b\w+\b', text.lower())
         return list(set(words))
 
     @staticmethod
-    def compute_complexity(text):
-        length_score = len(text.split()) / 8
-        keyword_bonus = 0
-
-        advanced_terms = [
-            "integration", "compliance", "real-time",
-            "encryption", "scalability", "distributed"
-        ]
+    def compute_complexity(text, hits=None):
+        # ``hits`` is match_terms(text) when the caller already has it.
+        if hits is None:
+            hits = match_terms(text)
 
-        for term in advanced_terms:
-            if term in text.lower():
-                keyword_bonus += 1.5
+        length_score = len(text.split()) / 8
+        keyword_bonus = 1.5 * len(ADVANCED_TERMS & hits)
 
         return min(10, length_score + keyword_bonus)
 
+    @staticmethod
+    def compute_complexity_many(texts, hits):
+        """compute_complexity over a batch, as a float array."""
+        words = np.fromiter((len(text.split()) for text in texts), dtype=np.float64, count=len(texts))
+        advanced = np.fromiter((len(ADVANCED_TERMS & h) for h in hits), dtype=np.float64, count=len(texts))
+        return np.minimum(10, words / 8 + 1.5 * advanced)
+
     @staticmethod
     def risk_weight(level):
-        weights = {
-            "low": 2,
-            "medium": 5,
-            "high": 8
-        }
-        return weights.get(level.lower(), 5)
\ No newline at end of file
+        return CoreBrain.RISK_WEIGHTS.get(level.lower(), 5)
+
+    @staticmethod
+    def risk_weight_many(levels):
+        return np.fromiter(
+            (CoreBrain.RISK_WEIGHTS.get(level.lower(), 5) for level in levels),
+            dtype=np.int64, count=len(levels)
+        )
\ No newline at end of file
@@ -1,29 +1,57 @@
+import numpy as np
+
 from .core import CoreBrain
+from .rules import match_terms
+from ..knowledge import get_pack
+from ..response_cache import memoize, normalize
 
 
 class PMEngine:
 
+    @memoize("engine.pm", exact=("industry",))
     def generate(self, industry, description, timeline_weeks, team_size):
+        return self.generate_many(industry, [(description, timeline_weeks, team_size)])[0]
+
+    def generate_many(self, industry, projects):
+        """
+        Feasibility for a batch of (description, timeline_weeks, team_size)
+        tuples, with the workload scores computed as NumPy arrays.
+        """
+        pack = get_pack(industry)
+        # Rule phrases match regardless of runs of whitespace.
+        descriptions = [normalize(description) for description, _, _ in projects]
+        hits = [match_terms(description) for description in descriptions]
 
-        complexity = CoreBrain.compute_complexity(description)
-        text = description.lower()
+        complexity = CoreBrain.compute_complexity_many(descriptions, hits)
+        timeline = np.array([weeks for _, weeks, _ in projects], dtype=np.float64)
+        team = np.array([max(size, 1) for _, _, size in projects], dtype=np.float64)
 
-        workload_pressure = (complexity * timeline_weeks) / max(team_size, 1)
+        workload_pressure = (complexity * timeline) / team
 
         # Context-aware workload amplification
-        if "fraud" in text:
-            workload_pressure += 2
+        workload_pressure += np.fromiter((
+            2 * ("fraud" in h)
+            + 2 * ("compliance" in h)
+            + ("encryption" in h)
+            + sum(rule["workload"] for rule in pack.match(description))
+            for h, description in zip(hits, descriptions)
+        ), dtype=np.float64, count=len(projects))
 
-        if "compliance" in text:
-            workload_pressure += 2
+        # Delivery probability logic
+        delivery_probability = np.maximum(50, 95 - workload_pressure)
 
-        if "encryption" in text:
-            workload_pressure += 1
+        recommended_sprints = np.maximum(2, (timeline / 2).astype(np.int64))
 
-        # Delivery probability logic
-        delivery_probability = max(50, 95 - workload_pressure)
+        return [
+            self._feasibility(industry, *scores)
+            for scores in zip(
+                complexity.tolist(), workload_pressure.tolist(),
+                delivery_probability.tolist(), recommended_sprints.tolist()
+            )
+        ]
 
-        recommended_sprints = max(2, int(timeline_weeks / 2))
+    def _feasibility(self, industry, complexity, workload_pressure,
+                     delivery_probability, recommended_sprints):
 
         risk_warning = ""
         if delivery_probability < 70:
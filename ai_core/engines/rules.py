@@ -0,0 +1,109 @@
+import re
+import sys
+
+
+def _trie(terms):
+    root = {}
+    for term in terms:
+        node = root
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    return root
+
+
+def _pattern(node):
+    # Prefix-factored alternation: at any position at most one branch per
+    # character is tried, and the greedy optional tails pick the longest term.
+    branches = [re.escape(ch) + _pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return "(?:" + body + ")?" if "" in node else body
+
+
+def _prefix_terms(trie, term):
+    # Every term that is a prefix of ``term`` (including itself).
+    node, found = trie, []
+    for i, ch in enumerate(term):
+        node = node[ch]
+        if "" in node:
+            found.append(term[:i + 1])
+    return frozenset(found)
+
+
+class RuleMatcher:
+    """
+    Finds every term of a rule table in a single scan of the text.
+
+    Terms are compiled once into a single regex that reports the longest
+    term starting at each matching position; the shorter terms that are
+    prefixes of it are added from a precomputed table. Tables of at most
+    ``scan_max_terms`` terms are cheaper to check with one C-level substring
+    search per term, so those skip the regex. Matching is case-insensitive
+    substring matching, the same as ``term in text.lower()`` per term.
+    """
+
+    SCAN_MAX_TERMS = 200
+
+    def __init__(self, terms, scan_max_terms=SCAN_MAX_TERMS):
+        self.terms = frozenset(term.lower() for term in terms if term)
+        self._regex = None
+
+        if len(self.terms) > scan_max_terms:
+            trie = _trie(self.terms)
+            self._prefixes = {term: _prefix_terms(trie, term) for term in self.terms}
+            self._regex = re.compile(_pattern(trie))
+
+    def find(self, text):
+        """Return the set of terms that occur in ``text``."""
+        text = text.lower()
+        if self._regex is None:
+            return {term for term in self.terms if term in text}
+
+        # Resume one character after each match so overlapping terms are
+        # found too; between matches the regex engine skips ahead in C.
+        hits = set()
+        search = self._regex.search
+        match = search(text)
+        while match is not None:
+            hits.update(self._prefixes[match.group()])
+            match = search(text, match.start() + 1)
+        return hits
+
+    def size_bytes(self):
+        """Approximate memory held by the term set and compiled pattern."""
+        size = sys.getsizeof(self.terms) + sum(sys.getsizeof(term) for term in self.terms)
+        if self._regex is not None:
+            size += sys.getsizeof(self._regex.pattern) + sys.getsizeof(self._prefixes)
+            size += sum(sys.getsizeof(prefixes) for prefixes in self._prefixes.values())
+        return size
+
+
+# ---------------- ENGINE RULES ----------------
+
+# Terms that raise the complexity score (CoreBrain.compute_complexity).
+ADVANCED_TERMS = frozenset([
+    "integration", "compliance", "real-time",
+    "encryption", "scalability", "distributed"
+])
+
+# Intent detection for LavendrixBrain, checked in order.
+BRAIN_INTENTS = (
+    ("Security", frozenset(["security", "authentication", "token", "fraud"])),
+    ("Compliance", frozenset(["audit", "compliance", "regulation"])),
+    ("Performance", frozenset(["performance", "load", "scale", "latency"]))
+)
+
+# Remaining terms the test-case, QA and PM engines react to.
+ENGINE_TERMS = frozenset(["fraud", "authentication", "token", "compliance",
+                          "audit", "logs", "encryption", "security"])
+
+engine_matcher = RuleMatcher(
+    ADVANCED_TERMS | ENGINE_TERMS | frozenset().union(*(terms for _, terms in BRAIN_INTENTS))
+)
+
+
+def match_terms(text):
+    """All engine rule terms found in ``text`` (one scan)."""
+    return engine_matcher.find(text)
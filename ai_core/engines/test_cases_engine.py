@@ -1,29 +1,55 @@
+import numpy as np
+
 from .core import CoreBrain
+from .rules import match_terms
+from ..knowledge import get_pack
+from ..response_cache import memoize, normalize
 
 
 class TestCaseEngine:
 
+    @memoize("engine.testcases", exact=("industry", "feature", "risk_level"))
     def generate(self, industry, feature, description, risk_level):
-
-        keywords = CoreBrain.extract_keywords(description)
-        complexity = CoreBrain.compute_complexity(description)
-        base_risk = CoreBrain.risk_weight(risk_level)
-
-        text = description.lower()
+        return self.generate_many(industry, [(feature, description, risk_level)])[0]
+
+    def generate_many(self, industry, features):
+        """
+        Test strategies for a batch of (feature, description, risk_level)
+        tuples. Each description is tokenized and rule-matched once, and the
+        scores for the whole batch are computed as NumPy arrays.
+        """
+        pack = get_pack(industry)
+        # Rule phrases match regardless of runs of whitespace.
+        descriptions = [normalize(description) for _, description, _ in features]
+        hits = [match_terms(description) for description in descriptions]
+        industry_rules = [pack.match(description) for description in descriptions]
+
+        complexity = CoreBrain.compute_complexity_many(descriptions, hits)
+        base_risk = CoreBrain.risk_weight_many([risk_level for _, _, risk_level in features])
 
         # Context-aware risk amplification
-        risk_score = base_risk
-
-        if "fraud" in text:
-            risk_score += 1
-
-        if "authentication" in text or "token" in text:
-            risk_score += 1
-
-        if "compliance" in text:
-            risk_score += 1
+        amplification = np.fromiter((
+            ("fraud" in h)
+            + ("authentication" in h or "token" in h)
+            + ("compliance" in h)
+            + sum(rule["risk"] for rule in rules)
+            for h, rules in zip(hits, industry_rules)
+        ), dtype=np.int64, count=len(features))
+        risk_scores = np.minimum(base_risk + amplification, 10)
+
+        coverage = (60 + complexity * 5).astype(np.int64)
+        automation = (80 - complexity * 3).astype(np.int64)
+
+        return [
+            self._strategy(industry, feature, *scores)
+            for (feature, _, _), scores in zip(features, zip(
+                hits, industry_rules, complexity.tolist(), risk_scores.tolist(),
+                coverage.tolist(), automation.tolist()
+            ))
+        ]
 
-        risk_score = min(risk_score, 10)
+    def _strategy(self, industry, feature, hits, industry_rules, complexity,
+                  risk_score, coverage, automation):
 
         risk_category = "Low"
         if risk_score > 7:
@@ -38,15 +64,18 @@ class TestCaseEngine:
         ]
 
         # Context-aware additions
-        if "fraud" in text:
+        if "fraud" in hits:
             functional_tests.append("Validate fraud detection logic under abnormal transactions.")
 
-        if "authentication" in text or "token" in text:
+        if "authentication" in hits or "token" in hits:
             functional_tests.append("Verify token validation and expiration handling.")
 
-        if "audit" in text or "logs" in text:
+        if "audit" in hits or "logs" in hits:
             functional_tests.append("Validate audit logging integrity and tamper resistance.")
 
+        for rule in industry_rules:
+            functional_tests.extend(rule["tests"])
+
         # Edge cases
         edge_cases = []
         if complexity > 6:
@@ -62,15 +91,18 @@ class TestCaseEngine:
         # Risk insights
         risks_identified = []
 
-        if "fraud" in text:
+        if "fraud" in hits:
             risks_identified.append("Fraud exploitation risk detected.")
 
-        if "audit" in text:
+        if "audit" in hits:
             risks_identified.append("Audit logging integrity risk.")
 
-        if "authentication" in text:
+        if "authentication" in hits:
             risks_identified.append("Authentication bypass vulnerability risk.")
 
+        for rule in industry_rules:
+            risks_identified.extend(rule["risks"])
+
         if not risks_identified:
             risks_identified.append("General operational risk.")
 
@@ -92,8 +124,8 @@ class TestCaseEngine:
                 "complexity_score": round(complexity, 2),
                 "risk_score": risk_score,
                 "risk_category": risk_category,
-                "estimated_test_coverage_percent": int(60 + complexity * 5),
-                "automation_feasibility_percent": int(80 - complexity * 3)
+                "estimated_test_coverage_percent": coverage,
+                "automation_feasibility_percent": automation
             },
             "assistant_response": assistant_response
         }
\ No newline at end of file
@@ -0,0 +1,229 @@
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from . import settings
+from .storage import get_connection, transaction, writer
+
+# Uploaded files are hashed this many bytes at a time.
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def content_key(file_name, content):
+    """
+    BLAKE2 digest of a document's bytes plus its extension (which decides
+    how it is parsed). ``content`` is bytes or a seekable binary file, which
+    is rewound afterwards. Returns (key, size in bytes).
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(os.path.splitext(file_name)[1].lower().encode("utf-8") + b"\0")
+
+    if isinstance(content, (bytes, bytearray)):
+        digest.update(content)
+        return digest.hexdigest(), len(content)
+
+    start = content.tell()
+    size = 0
+    while True:
+        block = content.read(HASH_BLOCK_BYTES)
+        if not block:
+            break
+        digest.update(block)
+        size += len(block)
+    content.seek(start)
+    return digest.hexdigest(), size
+
+
+def _touch(cursor, key, now):
+    cursor.execute(
+        "UPDATE extracted_text SET last_used = ? WHERE content_key = ?", (now, key)
+    )
+
+
+def _store(cursor, key, blob, complete, now, disk_bytes):
+    cursor.execute("""
+    INSERT OR REPLACE INTO extracted_text
+    (content_key, text, complete, stored_bytes, last_used)
+    VALUES (?, ?, ?, ?, ?)
+    """, (key, blob, int(complete), len(blob), now))
+
+    used = cursor.execute(
+        "SELECT COALESCE(SUM(stored_bytes), 0) FROM extracted_text"
+    ).fetchone()[0]
+    if used <= disk_bytes:
+        return
+
+    evict = []
+    for old_key, stored in cursor.execute(
+        "SELECT content_key, stored_bytes FROM extracted_text ORDER BY last_used"
+    ).fetchall():
+        if used <= disk_bytes:
+            break
+        evict.append((old_key,))
+        used -= stored
+    cursor.executemany("DELETE FROM extracted_text WHERE content_key = ?", evict)
+
+
+class ExtractionCache:
+    """
+    Two-tier cache of extracted document text keyed by content_key.
+
+    The memory tier is an LRU bounded by ``memory_bytes`` of UTF-8 text; the disk
+    tier is a SQLite table of zlib-compressed text bounded by ``disk_bytes``,
+    evicting the least recently used documents first (0 disables it).
+    Entries cut short by a character limit are only served to requests with
+    a limit no larger than the text they hold.
+    """
+
+    def __init__(self, db_path=None, memory_bytes=None, disk_bytes=None):
+        self.db_path = db_path or settings.EXTRACT_CACHE_DB
+        self.memory_bytes = (
+            settings.EXTRACT_CACHE_MEMORY_BYTES if memory_bytes is None else memory_bytes
+        )
+        self.disk_bytes = (
+            settings.EXTRACT_CACHE_DISK_BYTES if disk_bytes is None else disk_bytes
+        )
+
+        self._entries = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self._db_ready = False
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bytes_saved": 0
+        }
+
+    # ---------------- DISK TIER ----------------
+
+    def _ensure_db(self):
+        if self._db_ready:
+            return
+        with transaction(self.db_path) as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS extracted_text (
+                content_key TEXT PRIMARY KEY,
+                text BLOB NOT NULL,
+                complete INTEGER NOT NULL,
+                stored_bytes INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """)
+            cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_extracted_text_last_used
+            ON extracted_text (last_used)
+            """)
+        self._db_ready = True
+
+    def _disk_get(self, key):
+        self._ensure_db()
+        conn = get_connection(self.db_path)
+        row = conn.execute(
+            "SELECT text, complete FROM extracted_text WHERE content_key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        writer(self.db_path).submit(_touch, key, time.time())
+        return zlib.decompress(row[0]).decode("utf-8"), bool(row[1])
+
+    def _disk_put(self, key, text, complete):
+        self._ensure_db()
+        blob = zlib.compress(text.encode("utf-8"), 6)
+        # Queued without waiting: the memory tier already has the text.
+        writer(self.db_path).submit(
+            _store, key, blob, complete, time.time(), self.disk_bytes
+        )
+
+    # ---------------- MEMORY TIER ----------------
+
+    def _remember(self, key, text, complete):
+        # Budgeted in UTF-8 bytes; ASCII text (the common case) needs no encode.
+        size = len(text) if text.isascii() else len(text.encode("utf-8"))
+        if size > self.memory_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_used -= previous[2]
+            self._entries[key] = (text, complete, size)
+            self._memory_used += size
+
+            while self._memory_used > self.memory_bytes:
+                _, (_, _, old_size) = self._entries.popitem(last=False)
+                self._memory_used -= old_size
+
+    # ---------------- ACCESS ----------------
+
+    @staticmethod
+    def _usable(entry, limit):
+        text, complete = entry[:2]
+        if complete:
+            return text if limit is None else text[:limit]
+        if limit is not None and limit <= len(text):
+            return text[:limit]
+        return None
+
+    def _count(self, counter, source_size=0):
+        with self._lock:
+            self._counters[counter] += 1
+            if counter != "misses":
+                self._counters["bytes_saved"] += source_size
+
+    def get(self, key, limit=None, source_size=0):
+        """Cached text for ``key`` cut to ``limit`` characters, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        text = None if entry is None else self._usable(entry, limit)
+        if text is not None:
+            self._count("memory_hits", source_size)
+            return text
+
+        if self.disk_bytes > 0:
+            entry = self._disk_get(key)
+            text = None if entry is None else self._usable(entry, limit)
+            if text is not None:
+                self._remember(key, *entry)
+                self._count("disk_hits", source_size)
+                return text
+
+        self._count("misses")
+        return None
+
+    def put(self, key, text, complete):
+        """Store extracted text; ``complete`` is False if it was cut at a limit."""
+        self._remember(key, text, complete)
+        if self.disk_bytes > 0:
+            self._disk_put(key, text, complete)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._entries)
+            stats["memory_bytes"] = self._memory_used
+
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round(
+            (stats["memory_hits"] + stats["disk_hits"]) / lookups, 4
+        ) if lookups else 0.0
+
+        if self.disk_bytes > 0:
+            self._ensure_db()
+            count, used = get_connection(self.db_path).execute(
+                "SELECT COUNT(*), COALESCE(SUM(stored_bytes), 0) FROM extracted_text"
+            ).fetchone()
+            stats["disk_entries"] = count
+            stats["disk_bytes"] = used
+
+        return stats
+
+
+extraction_cache = ExtractionCache()
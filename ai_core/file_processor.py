@@ -1,35 +1,244 @@
+import codecs
 import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
+from contextlib import contextmanager
+
 import PyPDF2
 import docx
 
+from .extraction_cache import content_key, extraction_cache
+from .settings import PDF_PARALLEL_MIN_PAGES, PDF_WORKERS
+
+# Plain-text inputs are decoded and yielded this many bytes at a time.
+TEXT_BLOCK_BYTES = 64 * 1024
+
+# Each worker gets about this many page ranges, so finished ranges can be
+# yielded (and the rest cancelled) before the whole document is done.
+PDF_RANGES_PER_WORKER = 4
+
+
+# ---------------- PARALLEL PDF ----------------
+
+# Pools of spawn workers shared by every document, one per worker count
+# (normally just settings.PDF_WORKERS), started on first use and stopped by
+# shutdown_pdf_pool() when the application exits.
+_pools = {}
+_pool_lock = threading.Lock()
+
+# In a worker: the document it last opened, as (token, PdfReader).
+_worker_document = (None, None)
+
+
+def _extract_pages(path, token, start, stop):
+    global _worker_document
+    if _worker_document[0] != token:
+        _worker_document = (token, PyPDF2.PdfReader(path))
+    reader = _worker_document[1]
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _get_pool(workers):
+    # Never replace a pool another request may still be using.
+    with _pool_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return pool
+
+
+def shutdown_pdf_pool():
+    """Stop the PDF worker processes (used on application shutdown)."""
+    with _pool_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+@contextmanager
+def _pdf_path(stream):
+    # Workers open the document themselves: by path when it is a real file,
+    # otherwise from a temporary copy.
+    name = getattr(stream, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        yield name
+        return
+
+    stream.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as copy:
+        shutil.copyfileobj(stream, copy)
+    try:
+        yield copy.name
+    finally:
+        os.unlink(copy.name)
+
+
+def _iter_pages_parallel(stream, page_count, workers):
+    span = max(1, -(-page_count // (workers * PDF_RANGES_PER_WORKER)))
+    pool = _get_pool(workers)
+    token = uuid.uuid4().hex
+
+    with _pdf_path(stream) as path:
+        futures = [
+            pool.submit(_extract_pages, path, token, start, min(start + span, page_count))
+            for start in range(0, page_count, span)
+        ]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            # The copy is removed on exit, so wait for ranges already running.
+            wait(futures)
+
+
+def iter_pdf_pages(stream, workers=None, min_pages=None):
+    """
+    Yield the text of each page of a PDF in page order. Documents with at
+    least ``min_pages`` pages are split into page ranges extracted by the
+    shared pool of ``workers`` processes; smaller ones are read serially.
+    """
+    workers = PDF_WORKERS if workers is None else workers
+    min_pages = PDF_PARALLEL_MIN_PAGES if min_pages is None else min_pages
+
+    reader = PyPDF2.PdfReader(stream)
+    page_count = len(reader.pages)
+
+    if workers > 1 and page_count >= max(min_pages, 2):
+        yield from _iter_pages_parallel(stream, page_count, workers)
+    else:
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
 
 class FileProcessor:
 
-    @staticmethod
-    def extract_text(file_name, content_bytes):
+    CONTEXT_LIMIT = 50000
 
-        text = ""
+    @staticmethod
+    def iter_text(file_name, content, parallel=True):
+        """
+        Yield a document's text one PDF page, DOCX paragraph or plain-text
+        block at a time. ``content`` is the raw bytes or a binary file object.
+        Parsing stops as soon as the caller stops iterating. With
+        ``parallel`` large PDFs are extracted by the worker pool (see
+        iter_pdf_pages), which pays off only when every page is wanted.
+        """
+        ext = os.path.splitext(file_name)[1].lower()
+        stream = io.BytesIO(content) if isinstance(content, (bytes, bytearray)) else content
 
-        if file_name.endswith(".pdf"):
-            reader = PyPDF2.PdfReader(io.BytesIO(content_bytes))
-            for page in reader.pages:
-                extracted = page.extract_text()
+        if ext == ".pdf":
+            for extracted in iter_pdf_pages(stream, workers=None if parallel else 1):
                 if extracted:
-                    text += extracted + "\n"
+                    yield extracted + "\n"
 
-        elif file_name.endswith(".docx"):
-            document = docx.Document(io.BytesIO(content_bytes))
+        elif ext == ".docx":
+            document = docx.Document(stream)
             for para in document.paragraphs:
-                text += para.text + "\n"
+                yield para.text + "\n"
+
+        elif ext == ".txt":
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+            while True:
+                block = stream.read(TEXT_BLOCK_BYTES)
+                text = decoder.decode(block, final=not block)
+                if text:
+                    yield text
+                if not block:
+                    break
 
         else:
+            # Unknown types are only used if they are valid UTF-8 throughout.
             try:
-                text += content_bytes.decode("utf-8")
-            except:
+                yield stream.read().decode("utf-8")
+            except UnicodeDecodeError:
                 pass
 
+    @staticmethod
+    def iter_sections(file_name, content, max_chars):
+        """
+        Group the chunks from ``iter_text`` into sections of at most
+        ``max_chars`` characters, breaking between pages and paragraphs
+        where possible and at line ends or spaces otherwise. Only one
+        section is held in memory at a time.
+        """
+        parts = []
+        size = 0
+
+        for chunk in FileProcessor.iter_text(file_name, content):
+            if size and size + len(chunk) > max_chars:
+                section = "".join(parts)
+                parts, size = [], 0
+                if section.strip():
+                    yield section
+
+            while len(chunk) > max_chars:
+                cut = (chunk.rfind("\n", 0, max_chars) + 1
+                       or chunk.rfind(" ", 0, max_chars) + 1
+                       or max_chars)
+                if chunk[:cut].strip():
+                    yield chunk[:cut]
+                chunk = chunk[cut:]
+
+            if chunk:
+                parts.append(chunk)
+                size += len(chunk)
+
+        section = "".join(parts)
+        if section.strip():
+            yield section
+
+    @staticmethod
+    def extract_text(file_name, content_bytes, limit=None, cache=True):
+        """
+        Join the chunks from ``iter_text`` in linear time. With ``limit``
+        the result is cut at that many characters and no further pages or
+        paragraphs are parsed. Documents seen before (by content hash) are
+        served from the extraction cache.
+        """
+        if not cache:
+            return FileProcessor._join_text(file_name, content_bytes, limit)
+
+        key, source_size = content_key(file_name, content_bytes)
+        text = extraction_cache.get(key, limit, source_size)
+        if text is None:
+            text = FileProcessor._join_text(file_name, content_bytes, limit)
+            extraction_cache.put(key, text, complete=limit is None or len(text) < limit)
         return text
 
     @staticmethod
-    def compress_context(text, limit=50000):
-        return text[:limit]
\ No newline at end of file
+    def _join_text(file_name, content_bytes, limit):
+        parts = []
+        size = 0
+        # With a limit, serial extraction stops at the first pages that fill it.
+        chunks = FileProcessor.iter_text(file_name, content_bytes, parallel=limit is None)
+
+        try:
+            for chunk in chunks:
+                if limit is not None and size + len(chunk) >= limit:
+                    parts.append(chunk[:limit - size])
+                    break
+                parts.append(chunk)
+                size += len(chunk)
+        finally:
+            chunks.close()
+
+        return "".join(parts)
+
+    @staticmethod
+    def extract_context(file_name, content_bytes, limit=CONTEXT_LIMIT):
+        """Same as compress_context(extract_text(...)) without parsing past the limit."""
+        return FileProcessor.extract_text(file_name, content_bytes, limit=limit)
+
+    @staticmethod
+    def compress_context(text, limit=CONTEXT_LIMIT):
+        return text[:limit]
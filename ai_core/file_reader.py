@@ -1,34 +1,59 @@
 import os
-from PyPDF2 import PdfReader
-from docx import Document
 
+import docx
 
-def extract_text_from_txt(file_path):
+from .file_processor import iter_pdf_pages
+
+
+def _join(chunks, limit):
+    # Stop parsing as soon as ``limit`` characters have been collected.
+    parts = []
+    size = 0
+    try:
+        for chunk in chunks:
+            if limit is not None and size + len(chunk) >= limit:
+                parts.append(chunk[:limit - size])
+                break
+            parts.append(chunk)
+            size += len(chunk)
+    finally:
+        chunks.close()
+    return "".join(parts)
+
+
+def extract_text_from_txt(file_path, limit=None):
+    """Read as UTF-8 in text mode (universal newlines), skipping undecodable bytes."""
     with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-        return f.read()
+        return f.read() if limit is None else f.read(limit)
+
+
+def extract_text_from_pdf(file_path, limit=None):
+    """The text of every page, concatenated without separators."""
+    with open(file_path, "rb") as f:
+        # With a limit, read serially so extraction stops at the pages that fill it.
+        return _join(iter_pdf_pages(f, workers=None if limit is None else 1), limit)
+
 
+def extract_text_from_docx(file_path, limit=None):
+    """The document's paragraphs joined by newlines."""
+    def paragraphs():
+        for number, para in enumerate(docx.Document(file_path).paragraphs):
+            yield ("\n" if number else "") + para.text
 
-def extract_text_from_pdf(file_path):
-    reader = PdfReader(file_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text
+    return _join(paragraphs(), limit)
 
 
-def extract_text_from_docx(file_path):
-    doc = Document(file_path)
-    return "\n".join([para.text for para in doc.paragraphs])
+_EXTRACTORS = {
+    ".txt": extract_text_from_txt,
+    ".pdf": extract_text_from_pdf,
+    ".docx": extract_text_from_docx
+}
 
 
-def extract_text(file_path):
+def extract_text(file_path, limit=None):
     ext = os.path.splitext(file_path)[1].lower()
 
-    if ext == ".txt":
-        return extract_text_from_txt(file_path)
-    elif ext == ".pdf":
-        return extract_text_from_pdf(file_path)
-    elif ext == ".docx":
-        return extract_text_from_docx(file_path)
+    if ext in _EXTRACTORS:
+        return _EXTRACTORS[ext](file_path, limit)
     else:
-        return ""
\ No newline at end of file
+        return ""
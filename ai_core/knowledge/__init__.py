@@ -0,0 +1,121 @@
+"""
+Industry knowledge packs.
+
+Each ``ai_core/knowledge/<industry>.py`` module defines ``RULES``, a list of
+dicts with the keys:
+
+    terms     phrases that trigger the rule (case-insensitive substrings)
+    risk      added to the test-case risk score (default 0)
+    workload  added to the PM workload pressure index (default 0)
+    tests     functional tests to add
+    risks     risks to report
+    advice    QA recommendations to add
+
+A pack is imported only when its industry is first used, compiled into a
+term index and cached for the life of the process.
+"""
+import importlib
+import pkgutil
+import re
+import sys
+import threading
+import time
+
+from ..engines.rules import RuleMatcher
+
+_packs = {}
+_lock = threading.Lock()
+# Industry names come from clients, so only names with a pack module are cached.
+_known = frozenset(module.name for module in pkgutil.iter_modules(__path__))
+
+
+def pack_name(industry):
+    """Module name for an industry label: "E-Commerce" -> "ecommerce"."""
+    return re.sub(r"[^a-z0-9]", "", (industry or "").lower())
+
+
+class KnowledgePack:
+    """One industry's rules plus a term index over them."""
+
+    def __init__(self, name, rules):
+        self.name = name
+        self.rules = []
+        index = {}
+
+        for number, rule in enumerate(rules):
+            terms = [term.lower() for term in rule.get("terms", ()) if term]
+            if not terms:
+                raise ValueError(f"Rule {number} of knowledge pack {name!r} has no terms")
+            self.rules.append({
+                "terms": terms,
+                "risk": rule.get("risk", 0),
+                "workload": rule.get("workload", 0),
+                "tests": list(rule.get("tests", ())),
+                "risks": list(rule.get("risks", ())),
+                "advice": list(rule.get("advice", ()))
+            })
+            for term in terms:
+                index.setdefault(term, []).append(len(self.rules) - 1)
+
+        self._index = index
+        self._matcher = RuleMatcher(index)
+        self.load_ms = 0.0
+
+    def match(self, text):
+        """Rules triggered by ``text``, in pack order."""
+        numbers = set()
+        for term in self._matcher.find(text):
+            numbers.update(self._index[term])
+        return [self.rules[number] for number in sorted(numbers)]
+
+    def index_bytes(self):
+        """
+        Approximate size of the term index: the term table, its rule lists
+        and the compiled matcher (sys.getsizeof, so shared strings and the
+        regex engine's own buffers are not counted).
+        """
+        size = sys.getsizeof(self._index)
+        for term, numbers in self._index.items():
+            size += sys.getsizeof(term) + sys.getsizeof(numbers)
+        return size + self._matcher.size_bytes()
+
+    def stats(self):
+        return {
+            "rules": len(self.rules),
+            "terms": len(self._index),
+            "load_ms": round(self.load_ms, 3),
+            "index_bytes": self.index_bytes()
+        }
+
+
+_EMPTY = KnowledgePack("", [])
+
+
+def _load(name):
+    start = time.perf_counter()
+    module = importlib.import_module(f".{name}", __name__)
+    pack = KnowledgePack(name, getattr(module, "RULES", []))
+    pack.load_ms = (time.perf_counter() - start) * 1000
+    return pack
+
+
+def get_pack(industry):
+    """
+    The knowledge pack for ``industry``, loading it on first use. Unknown
+    industries get an empty pack.
+    """
+    name = pack_name(industry)
+    if name not in _known:
+        return _EMPTY
+    pack = _packs.get(name)
+    if pack is None:
+        with _lock:
+            pack = _packs.get(name)
+            if pack is None:
+                pack = _packs[name] = _load(name)
+    return pack
+
+
+def pack_stats():
+    """Load time, index size and rule count of every pack loaded in this process."""
+    return {name: pack.stats() for name, pack in _packs.items()}
@@ -0,0 +1,57 @@
+"""Knowledge pack for E-Commerce projects."""
+
+RULES = [
+    {
+        "terms": ["shopping cart", "checkout", "order placement", "order total"],
+        "risk": 1,
+        "workload": 1,
+        "tests": ["Verify cart totals, taxes and discounts at checkout."],
+        "risks": ["Order total miscalculation risk."],
+        "advice": ["Recalculate order totals server-side at every checkout step."]
+    },
+    {
+        "terms": ["inventory", "stock", "warehouse"],
+        "risk": 1,
+        "workload": 1,
+        "tests": ["Validate stock reservation under concurrent orders."],
+        "risks": ["Overselling risk."],
+        "advice": ["Reserve stock atomically and release it on payment timeout."]
+    },
+    {
+        "terms": ["payment", "wallet", "gift card"],
+        "risk": 2,
+        "workload": 1,
+        "tests": ["Verify failed payments never confirm orders."],
+        "risks": ["Payment and order state mismatch risk."],
+        "advice": ["Confirm orders only on verified payment provider callbacks."]
+    },
+    {
+        "terms": ["coupon", "promotion", "discount", "voucher"],
+        "risk": 1,
+        "tests": ["Validate coupon stacking rules and single-use limits."],
+        "risks": ["Promotion abuse risk."],
+        "advice": ["Rate-limit coupon redemption and flag unusual redemption patterns."]
+    },
+    {
+        "terms": ["flash sale", "black friday", "traffic spike", "peak season"],
+        "risk": 1,
+        "workload": 2,
+        "tests": ["Run load tests at expected peak traffic."],
+        "risks": ["Capacity exhaustion during peak sales."],
+        "advice": ["Pre-scale infrastructure and queue checkout requests during spikes."]
+    },
+    {
+        "terms": ["shipping", "delivery", "order tracking", "returns"],
+        "workload": 1,
+        "tests": ["Verify shipping status updates and return flows."],
+        "risks": ["Fulfilment visibility risk."],
+        "advice": ["Integrate carrier tracking webhooks and alert on stalled shipments."]
+    },
+    {
+        "terms": ["product search", "recommendation", "catalog", "product listing"],
+        "workload": 1,
+        "tests": ["Validate search relevance and catalog filtering."],
+        "risks": ["Product discoverability risk."],
+        "advice": ["Measure search conversion and test ranking changes with A/B experiments."]
+    }
+]
@@ -0,0 +1,57 @@
+"""Knowledge pack for EdTech projects."""
+
+RULES = [
+    {
+        "terms": ["student", "learner", "minors", "children"],
+        "risk": 2,
+        "workload": 1,
+        "tests": ["Verify student data is visible only to enrolled teachers and guardians."],
+        "risks": ["Student privacy risk (FERPA/COPPA)."],
+        "advice": ["Collect only necessary student data and obtain guardian consent for minors."]
+    },
+    {
+        "terms": ["exams", "examination", "assessment", "quiz", "proctoring"],
+        "risk": 1,
+        "workload": 2,
+        "tests": ["Validate exam timers, submissions and auto-save under network loss."],
+        "risks": ["Assessment integrity risk."],
+        "advice": ["Randomise question pools and log suspicious exam activity."]
+    },
+    {
+        "terms": ["grades", "grading", "gradebook", "transcript", "certificate"],
+        "risk": 1,
+        "workload": 1,
+        "tests": ["Verify grade calculations and certificate issuance rules."],
+        "risks": ["Incorrect grading risk."],
+        "advice": ["Keep an auditable history of every grade change."]
+    },
+    {
+        "terms": ["video", "streaming", "live class", "lecture"],
+        "workload": 2,
+        "tests": ["Validate video playback across bandwidths and devices."],
+        "risks": ["Content delivery degradation risk."],
+        "advice": ["Serve lectures through a CDN with adaptive bitrate streaming."]
+    },
+    {
+        "terms": ["enrollment", "enrolment", "course catalog", "subscription"],
+        "workload": 1,
+        "tests": ["Verify enrollment limits and subscription access windows."],
+        "risks": ["Access entitlement mismatch risk."],
+        "advice": ["Derive course access from a single entitlement service."]
+    },
+    {
+        "terms": ["accessibility", "wcag", "screen reader", "captions"],
+        "workload": 1,
+        "tests": ["Run WCAG accessibility checks on learning content."],
+        "risks": ["Accessibility non-compliance risk."],
+        "advice": ["Caption all video content and include accessibility checks in CI."]
+    },
+    {
+        "terms": ["learning management system", "scorm", "learning tools interoperability"],
+        "risk": 1,
+        "workload": 2,
+        "tests": ["Validate LMS integrations with SCORM/LTI conformance suites."],
+        "risks": ["LMS integration incompatibility risk."],
+        "advice": ["Certify SCORM/LTI integrations against the major LMS platforms."]
+    }
+]
@@ -0,0 +1,66 @@
+"""Knowledge pack for FinTech projects."""
+
+RULES = [
+    {
+        "terms": ["payment", "checkout", "wire transfer", "money transfer", "remittance"],
+        "risk": 1,
+        "workload": 1,
+        "tests": ["Verify idempotent payment submission on retries and timeouts."],
+        "risks": ["Duplicate or lost payment risk."],
+        "advice": ["Use idempotency keys and reconcile payments against the ledger daily."]
+    },
+    {
+        "terms": ["ledger", "account balance", "settlement", "reconciliation"],
+        "risk": 1,
+        "workload": 1,
+        "tests": ["Validate double-entry ledger balances after every posting."],
+        "risks": ["Ledger inconsistency risk."],
+        "advice": ["Make ledger postings append-only and run automated reconciliation."]
+    },
+    {
+        "terms": ["kyc", "know your customer", "identity verification", "onboarding"],
+        "risk": 1,
+        "workload": 2,
+        "tests": ["Verify KYC checks block onboarding of unverified customers."],
+        "risks": ["Regulatory exposure from incomplete KYC."],
+        "advice": ["Automate KYC screening and keep evidence for every decision."]
+    },
+    {
+        "terms": ["anti-money laundering", "money laundering", "sanctions", "suspicious activity"],
+        "risk": 2,
+        "workload": 2,
+        "tests": ["Validate sanctions screening and suspicious activity alerts."],
+        "risks": ["Money laundering detection gap."],
+        "advice": ["Screen transactions against current sanctions lists and tune AML alert thresholds."]
+    },
+    {
+        "terms": ["credit card", "debit card", "card payment", "pci dss", "cardholder"],
+        "risk": 2,
+        "workload": 2,
+        "tests": ["Verify card data is tokenized and never logged in clear text."],
+        "risks": ["PCI DSS scope and cardholder data exposure risk."],
+        "advice": ["Minimise PCI scope with tokenization and a certified payment provider."]
+    },
+    {
+        "terms": ["loan", "credit score", "underwriting", "lending"],
+        "risk": 1,
+        "workload": 1,
+        "tests": ["Validate credit decision rules against boundary applicant profiles."],
+        "risks": ["Unfair or inconsistent credit decision risk."],
+        "advice": ["Version credit models and keep decision explanations for audits."]
+    },
+    {
+        "terms": ["interest rate", "currency", "exchange rate", "monetary rounding"],
+        "risk": 1,
+        "tests": ["Verify monetary rounding and currency conversion precision."],
+        "risks": ["Monetary calculation error risk."],
+        "advice": ["Use fixed-point decimal arithmetic for all money values."]
+    },
+    {
+        "terms": ["chargeback", "dispute", "refund"],
+        "workload": 1,
+        "tests": ["Validate refund and chargeback flows restore balances correctly."],
+        "risks": ["Dispute handling backlog risk."],
+        "advice": ["Track disputes end to end with clear SLAs."]
+    }
+]
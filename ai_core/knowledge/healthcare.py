@@ -0,0 +1,59 @@
+"""Knowledge pack for Healthcare projects."""
+
+RULES = [
+    {
+        "terms": ["patient", "medical record", "health record", "protected health information"],
+        "risk": 2,
+        "workload": 2,
+        "tests": ["Verify patient records are only visible to authorised care staff."],
+        "risks": ["Protected health information exposure risk."],
+        "advice": ["Apply least-privilege access and audit every read of patient data."]
+    },
+    {
+        "terms": ["hipaa", "gdpr", "consent"],
+        "risk": 1,
+        "workload": 2,
+        "tests": ["Validate consent is recorded and honoured before data sharing."],
+        "risks": ["Privacy regulation non-compliance risk."],
+        "advice": ["Map data flows against HIPAA/GDPR requirements and review consent handling."]
+    },
+    {
+        "terms": ["prescription", "medication", "dosage", "drug"],
+        "risk": 2,
+        "workload": 1,
+        "tests": ["Validate dosage limits and drug interaction warnings."],
+        "risks": ["Medication error risk."],
+        "advice": ["Require pharmacist review for out-of-range dosages."]
+    },
+    {
+        "terms": ["appointment", "scheduling", "booking"],
+        "workload": 1,
+        "tests": ["Verify double booking is prevented across time zones."],
+        "risks": ["Scheduling conflict risk."],
+        "advice": ["Lock appointment slots transactionally during booking."]
+    },
+    {
+        "terms": ["hl7", "fhir", "interoperability", "lab result"],
+        "risk": 1,
+        "workload": 2,
+        "tests": ["Validate HL7/FHIR messages against the expected profiles."],
+        "risks": ["Clinical data exchange mismatch risk."],
+        "advice": ["Contract-test every FHIR/HL7 interface with partner systems."]
+    },
+    {
+        "terms": ["telemedicine", "telehealth", "video consultation"],
+        "risk": 1,
+        "workload": 1,
+        "tests": ["Verify consultation sessions are encrypted and time-limited."],
+        "risks": ["Remote consultation privacy risk."],
+        "advice": ["Use end-to-end encrypted sessions and verify participant identity."]
+    },
+    {
+        "terms": ["emergency", "triage", "vital signs", "alarm"],
+        "risk": 2,
+        "workload": 1,
+        "tests": ["Validate critical alerts are delivered within the required time."],
+        "risks": ["Delayed critical alert risk."],
+        "advice": ["Monitor alert delivery latency and add redundant notification paths."]
+    }
+]
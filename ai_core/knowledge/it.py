@@ -0,0 +1,59 @@
+"""Knowledge pack for IT projects."""
+
+RULES = [
+    {
+        "terms": ["rest api", "api gateway", "endpoint", "microservice"],
+        "risk": 1,
+        "workload": 1,
+        "tests": ["Contract-test every public API endpoint."],
+        "risks": ["Breaking API change risk."],
+        "advice": ["Version APIs and run consumer-driven contract tests."]
+    },
+    {
+        "terms": ["database", "migration", "schema"],
+        "risk": 1,
+        "workload": 1,
+        "tests": ["Validate schema migrations forward and backward on production-sized data."],
+        "risks": ["Data loss during migration risk."],
+        "advice": ["Rehearse migrations on a production snapshot with a rollback plan."]
+    },
+    {
+        "terms": ["cloud", "kubernetes", "container", "deployment"],
+        "risk": 1,
+        "workload": 2,
+        "tests": ["Verify zero-downtime rolling deployments and rollbacks."],
+        "risks": ["Deployment outage risk."],
+        "advice": ["Use canary releases with automated rollback on error budgets."]
+    },
+    {
+        "terms": ["single sign-on", "oauth", "ldap", "active directory"],
+        "risk": 2,
+        "workload": 1,
+        "tests": ["Validate single sign-on session expiry and role mapping."],
+        "risks": ["Identity federation misconfiguration risk."],
+        "advice": ["Centralise identity with SSO and review role mappings quarterly."]
+    },
+    {
+        "terms": ["backup", "disaster recovery", "failover", "high availability"],
+        "risk": 1,
+        "workload": 2,
+        "tests": ["Run restore drills and failover tests against recovery objectives."],
+        "risks": ["Unrecoverable outage risk."],
+        "advice": ["Define RPO/RTO targets and test restores regularly."]
+    },
+    {
+        "terms": ["monitoring", "observability", "alerting", "incident"],
+        "workload": 1,
+        "tests": ["Verify alerts fire for key service-level indicators."],
+        "risks": ["Undetected incident risk."],
+        "advice": ["Define SLOs and alert on error budget burn rates."]
+    },
+    {
+        "terms": ["legacy", "mainframe", "cobol"],
+        "risk": 1,
+        "workload": 3,
+        "tests": ["Build characterisation tests around legacy behaviour before changes."],
+        "risks": ["Legacy system regression risk."],
+        "advice": ["Strangle legacy components incrementally behind stable interfaces."]
+    }
+]
@@ -1,82 +1,556 @@
-import sqlite3
 import json
-
+import math
 import os
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_NAME = os.path.join(BASE_DIR, "brain_memory.db")
+import re
+import sys
+from array import array
+from collections import Counter
+from itertools import zip_longest
+
+import numpy as np
+
+from . import settings
+from .storage import (
+    check_shard_layout, get_connection, shard_path, shard_paths, transaction,
+    write_sharded, writer
+)
+
+# Split into settings.STORAGE_SHARDS files by session id (see storage.shard_paths).
+DB_NAME = os.path.join(settings.STORAGE_ROOT, "brain_memory.db")
+
+# Every sessions column, used to upgrade tables created by older schemas.
+SESSION_COLUMNS = {
+    "risk_history": "TEXT",
+    "complexity_history": "TEXT",
+    "project_context": "TEXT",
+    "conversation_count": "INTEGER",
+    "last_intent": "TEXT",
+    "history_count": "INTEGER NOT NULL DEFAULT 0",
+    "risk_sum": "REAL NOT NULL DEFAULT 0",
+    "complexity_sum": "REAL NOT NULL DEFAULT 0",
+}
 
 
 def init_db():
     print(">>> INIT_DB CALLED <<<")
 
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    os.makedirs(os.path.dirname(DB_NAME), exist_ok=True)
+    check_shard_layout(DB_NAME)
+    for path in shard_paths(DB_NAME):
+        _init_shard(path)
+
+
+def _init_shard(path):
+    with transaction(path) as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                risk_history TEXT,
+                complexity_history TEXT,
+                project_context TEXT,
+                conversation_count INTEGER,
+                last_intent TEXT,
+                history_count INTEGER NOT NULL DEFAULT 0,
+                risk_sum REAL NOT NULL DEFAULT 0,
+                complexity_sum REAL NOT NULL DEFAULT 0
+            )
+        """)
+
+        # History points packed HISTORY_BLOCK_POINTS to a row (see
+        # encode_points); only a session's last block is ever rewritten.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS session_history_blocks (
+                session_id TEXT NOT NULL,
+                block INTEGER NOT NULL,
+                points BLOB NOT NULL,
+                PRIMARY KEY (session_id, block)
+            ) WITHOUT ROWID
+        """)
+
+        # Bounded project context: a ring of recent questions plus running
+        # keyword and intent counts.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS session_questions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                question TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_session_questions_session
+            ON session_questions (session_id, id)
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS session_keywords (
+                session_id TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (session_id, keyword)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS session_intents (
+                session_id TEXT NOT NULL,
+                intent TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (session_id, intent)
+            )
+        """)
+
+        migrate_sessions(cursor)
+
+
+# ---------------- MIGRATION ----------------
+
+def migrate_sessions(cursor):
+    """
+    Bring an older sessions table up to the current layout: add missing
+    columns, pack session_history rows into history blocks, move every JSON
+    risk/complexity history into history blocks and seed the running
+    aggregates, and turn the free-form project_context string into the
+    bounded question ring. Idempotent.
+    """
+    cursor.execute("PRAGMA table_info(sessions)")
+    existing = {row[1] for row in cursor.fetchall()}
+    for column, ddl in SESSION_COLUMNS.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE sessions ADD COLUMN {column} {ddl}")
 
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sessions (
-            session_id TEXT PRIMARY KEY,
-            risk_history TEXT,
-            complexity_history TEXT,
-            project_context TEXT,
-            conversation_count INTEGER,
-            last_intent TEXT
-        )
+        SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'session_history'
     """)
+    if cursor.fetchone():
+        # Already counted in the sessions aggregates: only the points move.
+        cursor.execute("SELECT DISTINCT session_id FROM session_history")
+        history_sessions = [row[0] for row in cursor.fetchall()]
+        for session_id in history_sessions:
+            cursor.execute("""
+                SELECT risk, complexity FROM session_history
+                WHERE session_id = ? ORDER BY id
+            """, (session_id,))
+            _append_blocks(cursor, session_id, cursor.fetchall())
+        cursor.execute("DROP TABLE session_history")
+        print(f"Packed history rows of {len(history_sessions)} session(s)")
 
-    conn.commit()
-    conn.close()
+    cursor.execute("""
+        SELECT session_id, risk_history, complexity_history
+        FROM sessions
+        WHERE risk_history IS NOT NULL OR complexity_history IS NOT NULL
+    """)
+    legacy_rows = cursor.fetchall()
 
+    for session_id, risk_json, complexity_json in legacy_rows:
+        points = list(zip_longest(
+            json.loads(risk_json) if risk_json else [],
+            json.loads(complexity_json) if complexity_json else []
+        ))
+        _append_points(cursor, session_id, points)
+        cursor.execute("""
+            UPDATE sessions
+            SET risk_history = NULL, complexity_history = NULL
+            WHERE session_id = ?
+        """, (session_id,))
 
-def get_session(session_id):
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+    if legacy_rows:
+        print(f"Migrated JSON history of {len(legacy_rows)} session(s)")
 
     cursor.execute("""
-        SELECT risk_history, complexity_history, project_context,
-               conversation_count, last_intent
-        FROM sessions WHERE session_id = ?
-    """, (session_id,))
+        SELECT session_id, project_context FROM sessions
+        WHERE project_context IS NOT NULL AND project_context != ''
+    """)
+    legacy_contexts = cursor.fetchall()
 
-    row = cursor.fetchone()
-    conn.close()
+    for session_id, project_context in legacy_contexts:
+        # The old context was every question joined with spaces; keep its
+        # tail as a single ring entry and seed the keyword counts from it.
+        tail = _truncate_utf8(project_context.strip(), settings.CONTEXT_MAX_BYTES, tail=True)
+        keywords = Counter(_KEYWORD_RE.findall(project_context.lower()))
+        _write_context(cursor, session_id, {
+            "questions": [tail] if tail else [],
+            "keyword_counts": dict(keywords.most_common(settings.CONTEXT_MAX_KEYWORDS)),
+            "intent_counts": {},
+            "keep_questions": 1,
+            "prune_keywords": False
+        })
+        cursor.execute("""
+            UPDATE sessions SET project_context = NULL WHERE session_id = ?
+        """, (session_id,))
+
+    if legacy_contexts:
+        print(f"Migrated project context of {len(legacy_contexts)} session(s)")
+
+
+# ---------------- HISTORY ENCODING ----------------
+
+# A history block is an 8-byte header (the format version, then padding that
+# keeps the data 8-byte aligned) followed by (risk, complexity) pairs as
+# little-endian float64. Missing values are stored as NaN.
+HISTORY_FORMAT = 1
+HISTORY_HEADER = bytes([HISTORY_FORMAT]) + bytes(7)
+HISTORY_BLOCK_POINTS = 256
+_POINT_BYTES = 16
 
-    if row:
-        return {
-            "risk_history": json.loads(row[0]) if row[0] else [],
-            "complexity_history": json.loads(row[1]) if row[1] else [],
-            "project_context": row[2] if row[2] else "",
-            "conversation_count": row[3] if row[3] else 0,
-            "last_intent": row[4] if row[4] else ""
-        }
 
+def encode_points(points):
+    """Pack (risk, complexity) pairs into block data (without the header)."""
+    values = array("d", [
+        math.nan if value is None else value
+        for point in points
+        for value in point
+    ])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def decode_points(blob):
+    """A block's points as an (n, 2) float64 array sharing the blob's memory."""
+    if blob[0] != HISTORY_FORMAT:
+        raise ValueError(f"Unknown history block format {blob[0]}")
+    return np.frombuffer(blob, dtype="<f8", offset=len(HISTORY_HEADER)).reshape(-1, 2)
+
+
+# ---------------- SESSIONS ----------------
+
+_KEYWORD_RE = re.compile(r'\b[a-zA-Z]{4,}\b')
+
+
+def _empty_session():
     return {
         "risk_history": [],
         "complexity_history": [],
-        "project_context": "",
+        "history_count": 0,
+        "risk_sum": 0.0,
+        "complexity_sum": 0.0,
+        "recent_questions": [],
+        "recent_questions_bytes": 0,
+        "keyword_counts": {},
+        "intent_counts": {},
         "conversation_count": 0,
-        "last_intent": ""
+        "last_intent": "",
+        "pending_history": [],
+        "pending_questions": [],
+        "pending_keywords": Counter(),
+        "pending_intents": Counter(),
+        "pending_conversations": 0,
+        "pending_last_intent": None
+    }
+
+
+def get_session(session_id, history_limit=None):
+    """
+    Load a session with only its ``history_limit`` most recent history points
+    (``settings.SESSION_HISTORY_WINDOW`` by default). ``history_count``,
+    ``risk_sum`` and ``complexity_sum`` cover the full history.
+    """
+    if history_limit is None:
+        history_limit = settings.SESSION_HISTORY_WINDOW
+
+    cursor = get_connection(shard_path(DB_NAME, session_id)).cursor()
+    session = _empty_session()
+
+    cursor.execute("""
+        SELECT conversation_count, last_intent,
+               history_count, risk_sum, complexity_sum
+        FROM sessions WHERE session_id = ?
+    """, (session_id,))
+
+    row = cursor.fetchone()
+    if not row:
+        return session
+
+    session["conversation_count"] = row[0] if row[0] else 0
+    session["last_intent"] = row[1] if row[1] else ""
+    session["history_count"] = row[2]
+    session["risk_sum"] = row[3]
+    session["complexity_sum"] = row[4]
+
+    # Newest blocks first, until the window is covered.
+    blocks = []
+    needed = history_limit
+    if needed > 0:
+        cursor.execute("""
+            SELECT points FROM session_history_blocks
+            WHERE session_id = ?
+            ORDER BY block DESC
+        """, (session_id,))
+        for (blob,) in cursor:
+            points = decode_points(blob)
+            blocks.append(points[-needed:])
+            needed -= len(points)
+            if needed <= 0:
+                break
+
+    if blocks:
+        window = np.concatenate(blocks[::-1])
+        for key, column in (("risk_history", 0), ("complexity_history", 1)):
+            values = window[:, column]
+            session[key] = values[~np.isnan(values)].tolist()
+
+    cursor.execute("""
+        SELECT question FROM session_questions
+        WHERE session_id = ?
+        ORDER BY id DESC
+        LIMIT ?
+    """, (session_id, settings.CONTEXT_MAX_QUESTIONS))
+    for (question,) in reversed(cursor.fetchall()):
+        _push_question(session, question)
+
+    cursor.execute("""
+        SELECT keyword, count FROM session_keywords WHERE session_id = ?
+    """, (session_id,))
+    session["keyword_counts"] = dict(cursor.fetchall())
+
+    cursor.execute("""
+        SELECT intent, count FROM session_intents WHERE session_id = ?
+    """, (session_id,))
+    session["intent_counts"] = dict(cursor.fetchall())
+
+    return session
+
+
+def record_history(session, risk, complexity, history_limit=None):
+    """
+    Append one history point to an in-memory session: updates the recent
+    window and the running aggregates, and queues the point for the next
+    save_sessions() call.
+    """
+    if history_limit is None:
+        history_limit = settings.SESSION_HISTORY_WINDOW
+
+    for key, value in (("risk_history", risk), ("complexity_history", complexity)):
+        session[key].append(value)
+        if len(session[key]) > history_limit:
+            del session[key][0]
+
+    session["history_count"] += 1
+    session["risk_sum"] += risk
+    session["complexity_sum"] += complexity
+    session["pending_history"].append((risk, complexity))
+
+
+def record_history_many(session, points, history_limit=None):
+    """record_history for a batch of (risk, complexity) points."""
+    if history_limit is None:
+        history_limit = settings.SESSION_HISTORY_WINDOW
+
+    for key, index in (("risk_history", 0), ("complexity_history", 1)):
+        session[key].extend(point[index] for point in points)
+        if len(session[key]) > history_limit:
+            del session[key][:-history_limit]
+
+    session["history_count"] += len(points)
+    session["risk_sum"] += sum(risk for risk, _ in points)
+    session["complexity_sum"] += sum(complexity for _, complexity in points)
+    session["pending_history"].extend(points)
+
+
+def _truncate_utf8(text, max_bytes, tail=False):
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    encoded = encoded[-max_bytes:] if tail else encoded[:max_bytes]
+    return encoded.decode("utf-8", errors="ignore")
+
+
+def _push_question(session, question):
+    ring = session["recent_questions"]
+    ring.append(question)
+    session["recent_questions_bytes"] += len(question.encode("utf-8"))
+
+    while ring and (
+        len(ring) > settings.CONTEXT_MAX_QUESTIONS
+        or session["recent_questions_bytes"] > settings.CONTEXT_MAX_BYTES
+    ):
+        session["recent_questions_bytes"] -= len(ring.pop(0).encode("utf-8"))
+
+
+def record_question(session, question, keywords, intent):
+    """
+    Add a question to an in-memory session's bounded context. Work is
+    proportional to the question, not to the session's past: the ring drops
+    its oldest entries to stay within budget, and keyword/intent counts are
+    incremented in place.
+    """
+    question = _truncate_utf8(question, settings.CONTEXT_MAX_BYTES)
+    _push_question(session, question)
+    session["pending_questions"].append(question)
+
+    new_keywords = Counter(keywords)
+    counts = session["keyword_counts"]
+    for keyword, count in new_keywords.items():
+        counts[keyword] = counts.get(keyword, 0) + count
+    session["pending_keywords"].update(new_keywords)
+
+    if len(counts) > settings.CONTEXT_MAX_KEYWORDS * 1.25:
+        session["keyword_counts"] = dict(
+            Counter(counts).most_common(settings.CONTEXT_MAX_KEYWORDS)
+        )
+        session["prune_keywords"] = True
+
+    session["intent_counts"][intent] = session["intent_counts"].get(intent, 0) + 1
+    session["pending_intents"][intent] += 1
+
+    session["conversation_count"] += 1
+    session["last_intent"] = intent
+    session["pending_conversations"] += 1
+    session["pending_last_intent"] = intent
+
+
+def take_session_changes(session):
+    """
+    Detach what save_sessions() needs to persist a session: the queued
+    history points and context deltas, the number of new conversations and
+    the latest intent (None if unchanged).
+    """
+    change = {
+        "points": session["pending_history"],
+        "questions": session["pending_questions"],
+        "keyword_counts": session["pending_keywords"],
+        "intent_counts": session["pending_intents"],
+        "keep_questions": len(session["recent_questions"]),
+        "prune_keywords": session.pop("prune_keywords", False),
+        "new_conversations": session["pending_conversations"],
+        "last_intent": session["pending_last_intent"]
     }
 
+    session["pending_history"] = []
+    session["pending_questions"] = []
+    session["pending_keywords"] = Counter()
+    session["pending_intents"] = Counter()
+    session["pending_conversations"] = 0
+    session["pending_last_intent"] = None
 
-def save_session(session_id, risk_history, complexity_history,
-                 project_context="", conversation_count=0, last_intent=""):
+    return change
 
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
 
+def _append_points(cursor, session_id, points):
     cursor.execute("""
-        INSERT OR REPLACE INTO sessions
-        (session_id, risk_history, complexity_history,
-         project_context, conversation_count, last_intent)
-        VALUES (?, ?, ?, ?, ?, ?)
+        INSERT INTO sessions
+        (session_id, history_count, risk_sum, complexity_sum)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(session_id) DO UPDATE SET
+            history_count = history_count + excluded.history_count,
+            risk_sum = risk_sum + excluded.risk_sum,
+            complexity_sum = complexity_sum + excluded.complexity_sum
     """, (
         session_id,
-        json.dumps(risk_history),
-        json.dumps(complexity_history),
-        project_context,
-        conversation_count,
-        last_intent
+        len(points),
+        sum(p[0] for p in points if p[0] is not None),
+        sum(p[1] for p in points if p[1] is not None)
     ))
 
-    conn.commit()
-    conn.close()
+    _append_blocks(cursor, session_id, points)
+
+
+def _append_blocks(cursor, session_id, points):
+    data = encode_points(points)
+    if not data:
+        return
+
+    cursor.execute("""
+        SELECT block, points FROM session_history_blocks
+        WHERE session_id = ?
+        ORDER BY block DESC
+        LIMIT 1
+    """, (session_id,))
+    block, blob = cursor.fetchone() or (0, HISTORY_HEADER)
+
+    block_bytes = HISTORY_BLOCK_POINTS * _POINT_BYTES
+    room = block_bytes - (len(blob) - len(HISTORY_HEADER))
+    rows = []
+    if room > 0:
+        rows.append((session_id, block, blob + data[:room]))
+        data = data[room:]
+    while data:
+        block += 1
+        rows.append((session_id, block, HISTORY_HEADER + data[:block_bytes]))
+        data = data[block_bytes:]
+
+    cursor.executemany("""
+        INSERT OR REPLACE INTO session_history_blocks (session_id, block, points)
+        VALUES (?, ?, ?)
+    """, rows)
+
+
+def _write_context(cursor, session_id, change):
+    if change["questions"]:
+        cursor.executemany("""
+            INSERT INTO session_questions (session_id, question) VALUES (?, ?)
+        """, [(session_id, question) for question in change["questions"]])
+
+        # Only the ring's worth of rows survives.
+        cursor.execute("""
+            DELETE FROM session_questions
+            WHERE session_id = ? AND id NOT IN (
+                SELECT id FROM session_questions
+                WHERE session_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+            )
+        """, (session_id, session_id, change["keep_questions"]))
+
+    cursor.executemany("""
+        INSERT INTO session_keywords (session_id, keyword, count)
+        VALUES (?, ?, ?)
+        ON CONFLICT(session_id, keyword) DO UPDATE SET
+            count = count + excluded.count
+    """, [(session_id, k, c) for k, c in change["keyword_counts"].items()])
+
+    if change["prune_keywords"]:
+        cursor.execute("""
+            DELETE FROM session_keywords
+            WHERE session_id = ? AND keyword NOT IN (
+                SELECT keyword FROM session_keywords
+                WHERE session_id = ?
+                ORDER BY count DESC
+                LIMIT ?
+            )
+        """, (session_id, session_id, settings.CONTEXT_MAX_KEYWORDS))
+
+    cursor.executemany("""
+        INSERT INTO session_intents (session_id, intent, count)
+        VALUES (?, ?, ?)
+        ON CONFLICT(session_id, intent) DO UPDATE SET
+            count = count + excluded.count
+    """, [(session_id, i, c) for i, c in change["intent_counts"].items()])
+
+
+def append_history(session_id, risk, complexity):
+    """Persist a single history point; cost does not depend on history length."""
+    writer(shard_path(DB_NAME, session_id)).write(
+        _append_points, session_id, [(risk, complexity)]
+    )
+
+
+def _save_sessions(cursor, changes):
+    for session_id, change in changes:
+        _append_points(cursor, session_id, change["points"])
+        _write_context(cursor, session_id, change)
+
+    cursor.executemany("""
+        INSERT INTO sessions (session_id, conversation_count, last_intent)
+        VALUES (?, ?, ?)
+        ON CONFLICT(session_id) DO UPDATE SET
+            conversation_count = COALESCE(conversation_count, 0) + excluded.conversation_count,
+            last_intent = COALESCE(excluded.last_intent, last_intent)
+    """, [
+        (
+            session_id,
+            change["new_conversations"],
+            change["last_intent"]
+        )
+        for session_id, change in changes
+        if change["new_conversations"] or change["last_intent"] is not None
+    ])
+
+
+def save_sessions(changes):
+    """
+    Persist ``{session_id: take_session_changes(session)}``: one transaction
+    per shard touched, each through that shard's write queue. History points
+    and questions are appended and counters incremented; nothing already
+    stored is rewritten, so processes sharing the database never overwrite
+    each other's updates.
+    """
+    write_sharded(DB_NAME, changes.items(), lambda item: item[0], _save_sessions)
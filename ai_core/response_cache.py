@@ -0,0 +1,192 @@
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from . import settings
+from .storage import get_connection, transaction, writer
+
+# Bump when engine output changes so shared disk entries from older code
+# are not served.
+CACHE_VERSION = 1
+
+# Expired disk rows are purged once every this many writes.
+PURGE_EVERY = 256
+
+
+def normalize(value):
+    """Collapse runs of whitespace in strings (recursively in lists)."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    return value
+
+
+def request_key(namespace, inputs):
+    payload = json.dumps([CACHE_VERSION, namespace, inputs], separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+
+def _store(cursor, key, body, expires_at, purge):
+    cursor.execute(
+        "INSERT OR REPLACE INTO engine_responses (request_key, body, expires_at) VALUES (?, ?, ?)",
+        (key, body, expires_at)
+    )
+    if purge:
+        cursor.execute("DELETE FROM engine_responses WHERE expires_at <= ?", (time.time(),))
+
+
+class ResponseCache:
+    """
+    Memoizes pure engine results by a hash of their normalized inputs.
+
+    Results are kept as JSON in an LRU of ``max_entries`` entries that
+    expire ``ttl`` seconds after being computed. With ``db_path`` set they
+    are also written to a SQLite table that every worker process can read.
+    Each lookup returns a fresh copy, so callers may modify the result.
+    """
+
+    def __init__(self, max_entries=None, ttl=None, db_path=None):
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_SIZE
+        self.ttl = settings.RESPONSE_CACHE_TTL_S if ttl is None else ttl
+        self.db_path = settings.RESPONSE_CACHE_DB if db_path is None else db_path
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_ready = False
+        self._writes = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    # ---------------- DISK TIER ----------------
+
+    def _ensure_db(self):
+        if self._db_ready:
+            return
+        with transaction(self.db_path) as cursor:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS engine_responses (
+                request_key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """)
+            cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_engine_responses_expires
+            ON engine_responses (expires_at)
+            """)
+        self._db_ready = True
+
+    def _disk_get(self, key, now):
+        self._ensure_db()
+        return get_connection(self.db_path).execute(
+            "SELECT body, expires_at FROM engine_responses WHERE request_key = ? AND expires_at > ?",
+            (key, now)
+        ).fetchone()
+
+    def _disk_put(self, key, body, expires_at):
+        self._ensure_db()
+        self._writes += 1
+        # Queued without waiting: the memory tier already has the result.
+        writer(self.db_path).submit(
+            _store, key, body, expires_at, self._writes % PURGE_EVERY == 0
+        )
+
+    # ---------------- ACCESS ----------------
+
+    def _remember(self, key, body, expires_at):
+        with self._lock:
+            self._entries[key] = (body, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return entry[0]
+                del self._entries[key]
+
+        if self.db_path:
+            row = self._disk_get(key, now)
+            if row is not None:
+                self._remember(key, *row)
+                with self._lock:
+                    self._counters["disk_hits"] += 1
+                return row[0]
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def get_or_compute(self, namespace, inputs, compute):
+        """Cached result for ``inputs``, calling ``compute()`` on a miss."""
+        key = request_key(namespace, inputs)
+        body = self._lookup(key)
+        if body is not None:
+            return json.loads(body)
+
+        result = compute()
+        body = json.dumps(result)
+        expires_at = time.time() + self.ttl
+        self._remember(key, body, expires_at)
+        if self.db_path:
+            self._disk_put(key, body, expires_at)
+        return json.loads(body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round(
+            (stats["memory_hits"] + stats["disk_hits"]) / lookups, 4
+        ) if lookups else 0.0
+        stats["shared"] = bool(self.db_path)
+        return stats
+
+
+response_cache = ResponseCache()
+
+
+def memoize(namespace, ignore=(), exact=()):
+    """
+    Cache a pure method's result in ``response_cache``.
+
+    The method always gets the arguments as passed. They are keyed
+    whitespace-normalized, so the method must not depend on whitespace in
+    them, except for the arguments named in ``exact`` (e.g. fields the
+    result echoes back), which are keyed verbatim. Arguments named in
+    ``ignore`` are passed through but not part of the key.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())[1:]
+            inputs = [
+                value if name in exact else normalize(value)
+                for name, value in arguments if name not in ignore
+            ]
+            return response_cache.get_or_compute(
+                namespace, inputs, lambda: fn(self, **dict(arguments))
+            )
+
+        return wrapper
+
+    return decorator
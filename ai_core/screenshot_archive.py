@@ -0,0 +1,101 @@
+import os
+import posixpath
+import tarfile
+import threading
+import zipfile
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+
+
+def _entry(name):
+    """
+    Map an archive path to (module_name, role), or None to skip it.
+
+    ``<module>/current.png`` and ``<module>/baseline.png`` give an explicit
+    pair; any other image is the current screenshot of the module named by
+    its path without extension.
+    """
+    name = name.replace("\\", "/").strip("/")
+    parts = [part for part in name.split("/") if part]
+    if not parts or any(part.startswith(".") or part == "__MACOSX" for part in parts):
+        return None
+
+    stem, ext = posixpath.splitext(parts[-1])
+    if ext.lower() not in IMAGE_EXTENSIONS:
+        return None
+
+    if len(parts) > 1 and stem.lower() in ("current", "baseline"):
+        return "/".join(parts[:-1]), stem.lower()
+    return posixpath.splitext("/".join(parts))[0], "current"
+
+
+def _add(entries, name, loader):
+    entry = _entry(name)
+    if entry:
+        module_name, role = entry
+        entries.setdefault(module_name, {})[role] = loader
+
+
+def read_archive(fileobj, filename):
+    """
+    Index a zip or tar archive of screenshots without reading the images.
+
+    Returns ``{module_name: {"current": loader, "baseline": loader}}`` where
+    each loader returns that member's bytes when called ("baseline" is
+    optional). Loaders may be called from any thread. ``fileobj`` must stay
+    open until every loader has run.
+    """
+    entries = {}
+
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        archive = zipfile.ZipFile(fileobj)
+        for info in archive.infolist():
+            if not info.is_dir():
+                _add(entries, info.filename, lambda info=info: archive.read(info))
+        return entries
+
+    fileobj.seek(0)
+    try:
+        archive = tarfile.open(fileobj=fileobj, mode="r:*")
+    except tarfile.TarError:
+        raise ValueError(f"{filename or 'archive'} is not a zip or tar archive")
+
+    # Every member is read through the one TarFile and its file position,
+    # so loaders called from different threads must take turns.
+    lock = threading.Lock()
+
+    def load(member):
+        with lock:
+            return archive.extractfile(member).read()
+
+    for member in archive.getmembers():
+        if member.isfile():
+            _add(entries, member.name, lambda member=member: load(member))
+    return entries
+
+
+def _file_loader(fileobj):
+    lock = threading.Lock()
+
+    def load():
+        with lock:
+            fileobj.seek(0)
+            return fileobj.read()
+
+    return load
+
+
+def group_uploads(currents, baselines=()):
+    """
+    Pair uploaded files by file name stem, as ``read_archive`` does for
+    archive members. ``currents`` and ``baselines`` are (filename, fileobj)
+    pairs; each loader reads its whole file, so the files must stay open
+    until every loader has run.
+    """
+    entries = {}
+    for role, uploads in (("current", currents), ("baseline", baselines)):
+        for filename, fileobj in uploads:
+            module_name = os.path.splitext(os.path.basename(filename or ""))[0]
+            entries.setdefault(module_name, {})[role] = _file_loader(fileobj)
+    return entries
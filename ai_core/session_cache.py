@@ -0,0 +1,207 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from . import settings
+
+
+class SessionCache:
+    """
+    Write-behind LRU cache in front of the session store.
+
+    Sessions are loaded once and then served from memory. Edits mark a
+    session dirty; dirty sessions are written in one batch by a background
+    flusher every ``flush_interval`` seconds, or as soon as
+    ``flush_threshold`` sessions are dirty. Dirty sessions are never evicted,
+    so the cache can briefly hold up to ``max_sessions + flush_threshold``
+    entries.
+
+    ``snapshot(session)`` turns a dirty session into what ``save_many``
+    persists (a deep copy by default). It runs under the cache lock, so it
+    may also reset per-flush bookkeeping on the live session.
+
+    Clean sessions are reloaded once they are ``max_age`` seconds old, so
+    changes written by other processes sharing the store show up (0 keeps
+    them until evicted).
+
+    A failed batch is retried on the next flush. If ``save_many`` raises an
+    exception with a ``failed_items`` attribute (``(session_id, snapshot)``
+    pairs, as storage.ShardWriteError has), only those sessions are retried:
+    the rest were saved.
+    """
+
+    def __init__(self, load, save_many, snapshot=copy.deepcopy,
+                 max_sessions=None, flush_interval=None, flush_threshold=None,
+                 max_age=None):
+        self._load = load
+        self._save_many = save_many
+        self._snapshot = snapshot
+        self.max_sessions = max_sessions or settings.SESSION_CACHE_SIZE
+        self.flush_interval = (
+            settings.SESSION_FLUSH_INTERVAL_S if flush_interval is None else flush_interval
+        )
+        self.flush_threshold = flush_threshold or settings.SESSION_FLUSH_THRESHOLD
+        self.max_age = settings.SESSION_CACHE_MAX_AGE_S if max_age is None else max_age
+
+        self._entries = OrderedDict()
+        self._loaded_at = {}
+        self._flushing = set()
+        self._dirty = set()
+        self._unsaved = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    # ---------------- ACCESS ----------------
+
+    def _stale(self, session_id):
+        return (
+            self.max_age > 0
+            and session_id not in self._dirty
+            and session_id not in self._flushing
+            and time.monotonic() - self._loaded_at[session_id] > self.max_age
+        )
+
+    def _cached(self, session_id):
+        # Call with self._lock held; None when the session must be (re)loaded.
+        session = self._entries.get(session_id)
+        if session is None or self._stale(session_id):
+            return None
+        return session
+
+    def _lock_entry(self, session_id):
+        """
+        Acquire self._lock and return the cached session. A missing or stale
+        session is read from the store with the lock released, so a cold
+        load never blocks other sessions; if another thread cached the
+        session meanwhile, its entry wins.
+        """
+        self._lock.acquire()
+        session = self._cached(session_id)
+        if session is None:
+            self._lock.release()
+            loaded = self._load(session_id)
+            self._lock.acquire()
+            session = self._cached(session_id)
+            if session is None:
+                session = self._entries[session_id] = loaded
+                self._loaded_at[session_id] = time.monotonic()
+                self._entries.move_to_end(session_id)
+                self._evict(keep=session_id)
+        self._entries.move_to_end(session_id)
+        return session
+
+    def get(self, session_id):
+        """Return a copy of the session that callers may keep."""
+        session = self._lock_entry(session_id)
+        try:
+            return copy.deepcopy(session)
+        finally:
+            self._lock.release()
+
+    @contextmanager
+    def edit(self, session_id):
+        """
+        Yield the live session for mutation and mark it dirty afterwards.
+        The session is marked dirty even if the body raises, since it may
+        already have changed the session: those changes are flushed rather
+        than left in memory unsaved.
+        """
+        session = self._lock_entry(session_id)
+        try:
+            yield session
+        finally:
+            self._dirty.add(session_id)
+            dirty_count = len(self._dirty)
+            self._lock.release()
+
+        if self.flush_interval <= 0 or not self._running():
+            if self.flush_interval <= 0 or dirty_count >= self.flush_threshold:
+                self.flush()
+        elif dirty_count >= self.flush_threshold:
+            self._wakeup.set()
+
+    def _evict(self, keep=None):
+        # Only clean sessions are evicted; dirty ones wait for the next flush.
+        if len(self._entries) <= self.max_sessions:
+            return
+        for session_id in list(self._entries):
+            if len(self._entries) <= self.max_sessions:
+                break
+            if session_id not in self._dirty and session_id != keep:
+                del self._entries[session_id]
+                del self._loaded_at[session_id]
+
+    # ---------------- FLUSHING ----------------
+
+    def flush(self):
+        """Write every dirty session in a single transaction."""
+        with self._flush_lock:
+            # A batch that failed last time goes first so writes stay in order.
+            if self._unsaved:
+                unsaved, self._unsaved = self._unsaved, None
+                self._save(unsaved)
+
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                batch = {
+                    session_id: self._snapshot(self._entries[session_id])
+                    for session_id in self._dirty
+                }
+                self._dirty.clear()
+                # Not reloaded until their writes have committed.
+                self._flushing = set(batch)
+
+            try:
+                self._save(batch)
+            finally:
+                with self._lock:
+                    self._flushing = set()
+
+            with self._lock:
+                self._evict()
+
+            return len(batch)
+
+    def _save(self, batch):
+        try:
+            self._save_many(batch)
+        except Exception as e:
+            failed = getattr(e, "failed_items", None)
+            self._unsaved = batch if failed is None else dict(failed)
+            raise
+
+    def _running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Session flush failed, will retry: {e}")
+
+    def start(self):
+        if self.flush_interval <= 0 or self._running():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="session-cache-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def close(self):
+        """Stop the background flusher and write out anything still dirty."""
+        if self._running():
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+        self._thread = None
+        self.flush()
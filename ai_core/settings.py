@@ -0,0 +1,182 @@
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name, default):
+    return float(os.environ.get(name, default))
+
+
+def _env_str(name, default):
+    return os.environ.get(name, default)
+
+
+# ---------------- STORAGE ----------------
+
+# Directory holding the session, analytics and cache databases. Relative
+# paths are resolved against the working directory at startup.
+STORAGE_ROOT = os.path.abspath(_env_str("LAVENDRIX_STORAGE_ROOT", BASE_DIR))
+
+# Session and defect data is split by a hash of the session id across this
+# many SQLite files per database (name.0.db ... name.<n-1>.db; with 1 the
+# plain name.db is used). The count is recorded in each file, and startup
+# fails if it no longer matches, since rows are not moved between files.
+STORAGE_SHARDS = _env_int("LAVENDRIX_STORAGE_SHARDS", 1)
+
+# An analytics.db from before the storage root (it was opened relative to
+# the working directory). When set, its rows are imported into the storage
+# root's analytics database once, at startup. Empty disables the import;
+# "python -m ai_core.analytics_db import <path>" runs it by hand.
+ANALYTICS_LEGACY_DB = _env_str("LAVENDRIX_ANALYTICS_LEGACY_DB", "")
+
+
+# ---------------- SQLITE ----------------
+
+# "NORMAL" is durable across application crashes under WAL; only an OS crash
+# or power loss can roll back the most recent commits.
+SQLITE_SYNCHRONOUS = _env_str("LAVENDRIX_SQLITE_SYNCHRONOUS", "NORMAL")
+
+# Page cache per connection in KiB (passed as a negative cache_size pragma).
+SQLITE_CACHE_KB = _env_int("LAVENDRIX_SQLITE_CACHE_KB", 16384)
+
+SQLITE_BUSY_TIMEOUT_MS = _env_int("LAVENDRIX_SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+SQLITE_STATEMENT_CACHE = _env_int("LAVENDRIX_SQLITE_STATEMENT_CACHE", 256)
+
+# Each database has one writer thread that group-commits queued writes in
+# batches of up to WRITE_BATCH_MAX; submitting blocks while WRITE_QUEUE_LIMIT
+# writes are already waiting.
+WRITE_QUEUE_LIMIT = _env_int("LAVENDRIX_WRITE_QUEUE_LIMIT", 1024)
+WRITE_BATCH_MAX = _env_int("LAVENDRIX_WRITE_BATCH_MAX", 256)
+
+
+# ---------------- SESSION CACHE ----------------
+
+# Maximum number of clean sessions kept in memory (LRU evicted beyond this).
+SESSION_CACHE_SIZE = _env_int("LAVENDRIX_SESSION_CACHE_SIZE", 1024)
+
+# Durability window: dirty sessions are written at least this often.
+# 0 turns the cache into a write-through cache.
+SESSION_FLUSH_INTERVAL_S = _env_float("LAVENDRIX_SESSION_FLUSH_INTERVAL_S", 1.0)
+
+# Flush early once this many sessions are dirty.
+SESSION_FLUSH_THRESHOLD = _env_int("LAVENDRIX_SESSION_FLUSH_THRESHOLD", 256)
+
+# Number of most recent history points get_session() returns by default.
+# Totals and averages always cover the whole history.
+SESSION_HISTORY_WINDOW = _env_int("LAVENDRIX_SESSION_HISTORY_WINDOW", 50)
+
+# Clean cached sessions are reloaded after this many seconds so that updates
+# from other worker processes sharing the database become visible (0 = never).
+SESSION_CACHE_MAX_AGE_S = _env_float("LAVENDRIX_SESSION_CACHE_MAX_AGE_S", 5.0)
+
+
+# ---------------- PROJECT CONTEXT ----------------
+
+# Budget for the ring of recent questions kept per session.
+CONTEXT_MAX_QUESTIONS = _env_int("LAVENDRIX_CONTEXT_MAX_QUESTIONS", 20)
+CONTEXT_MAX_BYTES = _env_int("LAVENDRIX_CONTEXT_MAX_BYTES", 8192)
+
+# Distinct keywords counted per session; the least frequent are dropped
+# once the table grows a quarter past this.
+CONTEXT_MAX_KEYWORDS = _env_int("LAVENDRIX_CONTEXT_MAX_KEYWORDS", 200)
+
+
+# ---------------- ANALYTICS ----------------
+
+# Windowed industry baselines returned by /generate-pm next to the all-time one.
+BASELINE_WINDOWS_DAYS = tuple(
+    int(days) for days in _env_str("LAVENDRIX_BASELINE_WINDOWS_DAYS", "30,90").split(",") if days
+)
+
+# Lines buffered per transaction by POST /log-defects/ndjson.
+DEFECT_INGEST_BATCH = _env_int("LAVENDRIX_DEFECT_INGEST_BATCH", 1000)
+
+# Longest line POST /log-defects/ndjson accepts; longer ones get a 413.
+DEFECT_INGEST_MAX_LINE_BYTES = _env_int("LAVENDRIX_DEFECT_INGEST_MAX_LINE_BYTES", 64 * 1024)
+
+
+# ---------------- RESPONSE CACHE ----------------
+
+# Pure engine results are memoized by normalized input: up to
+# RESPONSE_CACHE_SIZE results per process, each kept RESPONSE_CACHE_TTL_S
+# seconds. Set RESPONSE_CACHE_DB to a SQLite path to share results between
+# worker processes.
+RESPONSE_CACHE_SIZE = _env_int("LAVENDRIX_RESPONSE_CACHE_SIZE", 2048)
+RESPONSE_CACHE_TTL_S = _env_float("LAVENDRIX_RESPONSE_CACHE_TTL_S", 300.0)
+RESPONSE_CACHE_DB = _env_str("LAVENDRIX_RESPONSE_CACHE_DB", "")
+
+
+# ---------------- DOCUMENTS ----------------
+
+# PDFs with at least this many pages have their pages extracted by a pool of
+# PDF_WORKERS processes; smaller ones (or PDF_WORKERS=1) are read serially.
+PDF_PARALLEL_MIN_PAGES = _env_int("LAVENDRIX_PDF_PARALLEL_MIN_PAGES", 200)
+PDF_WORKERS = _env_int("LAVENDRIX_PDF_WORKERS", min(4, os.cpu_count() or 1))
+
+# Extracted document text is cached by content hash: up to
+# EXTRACT_CACHE_MEMORY_BYTES of text (UTF-8 size) in memory, and up to
+# EXTRACT_CACHE_DISK_BYTES of compressed text in EXTRACT_CACHE_DB
+# (0 disables the disk tier).
+EXTRACT_CACHE_MEMORY_BYTES = _env_int("LAVENDRIX_EXTRACT_CACHE_MEMORY_BYTES", 64 * 1024 * 1024)
+EXTRACT_CACHE_DISK_BYTES = _env_int("LAVENDRIX_EXTRACT_CACHE_DISK_BYTES", 512 * 1024 * 1024)
+EXTRACT_CACHE_DB = _env_str("LAVENDRIX_EXTRACT_CACHE_DB", os.path.join(STORAGE_ROOT, "extract_cache.db"))
+
+# /analyze-document splits uploads into sections of about this many
+# characters and analyses at most DOCUMENT_SECTION_WINDOW sections at once;
+# extraction pauses while the window is full.
+DOCUMENT_SECTION_CHARS = _env_int("LAVENDRIX_DOCUMENT_SECTION_CHARS", 4000)
+DOCUMENT_SECTION_WINDOW = _env_int("LAVENDRIX_DOCUMENT_SECTION_WINDOW", 8)
+
+# Documents uploaded to /analyze-document are spooled in memory up to this
+# size, then to a temporary file.
+DOCUMENT_SPOOL_BYTES = _env_int("LAVENDRIX_DOCUMENT_SPOOL_BYTES", 16 * 1024 * 1024)
+
+
+# ---------------- VISION ----------------
+
+# Side of the square tiles compare_ui diffs at a time. Peak working memory
+# is about 12 * tile_size * image_width bytes on top of the decoded images:
+# a 3840x2160 comparison at 128 peaks at 6.0 MB of traced allocations
+# (tests/test_vision.py holds it under 8 MB), against 99.6 MB for
+# whole-image arrays.
+VISION_TILE_SIZE = _env_int("LAVENDRIX_VISION_TILE_SIZE", 128)
+
+# A tile whose mean difference exceeds this percentage counts as changed and
+# contributes to the reported changed regions.
+VISION_TILE_CHANGE_PERCENT = _env_float("LAVENDRIX_VISION_TILE_CHANGE_PERCENT", 2.0)
+
+# Where compare_ui decodes and diffs images: "process" (a process pool),
+# "thread" (a thread pool; NumPy and PIL release the GIL for most of the
+# work) or "inline" (on the event loop, for debugging).
+VISION_POOL_KIND = _env_str("LAVENDRIX_VISION_POOL_KIND", "process")
+VISION_POOL_SIZE = _env_int("LAVENDRIX_VISION_POOL_SIZE", min(4, os.cpu_count() or 1))
+
+# Comparisons allowed to wait for a free worker; beyond that requests get 503.
+VISION_QUEUE_LIMIT = _env_int("LAVENDRIX_VISION_QUEUE_LIMIT", 16)
+
+# Registered baselines (decoded .npy arrays plus metadata) live here.
+BASELINE_DIR = _env_str("LAVENDRIX_BASELINE_DIR", os.path.join(STORAGE_ROOT, "baselines"))
+
+# compare_ui skips the pixel diff when the current screenshot's 64-bit
+# perceptual hash is within this many bits of the registered baseline's and
+# their 16x16 grayscale thumbnails differ by at most the given percentage.
+VISION_PHASH_TOLERANCE = _env_int("LAVENDRIX_VISION_PHASH_TOLERANCE", 0)
+VISION_THUMBNAIL_TOLERANCE = _env_float("LAVENDRIX_VISION_THUMBNAIL_TOLERANCE", 0.5)
+
+# Uploaded screenshot archives are spooled in memory up to this size, then
+# to a temporary file. The files of a multipart batch share the same budget
+# evenly.
+VISION_ARCHIVE_SPOOL_BYTES = _env_int("LAVENDRIX_VISION_ARCHIVE_SPOOL_BYTES", 64 * 1024 * 1024)
+
+# Default comparison resolution: "full" diffs every pixel, "coarse" only
+# diffs images downsampled by VISION_COARSE_FACTOR, "adaptive" diffs the
+# coarse images and escalates to full resolution when the coarse score lies
+# within VISION_ESCALATION_MARGIN percentage points of a severity threshold.
+VISION_PRECISION = _env_str("LAVENDRIX_VISION_PRECISION", "full")
+VISION_COARSE_FACTOR = _env_int("LAVENDRIX_VISION_COARSE_FACTOR", 8)
+VISION_ESCALATION_MARGIN = _env_float("LAVENDRIX_VISION_ESCALATION_MARGIN", 1.5)
@@ -0,0 +1,363 @@
+import functools
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import weakref
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from . import settings
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_all_connections = weakref.WeakSet()
+_writers = {}
+
+
+def _configure(conn):
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_KB}")
+    conn.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+
+class _ThreadConnections:
+    """One thread's connections by path, closed when the thread exits."""
+
+    def __init__(self):
+        self.by_path = {}
+
+    def close(self):
+        for conn in list(self.by_path.values()):
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+        self.by_path.clear()
+
+    # The thread-local is released when its thread ends, even for short-lived
+    # worker threads, so their connections and file descriptors go with it.
+    __del__ = close
+
+
+def get_connection(db_path):
+    """
+    Return this thread's long-lived connection to ``db_path``.
+
+    Connections are opened once per (thread, database) and kept for the life
+    of the thread, so the prepared statements cached by sqlite3 are reused
+    across calls as long as callers pass the same SQL text. They are closed
+    when the thread exits.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = _ThreadConnections()
+        with _registry_lock:
+            _all_connections.add(connections)
+
+    conn = connections.by_path.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(
+            db_path,
+            cached_statements=settings.SQLITE_STATEMENT_CACHE,
+            check_same_thread=False
+        )
+        _configure(conn)
+        connections.by_path[db_path] = conn
+
+    return conn
+
+
+@contextmanager
+def transaction(db_path):
+    """
+    Run a block of statements as one transaction on the thread's connection.
+    Commits on success, rolls back if the block raises.
+    """
+    conn = get_connection(db_path)
+    with conn:
+        yield conn.cursor()
+
+
+# ---------------- SHARDING ----------------
+
+@functools.lru_cache(maxsize=None)
+def _shard_files(db_path, shards):
+    if shards <= 1:
+        return (db_path,)
+    base, ext = os.path.splitext(db_path)
+    return tuple(f"{base}.{number}{ext}" for number in range(shards))
+
+
+def shard_paths(db_path, shards=None):
+    """
+    The files ``db_path`` is split into: ``db_path`` itself for a single
+    shard, otherwise name.0.db ... name.<n-1>.db next to it.
+    """
+    return _shard_files(db_path, shards or settings.STORAGE_SHARDS)
+
+
+def shard_index(key, shards):
+    """Stable shard number of ``key`` (the same in every process)."""
+    if shards <= 1:
+        return 0
+    digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def shard_path(db_path, key, shards=None):
+    """The shard file of ``db_path`` that holds ``key``."""
+    paths = shard_paths(db_path, shards)
+    return paths[shard_index(key, len(paths))]
+
+
+def partition(db_path, items, key, shards=None):
+    """Group ``items`` by the shard file of ``key(item)``: {path: [items]}."""
+    paths = shard_paths(db_path, shards)
+    groups = {}
+    for item in items:
+        groups.setdefault(paths[shard_index(key(item), len(paths))], []).append(item)
+    return groups
+
+
+def _meta_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS storage_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+
+
+def get_meta(cursor, key):
+    """A value from the database's storage_meta table, or None."""
+    _meta_table(cursor)
+    row = cursor.execute("SELECT value FROM storage_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(cursor, key, value):
+    _meta_table(cursor)
+    cursor.execute(
+        "INSERT OR REPLACE INTO storage_meta (key, value) VALUES (?, ?)", (key, str(value))
+    )
+
+
+def _shard_files_on_disk(db_path):
+    directory = os.path.dirname(db_path) or "."
+    base, ext = os.path.splitext(os.path.basename(db_path))
+    numbered = re.compile(re.escape(base) + r"\.\d+" + re.escape(ext) + "$")
+    names = os.listdir(directory) if os.path.isdir(directory) else []
+    return [
+        os.path.join(directory, name) for name in sorted(names)
+        if name == base + ext or numbered.match(name)
+    ]
+
+
+def check_shard_layout(db_path, shards=None):
+    """
+    Refuse to open ``db_path`` with a different shard count than its files
+    were written with (rows would be looked up in the wrong files), then
+    record the count in every shard. For files from before the count was
+    recorded, an unnumbered file counts as one shard.
+    """
+    shards = shards or settings.STORAGE_SHARDS
+    expected = shard_paths(db_path, shards)
+
+    for path in _shard_files_on_disk(db_path):
+        with transaction(path) as cursor:
+            recorded = get_meta(cursor, "shards")
+        if recorded is None:
+            recorded = "1" if path == db_path else str(shards) if path in expected else None
+        if path not in expected or recorded != str(shards):
+            raise RuntimeError(
+                f"{path} was written with {recorded or 'an unknown number of'} shard(s) "
+                f"but LAVENDRIX_STORAGE_SHARDS is {shards}; set it back or move the "
+                f"old files away"
+            )
+
+    for path in expected:
+        with transaction(path) as cursor:
+            set_meta(cursor, "shards", shards)
+
+
+class ShardWriteError(Exception):
+    """
+    Raised by write_sharded when some shards failed. The other shards have
+    committed; ``errors`` maps each failed shard path to its exception and
+    ``failed_items`` lists the items that were not written.
+    """
+
+    def __init__(self, errors, failed_items):
+        super().__init__("; ".join(f"{path}: {error}" for path, error in errors.items()))
+        self.errors = errors
+        self.failed_items = failed_items
+
+
+def write_sharded(db_path, items, key, fn, shards=None):
+    """
+    Run ``fn(cursor, shard_items)`` once per shard touched by ``items``
+    through each shard's write queue, and wait for all of them. Shards
+    commit independently, in parallel. Returns ``{path: result}``; if any
+    shard fails, raises ShardWriteError once every shard has finished.
+    """
+    groups = partition(db_path, items, key, shards)
+    futures = {path: writer(path).submit(fn, group) for path, group in groups.items()}
+
+    results, errors = {}, {}
+    for path, future in futures.items():
+        try:
+            results[path] = future.result()
+        except Exception as e:
+            errors[path] = e
+
+    if errors:
+        raise ShardWriteError(
+            errors, [item for path in errors for item in groups[path]]
+        )
+    return results
+
+
+# ---------------- WRITE QUEUE ----------------
+
+class WriteQueue:
+    """
+    The single writer for one database.
+
+    Callers submit ``fn(cursor, *args)`` jobs to a bounded queue (submitting
+    blocks while it is full). A dedicated thread takes whatever is queued,
+    up to ``max_batch`` jobs, runs each inside its own savepoint and commits
+    the batch once, so concurrent writers never contend for SQLite's write
+    lock. A failing job is rolled back alone and its exception is raised to
+    its caller. Readers keep using their own connections under WAL.
+    """
+
+    def __init__(self, db_path, queue_limit=None, max_batch=None):
+        self.db_path = db_path
+        self.max_batch = max_batch or settings.WRITE_BATCH_MAX
+        self._queue = queue.Queue(maxsize=queue_limit or settings.WRITE_QUEUE_LIMIT)
+        self._lock = threading.Lock()
+        self._counters = {"jobs": 0, "failed": 0, "batches": 0, "max_batch": 0, "last_batch": 0}
+        self._thread = threading.Thread(
+            target=self._run, name=f"sqlite-writer-{db_path}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, fn, *args):
+        """Queue a write; returns a Future for fn's result."""
+        future = Future()
+        self._queue.put((fn, args, future))
+        return future
+
+    def write(self, fn, *args):
+        """Queue a write and wait for it to be committed."""
+        return self.submit(fn, *args).result()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+
+            batch = [job]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch):
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        results = []
+        failed = 0
+
+        try:
+            cursor.execute("BEGIN")
+            for fn, args, future in batch:
+                cursor.execute("SAVEPOINT job")
+                try:
+                    results.append((future, fn(cursor, *args), None))
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO job")
+                    results.append((future, None, e))
+                    failed += 1
+                cursor.execute("RELEASE job")
+            conn.commit()
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            results = [(future, None, e) for _, _, future in batch]
+            failed = len(batch)
+
+        with self._lock:
+            self._counters["jobs"] += len(batch)
+            self._counters["failed"] += failed
+            self._counters["batches"] += 1
+            self._counters["last_batch"] = len(batch)
+            self._counters["max_batch"] = max(self._counters["max_batch"], len(batch))
+
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_batch"] = round(stats["jobs"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def close(self):
+        """Commit everything already queued, then stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+def writer(db_path):
+    """The WriteQueue for ``db_path``, started on first use."""
+    queue_ = _writers.get(db_path)
+    if queue_ is None:
+        with _registry_lock:
+            queue_ = _writers.get(db_path)
+            if queue_ is None:
+                queue_ = _writers[db_path] = WriteQueue(db_path)
+    return queue_
+
+
+def writer_stats():
+    return {db_path: queue_.stats() for db_path, queue_ in list(_writers.items())}
+
+
+def close_all():
+    """
+    Drain and stop the write queues, then close every pooled connection
+    (used on application shutdown). Threads that keep running open new
+    connections on their next call.
+    """
+    with _registry_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for queue_ in writers:
+        queue_.close()
+
+    with _registry_lock:
+        holders = list(_all_connections)
+
+    for connections in holders:
+        connections.close()
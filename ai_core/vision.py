@@ -0,0 +1,316 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from . import settings
+
+# Difference percentages used by compare_ui to flag and grade regressions.
+REGRESSION_PERCENT = 5
+MEDIUM_PERCENT = 10
+HIGH_PERCENT = 20
+
+PRECISIONS = ("full", "adaptive", "coarse")
+
+
+def load_image(data):
+    return Image.open(io.BytesIO(data)).convert("RGB")
+
+
+def load_image_reduced(data, factor):
+    """
+    Decode an encoded screenshot at 1/``factor`` of its size. JPEGs are
+    decoded at reduced scale directly (PIL ``draft``), so the full-size
+    image is never materialized. Returns (image, full_size).
+    """
+    image = Image.open(io.BytesIO(data))
+    full_size = image.size
+    target = (max(1, full_size[0] // factor), max(1, full_size[1] // factor))
+    if image.format == "JPEG":
+        image.draft("RGB", target)
+    return image.convert("RGB").resize(target, Image.BOX), full_size
+
+
+def downsample(image, factor):
+    """Block-mean downsample of a PIL image or H x W x 3 array."""
+    if not isinstance(image, np.ndarray):
+        width, height = image.size
+        return image.resize((max(1, width // factor), max(1, height // factor)), Image.BOX)
+
+    height, width = image.shape[0] // factor, image.shape[1] // factor
+    if not height or not width:
+        return downsample(Image.fromarray(np.asarray(image)), factor)
+
+    out = np.empty((height, width, 3), dtype=np.uint8)
+    # A few output rows at a time, so a memory-mapped array is streamed.
+    step = max(1, settings.VISION_TILE_SIZE // factor)
+    for top in range(0, height, step):
+        bottom = min(top + step, height)
+        block = np.asarray(image[top * factor:bottom * factor, :width * factor])
+        out[top:bottom] = block.reshape(
+            bottom - top, factor, width, factor, 3
+        ).mean(axis=(1, 3)).round()
+    return out
+
+
+def classify(difference_percent):
+    """Return (regression_detected, severity) for a difference percentage."""
+    severity = "LOW"
+    if difference_percent > HIGH_PERCENT:
+        severity = "HIGH"
+    elif difference_percent > MEDIUM_PERCENT:
+        severity = "MEDIUM"
+
+    return bool(difference_percent > REGRESSION_PERCENT), severity
+
+
+def image_size(image):
+    """(width, height) of a PIL image or an H x W x 3 array."""
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    return image.size
+
+
+def perceptual_hash(image, hash_size=8):
+    """64-bit difference hash (dHash) of a PIL image or H x W x 3 array."""
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(np.asarray(image))
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def hash_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def thumbnail(image, size=16):
+    """
+    Grayscale ``size`` x ``size`` thumbnail as bytes. dHash only encodes
+    gradients (a flat white and a flat black screen hash the same), so
+    baselines keep this alongside it to catch brightness and colour shifts.
+    """
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(np.asarray(image))
+    return image.convert("L").resize((size, size), Image.BOX).tobytes()
+
+
+def thumbnail_difference(a, b):
+    """Mean absolute difference of two thumbnails, as a percentage."""
+    a = np.frombuffer(a, dtype=np.uint8).astype(np.int16)
+    b = np.frombuffer(b, dtype=np.uint8).astype(np.int16)
+    return float(np.abs(a - b).mean() / 255 * 100)
+
+
+def _band(image, top, bottom):
+    if isinstance(image, np.ndarray):
+        # Slicing a memory-mapped baseline only pages in these rows.
+        return np.asarray(image[top:bottom])
+    return np.asarray(image.crop((0, top, image.width, bottom)))
+
+
+def _changed_regions(changed, tile_size, width, height, tile_scores):
+    """Bounding boxes of 4-connected groups of changed tiles, in pixels."""
+    rows, columns = changed.shape
+    seen = np.zeros_like(changed)
+    regions = []
+
+    for row in range(rows):
+        for column in range(columns):
+            if not changed[row, column] or seen[row, column]:
+                continue
+
+            stack = [(row, column)]
+            seen[row, column] = True
+            tiles = []
+            while stack:
+                r, c = stack.pop()
+                tiles.append((r, c))
+                for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                    if 0 <= nr < rows and 0 <= nc < columns \
+                            and changed[nr, nc] and not seen[nr, nc]:
+                        seen[nr, nc] = True
+                        stack.append((nr, nc))
+
+            top = min(r for r, _ in tiles) * tile_size
+            left = min(c for _, c in tiles) * tile_size
+            bottom = min(height, (max(r for r, _ in tiles) + 1) * tile_size)
+            right = min(width, (max(c for _, c in tiles) + 1) * tile_size)
+            regions.append({
+                "x": left,
+                "y": top,
+                "width": right - left,
+                "height": bottom - top,
+                "max_tile_difference_percent": round(
+                    float(max(tile_scores[r, c] for r, c in tiles)), 2
+                )
+            })
+
+    return regions
+
+
+def compare_images(baseline, current, tile_size=None, change_percent=None):
+    """
+    Mean absolute RGB difference between two images, computed one band of
+    ``tile_size`` rows at a time.
+
+    ``baseline`` may be a PIL image or an H x W x 3 uint8 array (such as a
+    memory-mapped registered baseline); ``current`` is a PIL image and is
+    resized to the baseline's size if needed. Only one
+    band of each image is ever held as an array, so besides the two decoded
+    images (3 bytes per pixel each) the working arrays take about
+    ``12 * tile_size * width`` bytes: the two uint8 bands, their difference
+    and one temporary.
+
+    Returns the overall difference percentage, per-tile difference
+    percentages (rows x columns) and the bounding boxes of connected groups
+    of tiles that differ by more than ``change_percent``.
+    """
+    tile_size = tile_size or settings.VISION_TILE_SIZE
+    if change_percent is None:
+        change_percent = settings.VISION_TILE_CHANGE_PERCENT
+
+    width, height = image_size(baseline)
+    if current.size != (width, height):
+        current = current.resize((width, height))
+
+    columns = -(-width // tile_size)
+    rows = -(-height // tile_size)
+    column_starts = np.arange(0, width, tile_size)
+    column_widths = np.minimum(column_starts + tile_size, width) - column_starts
+
+    tile_scores = np.zeros((rows, columns))
+    total = 0
+
+    for row, top in enumerate(range(0, height, tile_size)):
+        bottom = min(top + tile_size, height)
+
+        # |a - b| as max - min keeps uint8 without wrapping around.
+        a = _band(baseline, top, bottom)
+        b = _band(current, top, bottom)
+        diff = np.maximum(a, b)
+        diff -= np.minimum(a, b)
+
+        # Sum down the band rows first (contiguous, fast), then over the
+        # channels, then per column tile.
+        column_sums = diff.sum(axis=0, dtype=np.uint32).sum(axis=1, dtype=np.int64)
+        del a, b, diff
+        tile_sums = np.add.reduceat(column_sums, column_starts)
+        total += int(tile_sums.sum())
+
+        pixels = column_widths * (bottom - top) * 3
+        tile_scores[row] = tile_sums / pixels / 255 * 100
+
+    difference_percent = total / (width * height * 3) / 255 * 100
+    changed = tile_scores > change_percent
+
+    return {
+        "difference_percent": difference_percent,
+        "tile_size": tile_size,
+        "tile_scores": tile_scores,
+        "changed_regions": _changed_regions(changed, tile_size, width, height, tile_scores)
+    }
+
+
+def near_threshold(difference_percent, margin):
+    return any(
+        abs(difference_percent - threshold) <= margin
+        for threshold in (REGRESSION_PERCENT, MEDIUM_PERCENT, HIGH_PERCENT)
+    )
+
+
+def _scale_result(result, factor, coarse_size, full_size):
+    # Report a coarse comparison in full-resolution pixel coordinates.
+    # Downsampling drops the last width % factor columns (and rows), so a
+    # region reaching the coarse edge extends to the full image's edge.
+    coarse_width, coarse_height = coarse_size
+    width, height = full_size
+    result["tile_size"] *= factor
+    for region in result["changed_regions"]:
+        right = region["x"] + region["width"]
+        bottom = region["y"] + region["height"]
+        right = width if right >= coarse_width else min(width, right * factor)
+        bottom = height if bottom >= coarse_height else min(height, bottom * factor)
+        region["x"] *= factor
+        region["y"] *= factor
+        region["width"] = right - region["x"]
+        region["height"] = bottom - region["y"]
+    return result
+
+
+def compare_multiresolution(load_baseline, load_current, precision=None,
+                            coarse_factor=None, margin=None, tile_size=None,
+                            **options):
+    """
+    Coarse-to-fine comparison.
+
+    ``load_baseline(factor)`` and ``load_current(factor)`` return the image
+    at 1/factor scale (factor 1 is full size) plus the full (width, height).
+    Depending on ``precision`` (see settings.VISION_PRECISION) the pair is
+    diffed at full size, at 1/``coarse_factor`` scale, or at coarse scale
+    first with escalation to full size when the coarse score is within
+    ``margin`` points of a severity threshold. The result records the
+    ``resolution`` used and whether it ``escalated``.
+    """
+    precision = precision or settings.VISION_PRECISION
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {', '.join(PRECISIONS)}")
+    factor = coarse_factor or settings.VISION_COARSE_FACTOR
+    if margin is None:
+        margin = settings.VISION_ESCALATION_MARGIN
+    tile_size = tile_size or settings.VISION_TILE_SIZE
+
+    escalated = False
+    if precision != "full" and factor > 1:
+        baseline, full_size = load_baseline(factor)
+        current, _ = load_current(factor)
+        result = compare_images(
+            baseline, current, tile_size=max(1, tile_size // factor), **options
+        )
+        result = _scale_result(result, factor, image_size(baseline), full_size)
+
+        if precision == "coarse" or not near_threshold(result["difference_percent"], margin):
+            result.update(resolution="coarse", escalated=False)
+            return result
+        escalated = True
+
+    result = compare_images(load_baseline(1)[0], load_current(1)[0],
+                            tile_size=tile_size, **options)
+    result.update(resolution="full", escalated=escalated)
+    return result
+
+
+def bytes_loader(data):
+    """
+    Loader for compare_multiresolution over an encoded screenshot. JPEGs
+    are decoded at reduced scale for coarse passes; other formats are
+    decoded once and the full image reused if the comparison escalates.
+    """
+    decoded = {}
+
+    def load(factor):
+        if "full" not in decoded:
+            image = Image.open(io.BytesIO(data))
+            if factor != 1 and image.format == "JPEG":
+                return load_image_reduced(data, factor)
+            decoded["full"] = image.convert("RGB")
+
+        image = decoded["full"]
+        return (image if factor == 1 else downsample(image, factor)), image.size
+
+    return load
+
+
+def image_loader(image):
+    """Loader for compare_multiresolution over a decoded image or array."""
+    def load(factor):
+        return (image if factor == 1 else downsample(image, factor)), image_size(image)
+    return load
+
+
+def compare_bytes(baseline_bytes, current_bytes, **options):
+    """Decode two encoded screenshots and compare them."""
+    return compare_multiresolution(
+        bytes_loader(baseline_bytes), bytes_loader(current_bytes), **options
+    )
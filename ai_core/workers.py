@@ -0,0 +1,129 @@
+import asyncio
+import functools
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class PoolBusy(Exception):
+    pass
+
+
+def _set_done(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class WorkerPool:
+    """
+    Runs CPU-bound functions off the event loop with a bounded backlog.
+
+    ``kind`` is "process", "thread" or "inline". At most ``size`` calls run
+    at once and ``queue_limit`` more may wait; further submissions raise
+    PoolBusy instead of queueing without limit, unless made with
+    run_when_free, which waits until a running call finishes. Functions
+    (and their arguments and results) must be picklable for the process
+    pool.
+    """
+
+    def __init__(self, kind, size, queue_limit):
+        if kind not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+
+        self.kind = kind
+        self.size = max(1, size)
+        self.queue_limit = queue_limit
+        self._executor = None
+        self._in_flight = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.size,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.size, thread_name_prefix="vision"
+                    )
+            return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` in the pool; PoolBusy if it is full."""
+        return await self._run(False, fn, args, kwargs)
+
+    async def run_when_free(self, fn, *args, **kwargs):
+        """Like run, but wait for a free slot instead of raising PoolBusy."""
+        return await self._run(True, fn, args, kwargs)
+
+    async def _run(self, wait, fn, args, kwargs):
+        if self.kind == "inline":
+            return fn(*args, **kwargs)
+
+        await self._acquire(wait)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._wake_next()
+
+    async def _acquire(self, wait):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._in_flight < self.size + self.queue_limit:
+                    self._in_flight += 1
+                    return
+                if not wait:
+                    raise PoolBusy(
+                        f"{self._in_flight} jobs already running or queued"
+                    )
+                waiter = loop.create_future()
+                self._waiters.append(waiter)
+
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    woken = waiter not in self._waiters
+                    if not woken:
+                        self._waiters.remove(waiter)
+                if woken:
+                    # Pass the wake-up on rather than lose the free slot.
+                    self._wake_next()
+                raise
+
+    def _wake_next(self):
+        # Waiters may belong to other event loops, so wake them thread-safely.
+        with self._lock:
+            waiter = self._waiters.popleft() if self._waiters else None
+        if waiter is not None:
+            try:
+                waiter.get_loop().call_soon_threadsafe(_set_done, waiter)
+            except RuntimeError:
+                # Its loop has closed; nobody is waiting on it any more.
+                self._wake_next()
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "size": self.size,
+            "queue_limit": self.queue_limit,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters)
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,116 @@
+import sqlite3
+
+import pytest
+
+from ai_core import analytics_db, memory_db, settings, storage
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics_db, "DB_NAME", str(tmp_path / "root" / "analytics.db"))
+    monkeypatch.setattr(analytics_db, "LEGACY_DB_NAME", None)
+    monkeypatch.setattr(memory_db, "DB_NAME", str(tmp_path / "root" / "brain_memory.db"))
+    yield tmp_path
+    storage.close_all()
+
+
+def _legacy_db(path):
+    # The layout analytics.db had before created_ts and the storage root.
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE defects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT, industry TEXT,
+            module_name TEXT, severity TEXT, created_at TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE project_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT, industry TEXT,
+            avg_complexity REAL, avg_risk REAL, delay_probability REAL, created_at TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO defects (session_id, industry, module_name, severity, created_at) "
+        "VALUES (?, 'IT', ?, 'HIGH', '2024-03-01T10:15:00.123456')",
+        [(f"s{i % 3}", f"m{i % 2}") for i in range(6)]
+    )
+    conn.execute(
+        "INSERT INTO project_snapshots (session_id, industry, avg_complexity, avg_risk, "
+        "delay_probability, created_at) VALUES ('s0', 'IT', 4.0, 2.0, 0.1, '2024-03-01T10:15:00')"
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.parametrize("shards", [1, 3])
+def test_legacy_analytics_db_is_imported_once(root, monkeypatch, shards):
+    monkeypatch.setattr(settings, "STORAGE_SHARDS", shards)
+    legacy = str(root / "analytics.db")
+    _legacy_db(legacy)
+    monkeypatch.setattr(analytics_db, "LEGACY_DB_NAME", legacy)
+
+    analytics_db.init_analytics_db()
+    analytics_db.init_analytics_db()
+
+    totals = [analytics_db.get_defect_dashboard(f"s{i}")["total_bugs_detected"] for i in range(3)]
+    assert totals == [2, 2, 2]
+    assert analytics_db.get_industry_baseline("IT")["sample_size"] == 1
+
+    conn = storage.get_connection(storage.shard_path(analytics_db.DB_NAME, "s0"))
+    assert conn.execute(
+        "SELECT SUM(count) FROM defect_rollups WHERE session_id = 's0' AND resolution = 86400"
+    ).fetchone()[0] == 2
+
+
+def test_working_directory_analytics_db_is_not_imported(tmp_path, monkeypatch):
+    # Only settings.ANALYTICS_LEGACY_DB names a legacy database.
+    assert analytics_db.LEGACY_DB_NAME is None
+    _legacy_db(str(tmp_path / "analytics.db"))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(analytics_db, "DB_NAME", str(tmp_path / "root" / "analytics.db"))
+
+    analytics_db.init_analytics_db()
+
+    assert analytics_db.get_defect_dashboard("s0")["total_bugs_detected"] == 0
+    storage.close_all()
+
+
+@pytest.mark.parametrize("init", [analytics_db.init_analytics_db, memory_db.init_db])
+def test_changed_shard_count_is_refused(root, monkeypatch, init):
+    monkeypatch.setattr(settings, "STORAGE_SHARDS", 2)
+    init()
+    storage.close_all()
+
+    for shards in (1, 4):
+        monkeypatch.setattr(settings, "STORAGE_SHARDS", shards)
+        with pytest.raises(RuntimeError, match="shard"):
+            init()
+
+    monkeypatch.setattr(settings, "STORAGE_SHARDS", 2)
+    init()
+
+
+def test_backfilled_counters_match_the_defects_table(root):
+    analytics_db.init_analytics_db()
+    path = storage.shard_path(analytics_db.DB_NAME, "legacy")
+    conn = storage.get_connection(path)
+    conn.executemany(
+        "INSERT INTO defects (session_id, industry, module_name, severity, created_ts) "
+        "VALUES ('legacy', 'IT', ?, ?, 0)",
+        [("login", "HIGH"), (None, "HIGH"), ("login", None), (None, None), ("login", "LOW")]
+    )
+    conn.commit()
+    before = conn.execute(
+        "SELECT COUNT(*) FROM defects WHERE session_id = 'legacy'"
+    ).fetchone()[0]
+
+    analytics_db.backfill_defect_counters()
+    dashboard = analytics_db.get_defect_dashboard("legacy")
+
+    assert dashboard["total_bugs_detected"] == before == 5
+    assert dashboard["high_severity_bugs"] == 2
+    assert dashboard["most_affected_module"] == "login"
+
+    # Live inserts count missing labels the same way.
+    analytics_db.insert_defect("legacy", "IT", None, None)
+    assert analytics_db.get_defect_dashboard("legacy")["total_bugs_detected"] == 6
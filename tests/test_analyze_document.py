@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_core import api
+
+PAGES = [
+    "Login page must lock the account after five failed password attempts " * 2,
+    "Payment checkout should retry the card gateway and refund on timeout " * 2,
+    "Reports export large CSV files for the admin dashboard every night " * 2,
+]
+
+
+def _parse(fmt, body):
+    if fmt == "ndjson":
+        lines = [json.loads(line) for line in body.splitlines()]
+        return ["summary" if "summary" in line else "section" for line in lines], lines
+    events, payloads = [], []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append(event.removeprefix("event: "))
+        payloads.append(json.loads(data.removeprefix("data: ")))
+    return events, payloads
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "sse"])
+def test_sections_stream_before_the_summary(fmt, make_pdf):
+    response = TestClient(api.app).post(
+        "/analyze-document",
+        params={"session_id": f"doc-{fmt}", "industry": "IT",
+                "section_chars": 200, "format": fmt},
+        files={"file": ("spec.pdf", make_pdf(PAGES), "application/pdf")}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(
+        "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    )
+    events, payloads = _parse(fmt, response.text)
+    assert events == ["section"] * len(PAGES) + ["summary"]
+
+    sections = sorted(payloads[:-1], key=lambda s: s["section"])
+    assert [s["section"] for s in sections] == list(range(len(PAGES)))
+    for section, page in zip(sections, PAGES):
+        # Each page is its own section and analysed as if on its own.
+        expected = api._analyze_section(section["section"], page + "\n",
+                                         "IT", "medium", "medium", 8, 5)
+        assert {k: section[k] for k in expected} == expected
+
+    # The rolling aggregate grows one section per line and ends at the summary.
+    assert [s["aggregate"]["sections"] for s in payloads[:-1]] == [1, 2, 3]
+    summary = payloads[-1]
+    assert summary["session_id"] == f"doc-{fmt}"
+    assert summary["summary"] == payloads[-2]["aggregate"]
+    assert summary["summary"]["characters"] == sum(len(page) + 1 for page in PAGES)
+
+
+def test_empty_document_streams_only_the_summary():
+    response = TestClient(api.app).post(
+        "/analyze-document", params={"session_id": "doc-empty", "industry": "IT"},
+        files={"file": ("empty.txt", b"", "text/plain")}
+    )
+
+    assert response.text.splitlines() == [json.dumps({
+        "session_id": "doc-empty", "summary": {"sections": 0, "characters": 0}
+    })]
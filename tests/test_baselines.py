@@ -0,0 +1,69 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from ai_core import baselines, settings
+from ai_core.vision import compare_bytes
+
+
+def _png(array):
+    out = io.BytesIO()
+    Image.fromarray(array).save(out, "PNG")
+    return out.getvalue()
+
+
+def _screenshot():
+    # A gradient with a few blocks so the perceptual hash has structure.
+    x = np.linspace(0, 255, 320, dtype=np.uint8)
+    image = np.repeat(np.tile(x, (240, 1))[:, :, None], 3, axis=2)
+    image[40:100, 40:140] = (200, 30, 30)
+    image[150:220, 180:300] = (30, 30, 200)
+    return image
+
+
+@pytest.fixture()
+def registered():
+    baseline = _screenshot()
+    meta = baselines.register_baseline("IT", "checkout", _png(baseline))
+    return baseline, meta
+
+
+def test_identical_screenshot_skips_the_pixel_diff(registered, monkeypatch):
+    baseline, meta = registered
+
+    def no_pixel_diff(*args, **kwargs):
+        raise AssertionError("pixel diff ran for an unchanged screenshot")
+
+    monkeypatch.setattr(baselines, "compare_multiresolution", no_pixel_diff)
+    result = baselines.compare_with_registered(meta, _png(baseline))
+
+    assert result["method"] == "perceptual_hash"
+    assert result["hash_distance"] == 0
+    assert result["resolution"] == "thumbnail"
+    assert result["difference_percent"] <= settings.VISION_THUMBNAIL_TOLERANCE
+
+
+def test_changed_screenshot_falls_back_to_the_pixel_diff(registered):
+    baseline, meta = registered
+    current = baseline.copy()
+    current[0:120, 160:320] = 255
+
+    result = baselines.compare_with_registered(meta, _png(current))
+    uploaded = compare_bytes(_png(baseline), _png(current))
+
+    assert result["method"] == "pixel_diff"
+    assert result["hash_distance"] > settings.VISION_PHASH_TOLERANCE
+    # The memory-mapped baseline diffs exactly like the uploaded one.
+    assert result["difference_percent"] == pytest.approx(uploaded["difference_percent"])
+    assert result["changed_regions"] == uploaded["changed_regions"]
+
+
+def test_negative_tolerance_forces_the_pixel_diff(registered):
+    baseline, meta = registered
+
+    result = baselines.compare_with_registered(meta, _png(baseline), tolerance=-1)
+
+    assert result["method"] == "pixel_diff"
+    assert result["difference_percent"] == 0
@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_core import api
+from ai_core.engines.core import CoreBrain
+from ai_core.engines.pm_engine import PMEngine
+from ai_core.engines.rules import match_terms
+from ai_core.engines.test_cases_engine import TestCaseEngine
+
+FEATURES = [
+    ("Login", "Users sign in with a password and an OTP token", "high"),
+    ("Payments", "Detect  fraud on card payments\nand keep PCI compliance", "medium"),
+    ("Search", "Search the catalogue", "low"),
+    ("Export", "Export reports with end-to-end encryption " * 6, "unknown"),
+    ("Empty", "", "HIGH"),
+]
+
+
+def test_array_scores_match_the_scalar_scores():
+    texts = [description for _, description, _ in FEATURES]
+    hits = [match_terms(text) for text in texts]
+
+    assert CoreBrain.compute_complexity_many(texts, hits).tolist() == [
+        CoreBrain.compute_complexity(text) for text in texts
+    ]
+    assert CoreBrain.risk_weight_many([level for _, _, level in FEATURES]).tolist() == [
+        CoreBrain.risk_weight(level) for _, _, level in FEATURES
+    ]
+
+
+@pytest.mark.parametrize("industry", ["FinTech", "IT"])
+def test_engine_batches_match_one_item_batches(industry):
+    engine = TestCaseEngine()
+    assert engine.generate_many(industry, FEATURES) == [
+        engine.generate_many(industry, [feature])[0] for feature in FEATURES
+    ]
+
+    projects = [(description, weeks, team)
+                for (_, description, _), weeks, team in zip(FEATURES, [2, 8, 1, 20, 4], [1, 5, 0, 12, 3])]
+    pm = PMEngine()
+    assert pm.generate_many(industry, projects) == [
+        pm.generate_many(industry, [project])[0] for project in projects
+    ]
+
+
+def test_batch_route_matches_single_calls_and_session_totals():
+    client = TestClient(api.app)
+    singles = [
+        client.post("/generate-testcases", json={
+            "session_id": "scoring-single", "industry": "FinTech", "feature": feature,
+            "description": description, "risk_level": level
+        }).json()
+        for feature, description, level in FEATURES
+    ]
+    batch = client.post("/generate-testcases/batch", json={
+        "session_id": "scoring-batch", "industry": "FinTech",
+        "features": [{"feature": f, "description": d, "risk_level": r} for f, d, r in FEATURES]
+    }).json()
+
+    assert batch == {"count": len(FEATURES), "results": singles}
+
+    single, batched = (api.brain.sessions.get(s) for s in ("scoring-single", "scoring-batch"))
+    for key in ("history_count", "risk_sum", "complexity_sum",
+                "risk_history", "complexity_history"):
+        assert batched[key] == single[key]
+    assert batched["history_count"] == len(FEATURES)
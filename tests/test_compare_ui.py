@@ -0,0 +1,166 @@
+import asyncio
+import io
+import json
+import threading
+
+import pytest
+from PIL import Image
+from starlette.datastructures import UploadFile
+
+from ai_core import api
+from ai_core.analytics_db import get_defect_dashboard
+from ai_core.workers import PoolBusy, WorkerPool
+
+
+def _png(color, size=(64, 64)):
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, "PNG")
+    return out.getvalue()
+
+
+def test_run_when_free_waits_for_a_slot_instead_of_failing():
+    pool = WorkerPool("thread", 1, 0)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(PoolBusy):
+            await pool.run(sum, [1, 2])
+
+        second = asyncio.ensure_future(pool.run_when_free(sum, [1, 2]))
+        await asyncio.sleep(0.05)
+        assert not second.done()
+        assert pool.stats()["waiting"] == 1
+
+        release.set()
+        assert await first is True
+        assert await asyncio.wait_for(second, 5) == 3
+        assert pool.stats()["in_flight"] == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+
+def test_cancelled_waiter_passes_its_wake_up_on():
+    pool = WorkerPool("thread", 1, 0)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        cancelled = asyncio.ensure_future(pool.run_when_free(sum, [1]))
+        waiting = asyncio.ensure_future(pool.run_when_free(sum, [2]))
+        await asyncio.sleep(0.05)
+
+        cancelled.cancel()
+        release.set()
+        await first
+        assert await asyncio.wait_for(waiting, 5) == 2
+        assert pool.stats() | {"kind": None} == {
+            "kind": None, "size": 1, "queue_limit": 0, "in_flight": 0, "waiting": 0
+        }
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+
+def test_batch_logs_each_regression_before_streaming_it(monkeypatch):
+    monkeypatch.setattr(api, "vision_pool", WorkerPool("thread", 1, 0))
+    session_id = "batch-disconnect"
+    currents = [UploadFile(io.BytesIO(_png("black")), filename=f"{name}.png")
+                for name in ("home", "cart")]
+    baselines = [UploadFile(io.BytesIO(_png("white")), filename=f"{name}.png")
+                 for name in ("home", "cart")]
+
+    async def first_line_then_disconnect():
+        response = await api.compare_ui_batch(
+            session_id=session_id, industry="IT", archive=None,
+            currents=currents, baselines=baselines, precision=None,
+            coarse_factor=None, escalation_margin=None
+        )
+        lines = response.body_iterator
+        first = json.loads(await lines.__anext__())
+        await lines.aclose()
+        return first
+
+    try:
+        first = asyncio.run(first_line_then_disconnect())
+    finally:
+        api.vision_pool.shutdown()
+
+    assert first["status"] == "compared"
+    assert first["visual_analysis"]["visual_regression_detected"]
+    assert get_defect_dashboard(session_id)["total_bugs_detected"] == 1
+
+
+def test_multipart_batch_pairs_spooled_files(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(api, "vision_pool", WorkerPool("thread", 1, 0))
+    files = [
+        ("currents", ("home.png", _png("black"), "image/png")),
+        ("currents", ("cart.png", _png("white"), "image/png")),
+        ("baselines", ("home.png", _png("white"), "image/png")),
+        ("baselines", ("cart.png", _png("white"), "image/png")),
+    ]
+    try:
+        response = TestClient(api.app).post(
+            "/compare-ui/batch", params={"session_id": "batch-multipart", "industry": "IT"},
+            files=files
+        )
+    finally:
+        api.vision_pool.shutdown()
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results = {line["module_name"]: line for line in lines[:-1]}
+    assert {name: r["visual_analysis"]["visual_regression_detected"]
+            for name, r in results.items()} == {"home": True, "cart": False}
+    assert lines[-1] == {"summary": {"compared": 2, "failed": 0, "regressions_detected": 1}}
+
+
+def test_full_vision_pool_answers_503(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    pool = WorkerPool("thread", 1, 0)
+    monkeypatch.setattr(api, "vision_pool", pool)
+    release = threading.Event()
+    started = threading.Event()
+
+    async def occupy():
+        started.set()
+        await pool.run(release.wait, 5)
+
+    holder = threading.Thread(target=asyncio.run, args=(occupy(),))
+    holder.start()
+    try:
+        started.wait(5)
+        while pool.stats()["in_flight"] == 0:
+            release.wait(0.01)
+
+        client = TestClient(api.app)
+        registered = client.post(
+            "/baselines", params={"industry": "IT", "module_name": "home"},
+            files={"baseline": ("home.png", _png("white"), "image/png")}
+        )
+        compared = client.post(
+            "/compare-ui",
+            params={"session_id": "busy-pool", "industry": "IT", "module_name": "home"},
+            files={"baseline": ("home.png", _png("white"), "image/png"),
+                   "current": ("home.png", _png("black"), "image/png")}
+        )
+    finally:
+        release.set()
+        holder.join(5)
+        pool.shutdown()
+
+    for response in (registered, compared):
+        assert response.status_code == 503
+        assert response.json()["detail"].startswith("Vision workers busy")
+    assert pool.stats()["in_flight"] == 0
+    assert get_defect_dashboard("busy-pool")["total_bugs_detected"] == 0
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_core import analytics_db, settings, storage
+from ai_core.api import app
+
+
+def _line(session_id):
+    return json.dumps({"session_id": session_id, "industry": "IT",
+                       "module_name": "login", "severity": "HIGH"}).encode() + b"\n"
+
+
+def test_ndjson_ingest_accepts_lines_within_the_limit():
+    client = TestClient(app)
+
+    response = client.post("/log-defects/ndjson", content=_line("ingest-ok") * 3)
+
+    assert response.status_code == 200
+    assert response.json()["logged"] == 3
+
+
+def test_ndjson_ingest_rejects_an_oversized_line(monkeypatch):
+    monkeypatch.setattr(settings, "DEFECT_INGEST_MAX_LINE_BYTES", 1024)
+    client = TestClient(app)
+
+    def body():
+        yield _line("ingest-long")
+        # No newline ever arrives: the buffer must not grow without bound.
+        for _ in range(100):
+            yield b"x" * 512
+
+    response = client.post("/log-defects/ndjson", content=body())
+
+    assert response.status_code == 413
+
+
+def test_ndjson_ingest_rejects_an_oversized_complete_line(monkeypatch):
+    monkeypatch.setattr(settings, "DEFECT_INGEST_MAX_LINE_BYTES", 1024)
+    client = TestClient(app)
+
+    response = client.post("/log-defects/ndjson",
+                           content=_line("ingest-long") + b" " * 2048 + b"\n")
+
+    assert response.status_code == 413
+
+
+@pytest.fixture
+def sharded_analytics(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_SHARDS", 2)
+    monkeypatch.setattr(analytics_db, "DB_NAME", str(tmp_path / "analytics.db"))
+    monkeypatch.setattr(analytics_db, "LEGACY_DB_NAME", None)
+    analytics_db.init_analytics_db()
+    yield
+    storage.close_all()
+
+
+@pytest.mark.parametrize("ndjson", [False, True])
+def test_failed_shard_items_are_reported_per_item(sharded_analytics, monkeypatch, ndjson):
+    session_ids = [f"shard-{i}" for i in range(8)]
+    failing = storage.shard_path(analytics_db.DB_NAME, session_ids[0])
+    assert {storage.shard_path(analytics_db.DB_NAME, s) for s in session_ids} != {failing}
+    insert = analytics_db._insert_defects
+
+    def flaky(cursor, defects):
+        if storage.shard_path(analytics_db.DB_NAME, defects[0][0]) == failing:
+            raise RuntimeError("disk full")
+        return insert(cursor, defects)
+
+    monkeypatch.setattr(analytics_db, "_insert_defects", flaky)
+    client = TestClient(app)
+
+    if ndjson:
+        response = client.post("/log-defects/ndjson",
+                               content=b"".join(_line(s) for s in session_ids))
+    else:
+        response = client.post("/log-defects", json=[json.loads(_line(s)) for s in session_ids])
+
+    assert response.status_code == 200
+    summary = response.json()
+    for session_id, status in zip(session_ids, summary["results"]):
+        on_failing_shard = storage.shard_path(analytics_db.DB_NAME, session_id) == failing
+        assert status["status"] == ("failed" if on_failing_shard else "logged")
+        stored = analytics_db.get_defect_dashboard(session_id)["total_bugs_detected"]
+        assert stored == (0 if on_failing_shard else 1)
+    assert summary["failed"] + summary["logged"] == len(session_ids)
+    assert summary["failed"] and summary["logged"]
@@ -0,0 +1,81 @@
+import calendar
+import time
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_core import analytics_db, api, storage
+
+NOW = calendar.timegm((2026, 10, 18, 13, 30, 0))
+HOUR = 3600
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [NOW]
+    monkeypatch.setattr(analytics_db, "time", types.SimpleNamespace(
+        time=lambda: now[0], gmtime=time.gmtime, strftime=time.strftime
+    ))
+    return now
+
+
+@pytest.fixture
+def session(clock, tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics_db, "DB_NAME", str(tmp_path / "analytics.db"))
+    analytics_db.init_analytics_db()
+    session_id = "trends"
+    for offset, module_name, severity in [
+        (100 * 24 * HOUR, "login", "HIGH"),   # outside the default 90 days
+        (30 * HOUR, "cart", "HIGH"),          # yesterday, outside the last 24 h
+        (2 * HOUR, "login", "HIGH"),
+        (0, "login", "HIGH"),
+        (0, "login", "HIGH"),
+        (0, "cart", "LOW"),
+    ]:
+        clock[0] = NOW - offset
+        analytics_db.insert_defect(session_id, "IT", module_name, severity)
+    clock[0] = NOW
+    yield session_id
+    storage.close_all()
+
+
+def test_hour_buckets_cover_the_last_day(session):
+    response = TestClient(api.app).get(
+        f"/defect-trends/{session}", params={"resolution": "hour", "days": 1}
+    )
+
+    assert response.status_code == 200
+    trends = response.json()
+    assert (trends["since"], trends["until"]) == ("2026-10-17T14:00:00Z", "2026-10-18T14:00:00Z")
+    assert trends["total_defects"] == 4
+    assert trends["buckets"] == [
+        {"timestamp": NOW - 2 * HOUR - 30 * 60, "start": "2026-10-18T11:00:00Z", "total": 1,
+         "modules": {"login": 1}, "severities": {"HIGH": 1}},
+        {"timestamp": NOW - 30 * 60, "start": "2026-10-18T13:00:00Z", "total": 3,
+         "modules": {"cart": 1, "login": 2}, "severities": {"HIGH": 2, "LOW": 1}},
+    ]
+
+
+def test_day_buckets_and_filters(session):
+    trends = analytics_db.get_defect_trends(session)
+
+    assert trends["until"] == "2026-10-19T00:00:00Z"
+    assert trends["total_defects"] == 5
+    assert [(b["start"], b["total"], b["modules"]) for b in trends["buckets"]] == [
+        ("2026-10-17T00:00:00Z", 1, {"cart": 1}),
+        ("2026-10-18T00:00:00Z", 4, {"cart": 1, "login": 3}),
+    ]
+
+    filtered = analytics_db.get_defect_trends(session, days=200, module_name="login",
+                                              severity="HIGH")
+    assert filtered["total_defects"] == 4
+    assert [b["total"] for b in filtered["buckets"]] == [1, 3]
+
+
+def test_unknown_resolution_is_rejected(session):
+    with pytest.raises(ValueError, match="Unknown resolution"):
+        analytics_db.get_defect_trends(session, resolution="week")
+    assert TestClient(api.app).get(
+        f"/defect-trends/{session}", params={"resolution": "week"}
+    ).status_code == 422
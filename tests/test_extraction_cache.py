@@ -0,0 +1,20 @@
+from ai_core.extraction_cache import ExtractionCache
+
+
+def test_memory_budget_counts_utf8_bytes(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache.db"), memory_bytes=100, disk_bytes=0)
+
+    # 40 characters but 80 bytes each: the second evicts the first.
+    cache.put("a", "é" * 40, True)
+    cache.put("b", "ü" * 40, True)
+    assert cache.get("a") is None
+    assert cache.get("b") == "ü" * 40
+    assert cache.stats()["memory_bytes"] == 80
+
+    # 30 characters of 4-byte text exceed the budget on their own.
+    cache.put("c", "😀" * 30, True)
+    assert cache.get("c") is None
+
+    cache.put("d", "x" * 20, True)
+    assert cache.stats()["memory_bytes"] == 100
+    assert cache.get("b", limit=5) == "üüüüü"
@@ -0,0 +1,21 @@
+import io
+
+from ai_core import file_processor
+
+
+def test_pools_are_kept_per_worker_count(make_pdf):
+    pdf = make_pdf([f"Page {number}" for number in range(6)])
+    try:
+        two = file_processor._get_pool(2)
+        three = file_processor._get_pool(3)
+
+        # A request asking for another worker count leaves the first pool running.
+        assert two is not three
+        assert file_processor._get_pool(2) is two
+        pages = list(file_processor.iter_pdf_pages(io.BytesIO(pdf), workers=2, min_pages=2))
+        assert list(file_processor.iter_pdf_pages(io.BytesIO(pdf), workers=3, min_pages=2)) == pages
+        assert pages == [f"Page {number}" for number in range(6)]
+    finally:
+        file_processor.shutdown_pdf_pool()
+
+    assert file_processor._pools == {}
@@ -0,0 +1,39 @@
+import docx
+
+from ai_core import file_reader
+
+
+def test_txt_reader_ignores_extension_and_bad_bytes(tmp_path):
+    path = tmp_path / "notes.log"
+    path.write_bytes("caf\xe9 ok\n".encode("latin-1"))
+
+    assert file_reader.extract_text_from_txt(str(path)) == "caf ok\n"
+    # The generic entry point still only handles known extensions.
+    assert file_reader.extract_text(str(path)) == ""
+
+
+def test_extract_text_dispatches_on_extension(tmp_path):
+    path = tmp_path / "notes.TXT"
+    path.write_bytes(b"plain text")
+
+    assert file_reader.extract_text(str(path)) == "plain text"
+    assert file_reader.extract_text_from_txt(str(path), limit=5) == "plain"
+
+
+def test_baseline_output_is_kept(tmp_path, make_pdf):
+    txt = tmp_path / "notes.txt"
+    txt.write_bytes(b"one\r\ntwo\rthree\n")
+    assert file_reader.extract_text(str(txt)) == "one\ntwo\nthree\n"
+
+    document = docx.Document()
+    for text in ("First", "Second"):
+        document.add_paragraph(text)
+    path = tmp_path / "spec.docx"
+    document.save(path)
+    assert file_reader.extract_text(str(path)) == "First\nSecond"
+    assert file_reader.extract_text_from_docx(str(path), limit=7) == "First\nS"
+
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(make_pdf(["Page one", "Page two"]))
+    assert file_reader.extract_text(str(pdf)) == "Page onePage two"
+    assert file_reader.extract_text_from_pdf(str(pdf), limit=5) == "Page "
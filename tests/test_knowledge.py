@@ -0,0 +1,30 @@
+from ai_core import knowledge
+
+
+def test_unknown_industries_share_one_uncached_pack():
+    before = dict(knowledge._packs)
+
+    packs = {knowledge.get_pack(f"Industry {number}") for number in range(500)}
+
+    assert packs == {knowledge._EMPTY}
+    assert knowledge.get_pack("") is knowledge._EMPTY
+    assert knowledge._packs == before
+
+
+def test_known_pack_is_loaded_once():
+    pack = knowledge.get_pack("E-Commerce")
+
+    assert pack is knowledge.get_pack("ecommerce")
+    assert pack.rules
+    assert set(knowledge.pack_stats()["ecommerce"]) == {"rules", "terms", "load_ms", "index_bytes"}
+    assert pack.stats()["index_bytes"] > 0
+
+
+def test_index_size_covers_compiled_patterns():
+    from ai_core.engines.rules import RuleMatcher
+
+    terms = [f"term {number}" for number in range(300)]
+    scanned = RuleMatcher(terms, scan_max_terms=1000)
+    compiled = RuleMatcher(terms)
+
+    assert compiled.size_bytes() > scanned.size_bytes() > 0
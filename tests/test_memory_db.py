@@ -0,0 +1,156 @@
+import math
+import sqlite3
+
+import pytest
+
+from ai_core import memory_db, settings, storage
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_db, "DB_NAME", str(tmp_path / "brain_memory.db"))
+    memory_db.init_db()
+    yield
+    storage.close_all()
+
+
+def _save(session_id, session):
+    memory_db.save_sessions({session_id: memory_db.take_session_changes(session)})
+
+
+def test_history_window_is_bounded_but_totals_cover_everything(db, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_HISTORY_WINDOW", 10)
+    session = memory_db.get_session("s")
+
+    for number in range(25):
+        memory_db.record_history(session, number, number / 2)
+    _save("s", session)
+    memory_db.record_history_many(session, [(number, number / 2) for number in range(25, 40)])
+    _save("s", session)
+
+    assert session["risk_history"] == list(range(30, 40))
+    loaded = memory_db.get_session("s")
+    assert loaded["risk_history"] == list(range(30, 40))
+    assert loaded["complexity_history"] == [number / 2 for number in range(30, 40)]
+    assert loaded["history_count"] == 40
+    assert loaded["risk_sum"] == sum(range(40))
+    assert loaded["complexity_sum"] == sum(range(40)) / 2
+
+    # A larger window reads further back from the stored history.
+    assert memory_db.get_session("s", history_limit=25)["risk_history"] == list(range(15, 40))
+
+
+def test_question_ring_and_keyword_cap(db, monkeypatch):
+    monkeypatch.setattr(settings, "CONTEXT_MAX_QUESTIONS", 3)
+    monkeypatch.setattr(settings, "CONTEXT_MAX_BYTES", 40)
+    monkeypatch.setattr(settings, "CONTEXT_MAX_KEYWORDS", 4)
+    session = memory_db.get_session("s")
+
+    for number in range(8):
+        # "common" is asked about every time, the other keyword only once.
+        memory_db.record_question(session, f"question {number}", ["common", f"kw{number}"], "Risk")
+    _save("s", session)
+    memory_db.record_question(session, "é" * 30, ["common"], "Risk")
+    _save("s", session)
+
+    ring = session["recent_questions"]
+    assert len(ring) <= 3
+    assert sum(len(question.encode("utf-8")) for question in ring) <= 40
+    assert ring[-1] == "é" * 20
+
+    loaded = memory_db.get_session("s")
+    assert loaded["recent_questions"] == ring
+    assert len(loaded["keyword_counts"]) <= 4
+    assert loaded["keyword_counts"]["common"] == 9
+    assert loaded["conversation_count"] == 9
+    assert loaded["intent_counts"] == {"Risk": 9}
+
+    conn = storage.get_connection(memory_db.DB_NAME)
+    assert conn.execute("SELECT COUNT(*) FROM session_questions").fetchone()[0] == len(ring)
+
+
+def test_history_points_round_trip_through_packed_blocks():
+    points = [(1, 0.5), (8.25, None), (None, 3.0), (-2, 1e-9)]
+    blob = memory_db.HISTORY_HEADER + memory_db.encode_points(points)
+
+    assert len(blob) == 8 + 16 * len(points)
+    decoded = memory_db.decode_points(blob).tolist()
+    assert decoded[0] == [1.0, 0.5] and decoded[3] == [-2.0, 1e-9]
+    assert decoded[1][0] == 8.25 and math.isnan(decoded[1][1])
+    assert math.isnan(decoded[2][0]) and decoded[2][1] == 3.0
+
+    with pytest.raises(ValueError, match="Unknown history block format 2"):
+        memory_db.decode_points(bytes([2]) + blob[1:])
+
+
+def test_appends_fill_the_last_block_before_starting_another(db, monkeypatch):
+    monkeypatch.setattr(memory_db, "HISTORY_BLOCK_POINTS", 4)
+    session = memory_db.get_session("s")
+    for batch in ([(0, 0)] * 3, [(1, 1)] * 2, [(2, 2)] * 5):
+        memory_db.record_history_many(session, batch)
+        _save("s", session)
+
+    conn = storage.get_connection(memory_db.DB_NAME)
+    blocks = conn.execute("""
+        SELECT block, points FROM session_history_blocks
+        WHERE session_id = 's' ORDER BY block
+    """).fetchall()
+    assert [(block, len(memory_db.decode_points(blob))) for block, blob in blocks] == [
+        (0, 4), (1, 4), (2, 2)
+    ]
+    # Windows that start mid-block are cut from the right blocks.
+    assert memory_db.get_session("s", history_limit=7)["risk_history"] == [1, 1, 2, 2, 2, 2, 2]
+    assert memory_db.get_session("s", history_limit=100)["complexity_history"] == (
+        [0] * 3 + [1] * 2 + [2] * 5
+    )
+
+
+def test_init_db_migrates_json_and_row_histories(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_db, "DB_NAME", str(tmp_path / "brain_memory.db"))
+    legacy = sqlite3.connect(memory_db.DB_NAME)
+    legacy.executescript("""
+        CREATE TABLE sessions (
+            session_id TEXT PRIMARY KEY, risk_history TEXT, complexity_history TEXT,
+            project_context TEXT, conversation_count INTEGER, last_intent TEXT,
+            history_count INTEGER NOT NULL DEFAULT 0,
+            risk_sum REAL NOT NULL DEFAULT 0, complexity_sum REAL NOT NULL DEFAULT 0
+        );
+        CREATE TABLE session_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL,
+            risk REAL, complexity REAL
+        );
+        INSERT INTO sessions (session_id, risk_history, complexity_history)
+        VALUES ('json', '[5, 8, 3]', '[1.5, 2.0]');
+        INSERT INTO sessions (session_id, history_count, risk_sum, complexity_sum)
+        VALUES ('rows', 2, 11, 4.5);
+        INSERT INTO session_history (session_id, risk, complexity)
+        VALUES ('rows', 4, 2.0), ('rows', 7, 2.5);
+    """)
+    legacy.commit()
+    legacy.close()
+
+    memory_db.init_db()
+    memory_db.init_db()  # idempotent
+
+    try:
+        json_session = memory_db.get_session("json")
+        assert json_session["risk_history"] == [5, 8, 3]
+        assert json_session["complexity_history"] == [1.5, 2.0]
+        assert (json_session["history_count"], json_session["risk_sum"],
+                json_session["complexity_sum"]) == (3, 16, 3.5)
+
+        rows_session = memory_db.get_session("rows")
+        assert rows_session["risk_history"] == [4, 7]
+        assert rows_session["complexity_history"] == [2.0, 2.5]
+        assert (rows_session["history_count"], rows_session["risk_sum"]) == (2, 11)
+
+        conn = storage.get_connection(memory_db.DB_NAME)
+        assert conn.execute("""
+            SELECT name FROM sqlite_master WHERE name = 'session_history'
+        """).fetchone() is None
+        assert conn.execute("""
+            SELECT COUNT(*) FROM sessions
+            WHERE risk_history IS NOT NULL OR complexity_history IS NOT NULL
+        """).fetchone() == (0,)
+    finally:
+        storage.close_all()
@@ -0,0 +1,49 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_core import analytics_db, settings, storage
+from ai_core.api import app
+
+DAY = 86400
+
+
+def _snapshot(session_id, industry, complexity, risk, days_ago):
+    storage.writer(storage.shard_path(analytics_db.DB_NAME, session_id)).write(
+        analytics_db._insert_project_snapshot, session_id, industry, complexity, risk,
+        0.1, int(time.time()) - days_ago * DAY
+    )
+
+
+def test_generate_pm_reports_windowed_baselines(monkeypatch):
+    monkeypatch.setattr(settings, "BASELINE_WINDOWS_DAYS", (30, 90))
+    industry = "Windowed Baseline Test"
+    _snapshot("old", industry, 8.0, 6.0, 60)
+    _snapshot("recent-1", industry, 2.0, 1.0, 1)
+    _snapshot("recent-2", industry, 4.0, 3.0, 0)
+
+    payload = {"session_id": "pm-baselines", "industry": industry,
+               "description": "Checkout redesign with payment provider migration",
+               "timeline_weeks": 6, "team_size": 4}
+    response = TestClient(app).post("/generate-pm", json=payload).json()
+    baselines = response["industry_baseline"]
+    complexity = response["analysis"]["complexity_score"]
+
+    assert set(baselines) == {"all_time", "last_30_days", "last_90_days"}
+    assert baselines["all_time"]["sample_size"] == 3
+    assert baselines["all_time"]["avg_complexity"] == pytest.approx(14.0 / 3)
+    assert baselines["last_90_days"]["sample_size"] == 3
+    assert baselines["last_30_days"]["sample_size"] == 2
+    assert baselines["last_30_days"]["avg_complexity"] == pytest.approx(3.0)
+    assert baselines["last_30_days"]["avg_risk"] == pytest.approx(2.0)
+    assert baselines["last_30_days"]["complexity_stddev"] == pytest.approx(1.0)
+    assert baselines["last_30_days"]["complexity_delta"] == round(complexity - 3.0, 2)
+
+
+def test_unknown_industry_has_no_baseline():
+    payload = {"session_id": "pm-baselines", "industry": "No Snapshots Yet",
+               "description": "Small change", "timeline_weeks": 2, "team_size": 2}
+    baselines = TestClient(app).post("/generate-pm", json=payload).json()["industry_baseline"]
+
+    assert all(baseline is None for baseline in baselines.values())
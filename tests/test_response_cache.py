@@ -0,0 +1,86 @@
+from fastapi.testclient import TestClient
+
+from ai_core.engines.test_cases_engine import TestCaseEngine
+from ai_core.response_cache import response_cache
+
+
+def test_echoed_fields_are_returned_as_sent():
+    response_cache.clear()
+    engine = TestCaseEngine()
+
+    first = engine.generate("FinTech", "Card  payments", "token   checks for fraud", "high")
+    second = engine.generate("FinTech", "Card payments", "token checks for fraud", "high")
+
+    assert "for Card  payments in" in first["assistant_response"]["summary"]
+    assert "for Card payments in" in second["assistant_response"]["summary"]
+    assert first["analysis"]["risk_score"] == second["analysis"]["risk_score"]
+
+
+def test_description_whitespace_shares_a_cache_entry():
+    response_cache.clear()
+    engine = TestCaseEngine()
+    before = response_cache.stats()["memory_hits"]
+
+    engine.generate("FinTech", "Login", "token  checks", "high")
+    engine.generate("FinTech", "Login", "token checks\n", "high")
+
+    assert response_cache.stats()["memory_hits"] == before + 1
+
+
+def test_post_ignores_if_none_match():
+    from ai_core.api import app
+
+    client = TestClient(app)
+    payload = {"session_id": "etag", "industry": "IT", "feature": "Login",
+               "description": "token checks", "risk_level": "high"}
+
+    first = client.post("/generate-testcases", json=payload)
+    again = client.post("/generate-testcases", json=payload,
+                        headers={"If-None-Match": first.headers["etag"]})
+
+    assert again.status_code == 200
+    assert again.json() == first.json()
+
+
+def test_get_routes_answer_if_none_match_with_304():
+    from ai_core.api import app
+
+    client = TestClient(app)
+    routes = [
+        ("/generate-testcases", {"industry": "IT", "feature": "Login",
+                                 "description": "token checks", "risk_level": "high"}),
+        ("/generate-qa", {"industry": "IT", "question": "How do we test logins?",
+                          "difficulty": "medium"}),
+        ("/generate-pm", {"industry": "IT", "description": "Login rework",
+                          "timeline_weeks": 4, "team_size": 3}),
+    ]
+
+    for path, params in routes:
+        first = client.get(path, params=params)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        cached = client.get(path, params=params, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert cached.content == b""
+
+        stale = client.get(path, params=params, headers={"If-None-Match": '"stale"'})
+        assert stale.status_code == 200
+        assert stale.json() == first.json()
+
+
+def test_get_route_matches_post_without_recording_history():
+    from ai_core.api import app, brain
+
+    client = TestClient(app)
+    payload = {"session_id": "etag-get", "industry": "IT", "feature": "Search",
+               "description": "query parsing", "risk_level": "medium"}
+    params = {key: value for key, value in payload.items() if key != "session_id"}
+
+    previewed = client.get("/generate-testcases", params=params)
+    assert brain.sessions.get("etag-get")["history_count"] == 0
+
+    posted = client.post("/generate-testcases", json=payload)
+    assert posted.headers["etag"] == previewed.headers["etag"]
+    assert brain.sessions.get("etag-get")["history_count"] == 1
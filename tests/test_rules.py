@@ -0,0 +1,18 @@
+import random
+
+from ai_core.engines.rules import RuleMatcher
+
+
+def test_compiled_matcher_matches_substring_checks():
+    rng = random.Random(7)
+    words = ["pay", "payment", "payments", "api", "rapid", "log", "login", "audit", "it"]
+    terms = {" ".join(rng.sample(words, rng.randint(1, 2))) for _ in range(300)} | set(words)
+    texts = [" ".join(rng.choice(words) for _ in range(12)).upper() for _ in range(50)]
+
+    scanned = RuleMatcher(terms, scan_max_terms=len(terms))
+    compiled = RuleMatcher(terms, scan_max_terms=0)
+
+    for text in texts:
+        expected = {term for term in terms if term in text.lower()}
+        assert scanned.find(text) == expected
+        assert compiled.find(text) == expected
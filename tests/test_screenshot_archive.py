@@ -0,0 +1,46 @@
+import io
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ai_core.screenshot_archive import read_archive
+
+
+def _members(count=40):
+    # Distinct sizes and contents so a mixed-up read is always detected.
+    return {f"module-{i}/current.png": bytes([i]) * (5000 + 97 * i) for i in range(count)}
+
+
+def _tar(members, spool):
+    with tarfile.open(fileobj=spool, mode="w") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def _zip(members, spool):
+    with zipfile.ZipFile(spool, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+
+@pytest.mark.parametrize("write", [_tar, _zip])
+def test_loaders_are_safe_to_call_concurrently(write):
+    members = _members()
+    with tempfile.TemporaryFile() as spool:
+        write(members, spool)
+        entries = read_archive(spool, "suite")
+
+        jobs = [
+            (f"module-{i % 40}/current.png", entries[f"module-{i % 40}"]["current"])
+            for i in range(200)
+        ]
+        with ThreadPoolExecutor(16) as pool:
+            results = list(pool.map(lambda job: (job[0], job[1]()), jobs))
+
+    for name, data in results:
+        assert data == members[name]
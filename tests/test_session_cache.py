@@ -0,0 +1,160 @@
+import threading
+import time
+
+import pytest
+
+from ai_core import memory_db, settings, storage
+from ai_core.session_cache import SessionCache
+
+
+@pytest.fixture
+def sharded_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_SHARDS", 2)
+    monkeypatch.setattr(memory_db, "DB_NAME", str(tmp_path / "brain_memory.db"))
+    memory_db.init_db()
+    yield
+    storage.close_all()
+
+
+def _session_ids():
+    # At least one session on each of the two shards.
+    ids = [f"s{i}" for i in range(8)]
+    assert {storage.shard_index(session_id, 2) for session_id in ids} == {0, 1}
+    return ids
+
+
+def test_failed_shard_is_retried_alone(sharded_db, monkeypatch):
+    session_ids = _session_ids()
+    failing = storage.shard_path(memory_db.DB_NAME, session_ids[0])
+    save_sessions = memory_db._save_sessions
+    calls = {"failed": 0}
+
+    def flaky(cursor, changes):
+        if calls["failed"] == 0 and storage.shard_path(memory_db.DB_NAME, changes[0][0]) == failing:
+            calls["failed"] += 1
+            raise RuntimeError("disk full")
+        return save_sessions(cursor, changes)
+
+    monkeypatch.setattr(memory_db, "_save_sessions", flaky)
+
+    cache = SessionCache(memory_db.get_session, memory_db.save_sessions,
+                         snapshot=memory_db.take_session_changes, flush_interval=60)
+    for session_id in session_ids:
+        with cache.edit(session_id) as session:
+            memory_db.record_history(session, 5, 4.2)
+
+    with pytest.raises(storage.ShardWriteError):
+        cache.flush()
+    cache.flush()
+
+    for session_id in session_ids:
+        assert memory_db.get_session(session_id)["history_count"] == 1
+
+
+def _memory_cache(**options):
+    saved = []
+    cache = SessionCache(lambda session_id: {"id": session_id, "edits": 0},
+                         lambda batch: saved.append(batch), **options)
+    return cache, saved
+
+
+def _edit(cache, session_id):
+    with cache.edit(session_id) as session:
+        session["edits"] += 1
+
+
+def test_lru_evicts_only_clean_sessions():
+    cache, saved = _memory_cache(max_sessions=2, flush_interval=60, flush_threshold=100)
+    for session_id in ("a", "b", "c"):
+        _edit(cache, session_id)
+
+    # All three are dirty, so none can go yet.
+    assert list(cache._entries) == ["a", "b", "c"]
+
+    cache.flush()
+    assert list(cache._entries) == ["b", "c"]
+
+    _edit(cache, "b")
+    cache.get("d")
+    # "c" is the oldest clean session; the dirty "b" stays.
+    assert list(cache._entries) == ["b", "d"]
+    assert saved == [{"a": {"id": "a", "edits": 1}, "b": {"id": "b", "edits": 1},
+                      "c": {"id": "c", "edits": 1}}]
+
+
+def test_threshold_flush():
+    cache, saved = _memory_cache(flush_interval=60, flush_threshold=2)
+
+    _edit(cache, "a")
+    assert saved == []
+    _edit(cache, "b")
+    assert [sorted(batch) for batch in saved] == [["a", "b"]]
+
+
+def test_interval_flush_and_close():
+    cache, saved = _memory_cache(flush_interval=0.02, flush_threshold=100)
+    cache.start()
+    try:
+        _edit(cache, "a")
+        deadline = time.monotonic() + 5
+        while not saved and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert saved == [{"a": {"id": "a", "edits": 1}}]
+        _edit(cache, "b")
+    finally:
+        cache.close()
+    assert saved[-1] == {"b": {"id": "b", "edits": 1}}
+
+
+def test_failed_edit_is_still_flushed():
+    cache, saved = _memory_cache(flush_interval=60, flush_threshold=100)
+
+    with pytest.raises(RuntimeError):
+        with cache.edit("a") as session:
+            session["edits"] += 1
+            raise RuntimeError("engine failed")
+
+    assert cache.flush() == 1
+    assert saved == [{"a": {"id": "a", "edits": 1}}]
+
+
+def test_cold_load_does_not_block_cached_sessions():
+    loading, release = threading.Event(), threading.Event()
+
+    def load(session_id):
+        if session_id == "cold":
+            loading.set()
+            release.wait(5)
+        return {"id": session_id}
+
+    cache = SessionCache(load, lambda batch: None, flush_interval=60)
+    cache.get("hot")
+    cold = threading.Thread(target=cache.get, args=("cold",))
+    cold.start()
+    try:
+        assert loading.wait(5)
+        reader = threading.Thread(target=cache.get, args=("hot",))
+        reader.start()
+        reader.join(2)
+        assert not reader.is_alive()
+    finally:
+        release.set()
+        cold.join()
+    assert set(cache._entries) == {"hot", "cold"}
+
+
+def test_app_shutdown_flushes_dirty_sessions(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from ai_core.api import app, brain
+
+    monkeypatch.setattr(brain.sessions, "flush_interval", 3600)
+    monkeypatch.setattr(brain.sessions, "flush_threshold", 10000)
+    payload = {"session_id": "lifespan", "industry": "IT", "feature": "Login",
+               "description": "token checks", "risk_level": "high"}
+
+    with TestClient(app) as client:
+        assert client.post("/generate-testcases", json=payload).status_code == 200
+        assert memory_db.get_session("lifespan")["history_count"] == 0
+
+    assert memory_db.get_session("lifespan")["history_count"] == 1
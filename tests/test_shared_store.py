@@ -0,0 +1,61 @@
+import multiprocessing
+import threading
+
+from ai_core import memory_db, storage
+from ai_core.session_cache import SessionCache
+
+WORKERS = 3
+THREADS = 4
+OPS = 39
+SESSIONS = 3
+
+
+def _worker(db_path):
+    # One uvicorn worker: its own cache and flusher over the shared store.
+    memory_db.DB_NAME = db_path
+    cache = SessionCache(memory_db.get_session, memory_db.save_sessions,
+                         snapshot=memory_db.take_session_changes,
+                         flush_interval=0.01, flush_threshold=2, max_age=0.01)
+    cache.start()
+
+    def run(t):
+        for i in range(OPS):
+            session_id = f"shared-{i % SESSIONS}"
+            with cache.edit(session_id) as session:
+                memory_db.record_history(session, 3, 1.5)
+            with cache.edit(session_id) as session:
+                memory_db.record_question(session, f"question {t} {i}", ["token"], "Security")
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    cache.close()
+    storage.close_all()
+
+
+def test_processes_and_threads_lose_no_updates(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "brain_memory.db")
+    monkeypatch.setattr(memory_db, "DB_NAME", db_path)
+    memory_db.init_db()
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_worker, args=(db_path,)) for _ in range(WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(120)
+        assert process.exitcode == 0
+
+    assert OPS % SESSIONS == 0
+    per_session = WORKERS * THREADS * OPS // SESSIONS
+    for number in range(SESSIONS):
+        session = memory_db.get_session(f"shared-{number}")
+        assert session["history_count"] == per_session
+        assert session["risk_sum"] == 3 * per_session
+        assert session["complexity_sum"] == 1.5 * per_session
+        assert session["conversation_count"] == per_session
+        assert session["intent_counts"] == {"Security": per_session}
+    storage.close_all()
@@ -0,0 +1,100 @@
+import gc
+import os
+import threading
+
+from ai_core import storage
+
+
+def _open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def test_short_lived_threads_do_not_leak_connections(tmp_path):
+    db_path = str(tmp_path / "leak.db")
+    storage.get_connection(db_path).execute("CREATE TABLE t (x INTEGER)")
+    gc.collect()
+    connections_before = len(storage._all_connections)
+    fds_before = _open_fds()
+
+    def query():
+        storage.get_connection(db_path).execute("SELECT COUNT(*) FROM t").fetchone()
+
+    for _ in range(200):
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+    gc.collect()
+
+    assert len(storage._all_connections) <= connections_before + 1
+    assert _open_fds() <= fds_before + 5
+    storage.close_all()
+
+
+def test_close_all_then_reuse(tmp_path):
+    db_path = str(tmp_path / "reuse.db")
+    storage.get_connection(db_path).execute("CREATE TABLE t (x INTEGER)")
+    storage.close_all()
+    assert storage.get_connection(db_path).execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
+    storage.close_all()
+
+
+def _insert(cursor, x):
+    cursor.execute("INSERT INTO t (x) VALUES (?)", (x,))
+    return x
+
+
+def _insert_then_fail(cursor, x):
+    cursor.execute("INSERT INTO t (x) VALUES (?)", (x,))
+    raise ValueError(f"job {x} failed")
+
+
+def _blocked_writer(tmp_path, max_batch):
+    # Hold the writer thread in a first job so the rest queue up behind it.
+    db_path = str(tmp_path / "queue.db")
+    storage.get_connection(db_path).execute("CREATE TABLE t (x INTEGER)")
+    writes = storage.WriteQueue(db_path, queue_limit=100, max_batch=max_batch)
+    started, release = threading.Event(), threading.Event()
+
+    def block(cursor):
+        started.set()
+        return release.wait(5)
+
+    blocker = writes.submit(block)
+    started.wait(5)
+    return db_path, writes, release, blocker
+
+
+def test_queued_jobs_commit_as_one_batch_and_a_failure_rolls_back_alone(tmp_path):
+    db_path, writes, release, blocker = _blocked_writer(tmp_path, max_batch=10)
+    futures = [writes.submit(_insert_then_fail if x == 3 else _insert, x) for x in range(6)]
+    release.set()
+
+    assert blocker.result(5) is True
+    for x, future in enumerate(futures):
+        if x == 3:
+            assert str(future.exception(5)) == "job 3 failed"
+        else:
+            assert future.result(5) == x
+    writes.close()
+
+    rows = storage.get_connection(db_path).execute("SELECT x FROM t ORDER BY x").fetchall()
+    assert rows == [(0,), (1,), (2,), (4,), (5,)]
+    stats = writes.stats()
+    assert stats | {"avg_batch": None} == {
+        "jobs": 7, "failed": 1, "batches": 2, "max_batch": 6, "last_batch": 6,
+        "queue_depth": 0, "avg_batch": None
+    }
+    storage.close_all()
+
+
+def test_batches_are_capped_at_max_batch(tmp_path):
+    db_path, writes, release, _ = _blocked_writer(tmp_path, max_batch=4)
+    futures = [writes.submit(_insert, x) for x in range(10)]
+    release.set()
+    assert [future.result(5) for future in futures] == list(range(10))
+    writes.close()
+
+    assert writes.stats()["batches"] == 1 + 3
+    assert writes.stats()["max_batch"] == 4
+    assert storage.get_connection(db_path).execute("SELECT COUNT(*) FROM t").fetchone() == (10,)
+    storage.close_all()
@@ -0,0 +1,98 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from ai_core import vision
+
+
+@pytest.mark.parametrize("size", [(300, 700), (700, 300), (301, 203)])
+def test_coarse_regions_cover_the_full_image(size):
+    baseline = Image.new("RGB", size, "white")
+    current = Image.new("RGB", size, "black")
+
+    result = vision.compare_multiresolution(
+        vision.image_loader(baseline), vision.image_loader(current),
+        precision="coarse", coarse_factor=8, tile_size=128
+    )
+
+    assert result["resolution"] == "coarse"
+    assert result["changed_regions"] == [{
+        "x": 0, "y": 0, "width": size[0], "height": size[1],
+        "max_tile_difference_percent": 100.0
+    }]
+
+
+def test_coarse_region_inside_the_image_is_not_stretched():
+    baseline = Image.new("RGB", (300, 300), "white")
+    current = baseline.copy()
+    current.paste((0, 0, 0), (0, 0, 64, 64))
+
+    result = vision.compare_multiresolution(
+        vision.image_loader(baseline), vision.image_loader(current),
+        precision="coarse", coarse_factor=8, tile_size=64
+    )
+
+    region, = result["changed_regions"]
+    assert (region["x"], region["y"], region["width"], region["height"]) == (0, 0, 64, 64)
+
+
+def _untiled_result(baseline, current, tile_size, change_percent):
+    # Whole-image reference: one diff array, then per-tile means.
+    diff = np.abs(np.asarray(baseline, dtype=np.int16) - np.asarray(current, dtype=np.int16))
+    height, width = diff.shape[:2]
+    rows, columns = -(-height // tile_size), -(-width // tile_size)
+    scores = np.array([[
+        diff[r * tile_size:(r + 1) * tile_size, c * tile_size:(c + 1) * tile_size].mean() / 255 * 100
+        for c in range(columns)
+    ] for r in range(rows)])
+    return diff.mean() / 255 * 100, scores
+
+
+@pytest.mark.parametrize("size", [(300, 200), (420, 300), (530, 170)])
+def test_tiled_diff_matches_untiled_diff(size):
+    rng = np.random.default_rng(sum(size))
+    pixels = rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    baseline = Image.fromarray(pixels)
+    changed = pixels.copy()
+    # Two changes far enough apart to stay separate regions: one in the
+    # first tile and one in the partial bottom-right tile.
+    changed[10:40, 10:40] = 255 - changed[10:40, 10:40]
+    changed[-20:, -15:] = 0
+    current = Image.fromarray(changed)
+
+    result = vision.compare_images(baseline, current, tile_size=128, change_percent=2.0)
+    difference_percent, scores = _untiled_result(baseline, current, 128, 2.0)
+
+    assert result["difference_percent"] == pytest.approx(difference_percent)
+    np.testing.assert_allclose(result["tile_scores"], scores)
+
+    width, height = size
+    expected = []
+    for r, c in zip(*np.nonzero(scores > 2.0)):
+        expected.append((c * 128, r * 128,
+                         min(width, (c + 1) * 128) - c * 128,
+                         min(height, (r + 1) * 128) - r * 128))
+    regions = [(region["x"], region["y"], region["width"], region["height"])
+               for region in result["changed_regions"]]
+    assert sorted(regions) == sorted(expected)
+    assert max(x + w for x, _, w, _ in regions) == width
+    assert max(y + h for _, y, _, h in regions) == height
+
+
+def test_4k_comparison_peak_allocation_is_bounded():
+    baseline = Image.new("RGB", (3840, 2160), (245, 245, 245))
+    current = baseline.copy()
+    current.paste((20, 20, 20), (384, 216, 1280, 540))
+
+    tracemalloc.start()
+    try:
+        result = vision.compare_images(baseline, current, tile_size=128)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    # 12 * tile_size * width = 5.9 MB of bands, plus the tile score table.
+    assert peak < 8 * 1024 * 1024
+    assert result["changed_regions"]